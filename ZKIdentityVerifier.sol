@@ -6,13 +6,45 @@ import "./verifier.sol"; // ⬅️ Make sure to upload ZoKrates' verifier.sol he
 contract ZKIdentityVerifier {
     Verifier private verifier;
 
+    address public owner;
+
     // Mapping of user to proof IPFS hashes
     mapping(address => string) public proofRecords;
 
+    // 🌳 Merkle root of a batch of (proof hash, CID) leaves => block it was anchored in
+    mapping(bytes32 => uint256) public anchoredAt;
+
     event Verified(address indexed user, string cid);
+    event RootAnchored(bytes32 indexed root, uint256 leaves);
 
     constructor(address _verifierAddress) {
         verifier = Verifier(_verifierAddress);
+        owner = msg.sender;
+    }
+
+    // ⚓ One transaction per batch window instead of one per verification
+    function anchorRoot(bytes32 root, uint256 leaves) external {
+        require(msg.sender == owner, "❌ Only the anchoring service");
+        require(anchoredAt[root] == 0, "❌ Root already anchored");
+        anchoredAt[root] = block.number;
+        emit RootAnchored(root, leaves);
+    }
+
+    // 🔎 Same hashing as zk_ai_backend/merkle.py: node = sha256(0x01 || left || right)
+    function verifyInclusion(
+        bytes32 root,
+        bytes32 leaf,
+        bytes32[] calldata siblings,
+        bool[] calldata siblingOnLeft
+    ) external view returns (bool) {
+        require(siblings.length == siblingOnLeft.length, "❌ Path length mismatch");
+        bytes32 node = leaf;
+        for (uint256 i = 0; i < siblings.length; i++) {
+            node = siblingOnLeft[i]
+                ? sha256(abi.encodePacked(bytes1(0x01), siblings[i], node))
+                : sha256(abi.encodePacked(bytes1(0x01), node, siblings[i]));
+        }
+        return node == root && anchoredAt[root] != 0;
     }
 
     function verifyAndRecord(
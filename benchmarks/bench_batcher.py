@@ -0,0 +1,74 @@
+# benchmarks/bench_batcher.py  (run from the repo root: python -m benchmarks.bench_batcher)
+"""
+Throughput vs. added latency of the /verify micro-batcher at 1, 10 and 100
+concurrent clients, compared with one predict call per request.
+"""
+import argparse
+import asyncio
+import time
+import numpy as np
+
+from zk_ai_backend.batcher import MicroBatcher
+from zk_ai_backend.model_registry import registry
+
+CLIENTS = (1, 10, 100)
+
+
+async def drive(submit, n_features, clients, requests_per_client):
+    rng = np.random.default_rng(0)
+    latencies = []
+
+    async def client():
+        for _ in range(requests_per_client):
+            row = rng.normal(size=n_features)
+            start = time.perf_counter()
+            await submit(row)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    lat = np.array(latencies) * 1000
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p99_ms": float(np.percentile(lat, 99)),
+    }
+
+
+async def run(model_name, max_batch_size, max_wait_ms, requests_per_client):
+    model = registry.get(model_name)
+    n_features = model.n_features_in_
+    loop = asyncio.get_running_loop()
+
+    async def unbatched(row):
+        # Baseline: one predict per request, still off the event loop
+        return await loop.run_in_executor(None, model.predict, row.reshape(1, -1))
+
+    print(f"\n🧠 {model_name} model ({type(model).__name__}, {n_features} features)")
+    print(f"{'clients':>8} {'mode':>10} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for clients in CLIENTS:
+        base = await drive(unbatched, n_features, clients, requests_per_client)
+        batcher = MicroBatcher(model_name, lambda: model, max_batch_size, max_wait_ms)
+        await batcher.start()
+        batched = await drive(batcher.submit, n_features, clients, requests_per_client)
+        mean_batch = batcher.stats()["mean_batch_size"]
+        await batcher.stop()
+        for mode, r in (("single", base), ("batched", batched)):
+            print(f"{clients:>8} {mode:>10} {r['throughput']:>10.0f} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+        print(f"{'':>8} {'':>10} mean batch size {mean_batch}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    args = parser.parse_args()
+
+    for name in ("voice", "keystroke"):
+        asyncio.run(run(name, args.max_batch_size, args.max_wait_ms, args.requests))
+
+
+if __name__ == "__main__":
+    main()
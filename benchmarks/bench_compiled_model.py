@@ -0,0 +1,82 @@
+# benchmarks/bench_compiled_model.py  (run from the repo root: python -m benchmarks.bench_compiled_model)
+"""
+Checks the NumPy-compiled models against sklearn and compares scoring
+latency plus the resident memory a fresh worker needs to load each form.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+import joblib
+
+from zk_ai_backend.compiled_model import save_compiled, load_compiled
+from zk_ai_backend.model_registry import VOICE_MODEL_PATH, KEYSTROKE_MODEL_PATH
+
+BATCH_SIZES = (1, 32, 256)
+
+# Loads one model form in a clean interpreter and prints its RSS growth
+RSS_PROBE = """
+import sys
+from zk_ai_backend.model_registry import current_rss_bytes
+before = current_rss_bytes()
+path = sys.argv[1]
+if path.endswith(".npz"):
+    from zk_ai_backend.compiled_model import load_compiled
+    load_compiled(path)
+else:
+    import joblib
+    joblib.load(path)
+print(current_rss_bytes() - before)
+"""
+
+
+def worker_rss(path: str) -> int:
+    out = subprocess.run([sys.executable, "-W", "ignore", "-c", RSS_PROBE, path],
+                         capture_output=True, text=True, check=True, cwd=os.getcwd())
+    return int(out.stdout.strip().splitlines()[-1])
+
+
+def per_call(fn, X, runs):
+    fn(X)
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn(X)
+    return (time.perf_counter() - start) / runs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, path in (("voice", VOICE_MODEL_PATH), ("keystroke", KEYSTROKE_MODEL_PATH)):
+            model = joblib.load(path)
+            target = os.path.join(tmp, f"{name}.npz")
+            save_compiled(model, target)
+            compiled = load_compiled(target)
+
+            # Real-scale rows: jitter around the training range of each feature
+            X = rng.normal(size=(2000, model.n_features_in_)) * 50
+            assert np.allclose(compiled.predict_proba(X), model.predict_proba(X)), f"❌ {name} probabilities differ"
+            assert (compiled.predict(X) == model.predict(X)).all(), f"❌ {name} predictions differ"
+            print(f"✅ {name}: compiled model matches sklearn on {len(X)} rows")
+
+            for batch in BATCH_SIZES:
+                rows = X[:batch]
+                slow = per_call(model.predict, rows, args.runs)
+                fast = per_call(compiled.predict, rows, args.runs)
+                print(f"   batch {batch:>4}: sklearn {slow * 1e3:7.3f} ms  compiled {fast * 1e3:7.3f} ms  "
+                      f"({slow / fast:.1f}x)")
+
+            print(f"   worker RSS to load: sklearn {worker_rss(path) / 2**20:.1f} MiB  "
+                  f"compiled {worker_rss(target) / 2**20:.1f} MiB  "
+                  f"(files {os.path.getsize(path) / 1024:.0f} KiB vs {os.path.getsize(target) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_import.py  (run from the repo root: python -m benchmarks.bench_import)
+"""
+Measures cold import time of the backend in fresh interpreters and fails if
+it exceeds the startup budget. Also lists the slowest modules from
+`python -X importtime` so regressions are easy to attribute.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+TARGET = "zk_ai_backend.app"
+DEFAULT_BUDGET_MS = 1500.0
+# Heavy libraries that must stay out of the import path (loaded on first use instead)
+DEFERRED = ("pandas", "sklearn", "librosa", "ffmpeg", "langchain", "langchain_huggingface", "requests", "httpx")
+
+
+def cold_import_ms(env) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {TARGET}"], check=True, env=env)
+    return (time.perf_counter() - start) * 1000
+
+
+def import_profile(env):
+    code = f"import sys, {TARGET}; print(','.join(sorted(sys.modules)))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          check=True, env=env, capture_output=True, text=True)
+    loaded = set(proc.stdout.strip().split(","))
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            rows.append((int(match.group(2)), len(match.group(3)), match.group(4)))
+    return loaded, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+
+    timings = [cold_import_ms(env) for _ in range(args.runs)]
+    median = statistics.median(timings)
+    print(f"⏱️ import {TARGET}: median {median:.0f} ms, min {min(timings):.0f} ms over {args.runs} runs "
+          f"(budget {args.budget_ms:.0f} ms, includes interpreter start)")
+
+    loaded, rows = import_profile(env)
+    print("\n🐢 Slowest imports, two levels deep (cumulative µs):")
+    top_level = sorted((r for r in rows if r[1] <= 3), reverse=True)[:args.top]
+    for cumulative, _, name in top_level:
+        print(f"  {cumulative:>9}  {name}")
+
+    eager = [name for name in DEFERRED if name in loaded]
+    if eager:
+        print(f"\n❌ Imported eagerly but should be deferred: {', '.join(eager)}")
+    if median > args.budget_ms:
+        print(f"\n❌ Over startup budget by {median - args.budget_ms:.0f} ms")
+    if eager or median > args.budget_ms:
+        sys.exit(1)
+    print("\n✅ Within startup budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/bench_keystroke_parser.py  (run from the repo root: python -m benchmarks.bench_keystroke_parser)
+"""
+Times keystroke.parser against the previous pandas path on a typical
+20-line upload and checks both produce the same hold times.
+"""
+import io
+import time
+import argparse
+import numpy as np
+
+from keystroke.test_model import legacy_features
+
+
+def sample_csv(seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    lines = ["key,event,time"]
+    t = 0
+    for key in "helloworld":
+        down = t + int(rng.integers(60, 160))
+        up = down + int(rng.integers(60, 120))
+        lines += [f"{key},down,{down}", f"{key},up,{up}"]
+        t = up
+    return ("\n".join(lines) + "\n").encode()
+
+
+def pandas_features(data: bytes):
+    # The pre-parser implementation, kept here as the reference
+    import pandas as pd
+
+    df = pd.read_csv(io.BytesIO(data))
+    key_downs = df[df['event'] == 'down'].reset_index(drop=True)
+    key_ups = df[df['event'] == 'up'].reset_index(drop=True)
+    return key_ups['time'].values - key_downs['time'].values
+
+
+def bench(fn, data, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn(data)
+    return (time.perf_counter() - start) / runs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    import pandas  # noqa: F401
+    pandas_import = time.perf_counter() - start
+
+    samples = [sample_csv(seed) for seed in range(20)]
+    for data in samples:
+        assert np.allclose(legacy_features(data), pandas_features(data)), "❌ hold times differ"
+    print(f"✅ Hold times match pandas on {len(samples)} samples")
+
+    data = samples[0]
+    fast = bench(legacy_features, data, args.runs)
+    slow = bench(pandas_features, data, args.runs)
+    print(f"⌨️ parser: {fast * 1e6:8.1f} µs/upload")
+    print(f"🐼 pandas: {slow * 1e6:8.1f} µs/upload (+{pandas_import * 1000:.0f} ms one-off import)")
+    print(f"🚀 speedup: {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# benchmarks/bench_mfcc.py  (run from the repo root: python -m benchmarks.bench_mfcc)
+"""
+Checks voice.features against the librosa reference and times both paths.
+"""
+import glob
+import time
+import numpy as np
+import librosa
+
+from voice.features import SAMPLE_RATE, N_MFCC, load_audio, mfcc_mean_batch
+
+TOLERANCE = 1e-2  # MFCC values are in dB-scaled units, typically |x| < 500
+
+
+def librosa_reference(signals):
+    return np.array([
+        np.mean(librosa.feature.mfcc(y=s, sr=SAMPLE_RATE, n_mfcc=N_MFCC).T, axis=0)
+        for s in signals
+    ])
+
+
+def main():
+    paths = sorted(glob.glob("voice_data/**/*.wav", recursive=True))
+    signals = [load_audio(p) for p in paths]
+    # Uneven lengths exercise the padding / frame masking
+    rng = np.random.default_rng(0)
+    signals += [s[: rng.integers(4000, len(s))] for s in signals[:4]]
+
+    librosa_reference(signals[:1])  # warm up numba / caches
+
+    start = time.perf_counter()
+    ref = librosa_reference(signals)
+    ref_s = time.perf_counter() - start
+
+    mfcc_mean_batch(signals[:1])
+    start = time.perf_counter()
+    got = mfcc_mean_batch(signals)
+    batch_s = time.perf_counter() - start
+
+    err = float(np.abs(ref - got).max())
+    print(f"🎧 {len(signals)} clips")
+    print(f"📏 max |librosa - batched| = {err:.2e} (tolerance {TOLERANCE})")
+    print(f"🐢 librosa per-file: {ref_s * 1000:.1f} ms")
+    print(f"⚡ batched numpy:    {batch_s * 1000:.1f} ms  ({ref_s / batch_s:.1f}x)")
+    assert got.shape == (len(signals), N_MFCC)
+    assert err < TOLERANCE, "batched MFCC drifted from the librosa reference"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+# benchmarks/bench_pipeline.py  (run from the repo root: python -m benchmarks.bench_pipeline)
+"""
+End-to-end benchmark of the verification pipeline on synthetic fixtures.
+
+1. Times each stage of run_verification_pipeline separately
+   (decode, vad, features, predict, proof) per fixture; the voice stages
+   are the ones verifier.voice_features runs.
+2. Drives POST /verify in-process at several concurrency levels, with IPFS
+   answered by zk_ai_backend.fake_pinata over an in-memory transport.
+
+Results go to a JSON file (tagged with the git commit) so runs can be
+compared with --compare.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import statistics
+import subprocess
+
+# Stubbed IPFS: pinning must be enabled, but nothing leaves the process
+os.environ.setdefault("PINATA_API_KEY", "bench")
+os.environ.setdefault("PINATA_SECRET_API_KEY", "bench")
+os.environ.setdefault("PIN_WRITE_BEHIND", "0")
+
+import numpy as np
+
+from benchmarks.fixtures import build_fixtures
+
+CONCURRENCY = (1, 8, 32)
+
+
+def summarize(samples: list) -> dict:
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "n": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(ms[len(ms) // 2], 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+    }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_stages(fixtures: dict, runs: int) -> dict:
+    from zk_ai_backend.audio_decoder import decode_audio, TARGET_SR
+    from zk_ai_backend.model_registry import registry
+    from zk_ai_backend.zk.zk_generator import generate_proof
+    from voice.features import mfcc_mean
+    from voice.vad import speech_segment
+    from keystroke.test_model import keystroke_features
+
+    registry.load_all()
+    voice_model = registry.get("voice")
+    keystroke_model = registry.get("keystroke")
+    results = {}
+
+    audio_inputs = [(f"wav_{k}", v) for k, v in fixtures["voice"].items()] + \
+                   [(f"webm_{k}", v) for k, v in fixtures["webm"].items()]
+    for name, data in audio_inputs:
+        stages = {"decode": [], "vad": [], "features": [], "predict": []}
+        for _ in range(runs):
+            audio, t = timed(decode_audio, data, TARGET_SR)
+            stages["decode"].append(t)
+            (audio, _), t = timed(speech_segment, audio, TARGET_SR)
+            stages["vad"].append(t)
+            features, t = timed(mfcc_mean, audio, TARGET_SR)
+            stages["features"].append(t)
+            _, t = timed(voice_model.predict, features.reshape(1, -1))
+            stages["predict"].append(t)
+        results[f"voice_{name}"] = {stage: summarize(s) for stage, s in stages.items()}
+
+    for kind, data in fixtures["keystroke"].items():
+        stages = {"features": [], "predict": []}
+        for _ in range(runs):
+            features, t = timed(keystroke_features, data, keystroke_model.n_features_in_)
+            stages["features"].append(t)
+            _, t = timed(keystroke_model.predict, features.reshape(1, -1))
+            stages["predict"].append(t)
+        results[f"keystroke_{kind}"] = {stage: summarize(s) for stage, s in stages.items()}
+
+    proof = [timed(generate_proof, 1, 1)[1] for _ in range(runs)]
+    results["proof"] = {"generate": summarize(proof)}
+    return results
+
+
+async def bench_http(fixtures: dict, requests_per_level: int, levels) -> dict:
+    import httpx
+    import zk_ai_backend.fake_pinata as fake_pinata
+    from zk_ai_backend.app import app
+    from zk_ai_backend.proof_uploader import pinner
+
+    voice = fixtures["voice"]["human"]
+    keystroke = fixtures["keystroke"]["human"]
+    results = {}
+    async with app.router.lifespan_context(app):
+        # Route pinning and gateway reads to the in-process fake Pinata
+        transport = httpx.ASGITransport(app=fake_pinata.app)
+        await pinner._client.aclose()
+        await pinner._gateway.aclose()
+        pinner._client = httpx.AsyncClient(transport=transport, base_url="http://fake-pinata")
+        pinner._gateway = httpx.AsyncClient(transport=transport)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                     timeout=120) as client:
+            async def one():
+                start = time.perf_counter()
+                response = await client.post("/verify", files={
+                    "voice": ("voice.wav", voice, "audio/wav"),
+                    "keystroke": ("keystroke.csv", keystroke, "text/csv"),
+                })
+                return response.status_code, time.perf_counter() - start
+
+            await one()  # warm caches outside the measurement
+            for level in levels:
+                semaphore = asyncio.Semaphore(level)
+
+                async def limited():
+                    async with semaphore:
+                        return await one()
+
+                start = time.perf_counter()
+                outcomes = await asyncio.gather(*(limited() for _ in range(requests_per_level)))
+                elapsed = time.perf_counter() - start
+                ok = [t for status, t in outcomes if status == 200]
+                results[f"concurrency_{level}"] = {
+                    **summarize(ok or [0.0]),
+                    "ok": len(ok),
+                    "errors": len(outcomes) - len(ok),
+                    "requests_per_second": round(len(outcomes) / elapsed, 2),
+                }
+            results["pool"] = (await client.get("/pool")).json()["stages"]
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def p50s(report: dict) -> dict:
+    """
+    Flattens a report into {"stages.voice_wav_human.decode": p50_ms, ...}.
+    """
+    flat = {}
+    for name, stages in report.get("stages", {}).items():
+        for stage, stats in stages.items():
+            flat[f"stages.{name}.{stage}"] = stats["p50_ms"]
+    for name, stats in report.get("http", {}).items():
+        if "p50_ms" in stats:
+            flat[f"http.{name}"] = stats["p50_ms"]
+    return flat
+
+
+def compare(current: dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\n📈 vs {baseline_path} ({baseline.get('commit')})")
+    old = p50s(baseline)
+    for key, value in p50s(current).items():
+        if old.get(key):
+            change = (value - old[key]) / old[key] * 100
+            flag = "⚠️" if change > 10 else "  "
+            print(f"{flag} {key}: p50 {old[key]:.3f} -> {value:.3f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20, help="repetitions per stage")
+    parser.add_argument("--requests", type=int, default=64, help="/verify calls per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=list(CONCURRENCY))
+    parser.add_argument("--seconds", type=float, default=3.0, help="length of the synthetic voice clips")
+    parser.add_argument("--out", default=None, help="JSON output path (default: bench_results/pipeline_<commit>.json)")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to diff p50s against")
+    args = parser.parse_args()
+
+    fixtures = build_fixtures(args.seconds)
+    if not fixtures["webm"]:
+        print("⚠️ ffmpeg not found, skipping WebM fixtures")
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": int(time.time()),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "config": vars(args),
+        "fixtures": {group: sorted(items) for group, items in fixtures.items()},
+    }
+    print("⏱️ Timing pipeline stages...")
+    report["stages"] = bench_stages(fixtures, args.runs)
+    print("🌐 Driving /verify in-process...")
+    report["http"] = asyncio.run(bench_http(fixtures, args.requests, args.concurrency))
+
+    for section in ("stages", "http"):
+        for name, stages in report[section].items():
+            if name == "pool":
+                continue
+            if "p50_ms" in stages:
+                print(f"  {section}.{name}: p50 {stages['p50_ms']} ms, "
+                      f"{stages['requests_per_second']} req/s, {stages['errors']} errors")
+            else:
+                for stage, stats in stages.items():
+                    print(f"  {section}.{name}.{stage}: p50 {stats['p50_ms']} ms, p95 {stats['p95_ms']} ms")
+
+    out = args.out or os.path.join("bench_results", f"pipeline_{commit}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results written to {out}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
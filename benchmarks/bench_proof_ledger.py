@@ -0,0 +1,80 @@
+# benchmarks/bench_proof_ledger.py  (run from the repo root: python -m benchmarks.bench_proof_ledger)
+"""
+Durable proof writes per second: the old one-JSON-file-per-proof layout
+(fsynced, uniquely named so nothing is overwritten) against the proof
+ledger with 1, 16 and 128 concurrent writers sharing group commits.
+Also times index rebuild at open and a one-hour range scan.
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+from zk_ai_backend.proof_ledger import ProofLedger
+from zk_ai_backend.proof_record import ProofRecord
+
+
+def make_proofs(n: int) -> list:
+    # One proof per second, so every hash is distinct
+    now = int(time.time())
+    return [ProofRecord(i % 2, 1, True, now - n + i) for i in range(n)]
+
+
+def run_threads(fn, proofs: list, writers: int) -> float:
+    threads = [threading.Thread(target=lambda chunk=proofs[i::writers]: [fn(p) for p in chunk])
+               for i in range(writers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def bench_files(proofs: list, directory: str, writers: int) -> float:
+    def write(proof):
+        path = os.path.join(directory, f"zk_proof_{proof.timestamp}_{proof.hash[:12]}.json")
+        with open(path, "w") as f:
+            json.dump(proof.to_json(), f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+
+    return run_threads(write, proofs, writers)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--proofs", type=int, default=5000)
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 16, 128])
+    args = parser.parse_args()
+
+    proofs = make_proofs(args.proofs)
+    with tempfile.TemporaryDirectory() as root:
+        for writers in args.writers:
+            directory = os.path.join(root, f"files_{writers}")
+            os.makedirs(directory)
+            elapsed = bench_files(proofs, directory, writers)
+            print(f"📄 files,  {writers:3d} writers: {len(proofs) / elapsed:9.0f} proofs/s")
+
+        for writers in args.writers:
+            ledger = ProofLedger(os.path.join(root, f"ledger_{writers}"), fsync=True).open()
+            elapsed = run_threads(ledger.append, proofs, writers)
+            stats = ledger.stats()
+            ledger.close()
+            print(f"📒 ledger, {writers:3d} writers: {len(proofs) / elapsed:9.0f} proofs/s "
+                  f"({stats['commits']} fsyncs, {stats['mean_batch']} proofs per commit)")
+
+        start = time.perf_counter()
+        reader = ProofLedger(os.path.join(root, f"ledger_{args.writers[-1]}")).open(readonly=True)
+        opened = time.perf_counter() - start
+        start = time.perf_counter()
+        hour = list(reader.range(time.time() - 3600, None))
+        scanned = time.perf_counter() - start
+        print(f"🔎 reopen + index {reader.records} proofs: {opened * 1000:.1f} ms; "
+              f"last-hour scan ({len(hour)} proofs): {scanned * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_proof_record.py  (run from the repo root: python -m benchmarks.bench_proof_record)
+"""
+Binary proof records against the JSON path they replace:
+- size per proof, with and without a Groth16 section
+- build + hash + storage bytes per proof (the old path hashed one JSON
+  encoding and then wrote and pinned a second one, with the hash added)
+- decode back to the API's JSON view
+- the bulk path: a whole batch packed and hashed from result columns
+"""
+import json
+import time
+import random
+import hashlib
+import argparse
+
+from zk_ai_backend.proof_record import ProofRecord, NONCE_BYTES, encode_batch, hash_batch, decode_batch
+
+
+def json_proof(voice: int, keystroke: int, verified: bool, timestamp: int, groth16=None) -> bytes:
+    # What zk_generator + ledger + pinner did before binary records
+    proof = {"voice_result": voice, "keystroke_result": keystroke, "verified": verified, "timestamp": timestamp}
+    if groth16 is not None:
+        proof["groth16"] = groth16
+    proof["hash"] = hashlib.sha256(json.dumps(proof, sort_keys=True).encode()).hexdigest()
+    return json.dumps(proof, sort_keys=True, separators=(",", ":")).encode()
+
+
+def binary_proof(voice: int, keystroke: int, verified: bool, timestamp: int, groth16=None) -> bytes:
+    record = ProofRecord(voice, keystroke, verified, timestamp, groth16)
+    record.hash
+    return record.encode()
+
+
+def fake_groth16(rng: random.Random) -> dict:
+    def field():
+        return "0x" + format(rng.getrandbits(254), "064x")
+
+    return {
+        "scheme": "g16",
+        "curve": "bn128",
+        "proof": {"a": [field(), field()], "b": [[field(), field()], [field(), field()]], "c": [field(), field()]},
+        "inputs": ["0x" + format(1, "064x")],
+    }
+
+
+def rate(fn, items: list) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(*item)
+    return len(items) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--proofs", type=int, default=200_000)
+    parser.add_argument("--groth16", type=int, default=20_000, help="proofs carrying a Groth16 section")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    now = int(time.time())
+    rows = [(rng.randint(0, 1), rng.randint(0, 1), rng.random() < 0.5, now + i) for i in range(args.proofs)]
+    g16_rows = [row + (fake_groth16(rng),) for row in rows[:args.groth16]]
+
+    for label, sample in (("plain", rows[0]), ("groth16", g16_rows[0])):
+        json_size, binary_size = len(json_proof(*sample)), len(binary_proof(*sample))
+        print(f"📏 {label:8s} size: JSON {json_size:4d} B, binary {binary_size:4d} B "
+              f"({json_size / binary_size:.1f}x smaller)")
+
+    for label, items in (("plain", rows), ("groth16", g16_rows)):
+        json_rate, binary_rate = rate(json_proof, items), rate(binary_proof, items)
+        print(f"⚙️ {label:8s} build+hash+encode: JSON {json_rate:10,.0f}/s, binary {binary_rate:10,.0f}/s "
+              f"({binary_rate / json_rate:.1f}x)")
+
+    for label, items in (("plain", rows), ("groth16", g16_rows)):
+        json_blobs = [(json_proof(*row),) for row in items]
+        binary_blobs = [(binary_proof(*row),) for row in items]
+        json_rate = rate(json.loads, json_blobs)
+        binary_rate = rate(ProofRecord.decode, binary_blobs)
+        view_rate = rate(lambda blob: ProofRecord.decode(blob).to_json(), binary_blobs)
+        print(f"🔎 {label:8s} decode: JSON {json_rate:10,.0f}/s, binary {binary_rate:10,.0f}/s "
+              f"(with JSON view {view_rate:10,.0f}/s)")
+
+    voice, keystroke, verified, timestamps = zip(*rows)
+    nonces = rng.randbytes(NONCE_BYTES * len(rows))
+    start = time.perf_counter()
+    buffer = encode_batch(voice, keystroke, verified, timestamps, nonces)
+    hashes = hash_batch(buffer)
+    elapsed = time.perf_counter() - start
+    last = ProofRecord(*rows[-1], nonce=nonces[-NONCE_BYTES:])
+    assert hashes[-1] == last.hash, "❌ bulk hash differs from the per-record hash"
+    assert len(decode_batch(buffer)) == len(rows)
+    print(f"📦 bulk encode+hash: {len(rows) / elapsed:10,.0f}/s "
+          f"({len(buffer) / 1e6:.1f} MB for {len(rows):,} proofs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/bench_vad.py  (run from the repo root: python -m benchmarks.bench_vad)
+"""
+Voice activity detection over the voice_data/ corpus:
+- MFCC frames per clip without and with silence trimming, and the share saved
+- VAD cost against the MFCC time it saves
+- agreement of the served voice model's predictions on trimmed clips (a model
+  trained without trimming is not expected to agree everywhere; retrain with
+  VOICE_VAD_TRIM=1 before serving with it)
+- rejection of silent, noise-only and click-only clips before any model runs
+"""
+import glob
+import time
+import argparse
+
+import numpy as np
+
+from voice.features import SAMPLE_RATE, load_audio, mfcc_mean, n_frames
+from voice.vad import speech_segment, NoSpeechDetected
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def synthetic_clips(seconds: float = 5.0) -> dict:
+    rng = np.random.default_rng(0)
+    n = int(seconds * SAMPLE_RATE)
+    click = np.zeros(n, dtype=np.float32)
+    click[n // 2:n // 2 + 64] = 0.8
+    return {
+        "silence": np.zeros(n, dtype=np.float32),
+        "room noise": (rng.standard_normal(n) * 0.003).astype(np.float32),
+        "click": click,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default="voice_data")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    from zk_ai_backend.model_registry import registry
+
+    model = registry.get("voice")
+    paths = sorted(glob.glob(f"{args.data}/**/*.wav", recursive=True))
+    totals = {"frames": 0, "kept": 0, "vad": 0.0, "mfcc_full": 0.0, "mfcc_trimmed": 0.0}
+    agree = 0
+    mfcc_mean(np.zeros(SAMPLE_RATE, dtype=np.float32))  # build the mel / DCT matrices once
+    for path in paths:
+        audio = load_audio(path)
+        (trimmed, stats), vad_time = timed(speech_segment, audio, SAMPLE_RATE, trim=True)
+        full, full_time = timed(lambda: [mfcc_mean(audio) for _ in range(args.runs)])
+        kept, kept_time = timed(lambda: [mfcc_mean(trimmed) for _ in range(args.runs)])
+        totals["frames"] += n_frames(len(audio))
+        totals["kept"] += n_frames(len(trimmed))
+        totals["vad"] += vad_time
+        totals["mfcc_full"] += full_time / args.runs
+        totals["mfcc_trimmed"] += kept_time / args.runs
+        same = model.predict(full[0].reshape(1, -1))[0] == model.predict(kept[0].reshape(1, -1))[0]
+        agree += same
+        print(f"🎙️ {path}: {n_frames(len(audio))} -> {n_frames(len(trimmed))} frames "
+              f"({stats['speech_seconds']:.2f} s speech of {stats['seconds']:.2f} s)"
+              f"{'' if same else '  ⚠️ prediction changes'}")
+
+    saved = 1 - totals["kept"] / totals["frames"]
+    print(f"\n✂️ {len(paths)} clips: {totals['frames']} -> {totals['kept']} MFCC frames ({saved:.1%} saved)")
+    print(f"⏱️ VAD {totals['vad'] * 1000 / len(paths):.2f} ms/clip; MFCC {totals['mfcc_full'] * 1000 / len(paths):.2f}"
+          f" -> {totals['mfcc_trimmed'] * 1000 / len(paths):.2f} ms/clip")
+    print(f"🤖 served model agrees on {agree}/{len(paths)} trimmed clips")
+
+    for name, audio in synthetic_clips().items():
+        start = time.perf_counter()
+        try:
+            speech_segment(audio, SAMPLE_RATE)
+            print(f"❌ {name}: accepted as speech")
+        except NoSpeechDetected:
+            print(f"🤫 {name}: rejected before the model in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
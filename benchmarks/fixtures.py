@@ -0,0 +1,96 @@
+# benchmarks/fixtures.py
+"""
+Deterministic, offline stand-ins for the recorded samples.
+
+- Voice: a "bot" clip is a steady synthetic tone with flat harmonics, cut
+  into words by short silences (what voice/generate_bot_sample.py gets from
+  gTTS), a "human" clip has a wandering pitch, formant-like noise and
+  pauses. Both carry enough speech to pass voice/vad.py.
+- Keystrokes: bot timings mirror keystroke/generate_fake_bots.py (0.1 s
+  ± 5 ms between keys); human timings are log-normal with slower holds.
+- WebM: the WAV piped through ffmpeg/Opus, or None when ffmpeg is missing.
+"""
+import io
+import shutil
+import subprocess
+import numpy as np
+
+SAMPLE_RATE = 16000
+PHRASE = "hello world"
+
+
+def synth_voice(kind: str, seconds: float = 3.0, sr: int = SAMPLE_RATE, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    if kind == "bot":
+        f0 = 140.0 + np.zeros_like(t)
+        noise = 0.002
+    else:
+        # Slow pitch drift plus vibrato
+        f0 = 120.0 + 30.0 * np.sin(2 * np.pi * 0.7 * t + rng.uniform(0, np.pi)) + 4.0 * np.sin(2 * np.pi * 5.5 * t)
+        noise = 0.02
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    signal = sum(np.sin(k * phase) / k for k in range(1, 8))
+    if kind == "bot":
+        # Hard-gated 0.4 s words with 0.15 s gaps; without them the VAD sees a clip with no noise floor
+        signal = signal * (np.mod(t, 0.55) < 0.4)
+    else:
+        # Syllable-like amplitude envelope with short pauses
+        envelope = np.clip(np.sin(2 * np.pi * 2.5 * t + rng.uniform(0, np.pi)), 0, None) ** 0.5
+        signal = signal * envelope
+    signal = signal + noise * rng.standard_normal(len(t))
+    return (0.3 * signal / np.abs(signal).max()).astype(np.float32)
+
+
+def wav_bytes(signal: np.ndarray, sr: int = SAMPLE_RATE) -> bytes:
+    import scipy.io.wavfile as wav
+
+    buf = io.BytesIO()
+    wav.write(buf, sr, (np.clip(signal, -1, 1) * 32767).astype(np.int16))
+    return buf.getvalue()
+
+
+def webm_bytes(wav_data: bytes):
+    """
+    Opus-in-WebM version of a WAV buffer, or None without ffmpeg.
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return None
+    proc = subprocess.run(
+        [ffmpeg, "-hide_banner", "-loglevel", "error", "-i", "pipe:0", "-c:a", "libopus", "-f", "webm", "pipe:1"],
+        input=wav_data, capture_output=True,
+    )
+    return proc.stdout if proc.returncode == 0 and proc.stdout else None
+
+
+def keystroke_csv(kind: str, phrase: str = PHRASE, seed: int = 0) -> bytes:
+    """
+    A key,event,time upload in milliseconds, like the frontend sends.
+    """
+    rng = np.random.default_rng(seed)
+    lines = ["key,event,time"]
+    t = 0.0
+    for key in phrase.replace(" ", ""):
+        if kind == "bot":
+            gap = rng.uniform(95, 105)
+            hold = rng.uniform(78, 82)
+        else:
+            gap = rng.lognormal(np.log(160), 0.4)
+            hold = rng.lognormal(np.log(95), 0.25)
+        lines += [f"{key},down,{t:.2f}", f"{key},up,{t + hold:.2f}"]
+        t += hold + gap
+    return ("\n".join(lines) + "\n").encode()
+
+
+def build_fixtures(seconds: float = 3.0, seed: int = 0) -> dict:
+    """
+    {"voice": {"human": wav, "bot": wav}, "webm": {...} or {}, "keystroke": {...}}
+    """
+    voice = {kind: wav_bytes(synth_voice(kind, seconds, seed=seed)) for kind in ("human", "bot")}
+    webm = {kind: webm_bytes(data) for kind, data in voice.items()}
+    return {
+        "voice": voice,
+        "webm": {kind: data for kind, data in webm.items() if data is not None},
+        "keystroke": {kind: keystroke_csv(kind, seed=seed) for kind in ("human", "bot")},
+    }
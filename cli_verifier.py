@@ -1,10 +1,43 @@
-from voice.predict_voice import predict_voice_file
-from voice.record_voice import record_voice
-from keystroke.record_keystroke import record_keystroke_and_save
-from keystroke.test_model import predict_keystroke_file
+"""
+🛡️ ZK-AI Identity Verifier, from the command line.
+
+    python cli_verifier.py                                   # record and verify yourself
+    python cli_verifier.py batch voice_data/ data/ --out results.jsonl --workers 4
+    python cli_verifier.py batch --manifest captures.csv --out results.jsonl --shard 0/8
+
+Batch mode verifies recorded datasets offline. Each voice clip (.wav,
+.webm, .ogg) and keystroke CSV under the given directories is one item; a
+manifest CSV (id, voice, keystroke, optional label columns, paths relative
+to the manifest) pairs them instead. Items stream through a process pool
+whose workers load the models once, in chunks with a bounded number in
+flight, and every result is appended to a JSON Lines file as it completes,
+so neither the listing nor the results are ever held in memory.
+
+--shard i/n keeps the items whose id hashes to i, so n machines or
+processes can split one dataset without coordinating; --resume skips ids
+already in the results file after an interruption.
+"""
+import os
+import sys
+import csv
+import json
 import time
+import zlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+VOICE_EXTENSIONS = (".wav", ".webm", ".ogg")
+KEYSTROKE_EXTENSIONS = (".csv",)
+BATCH_CHUNK = 64
+
 
 def verify_identity():
+    # Recording needs a microphone and a terminal; batch mode never imports these
+    from voice.predict_voice import predict_voice_file
+    from voice.record_voice import record_voice
+    from keystroke.record_keystroke import record_keystroke_and_save
+    from keystroke.test_model import predict_keystroke_file
+
     print("\n🛡️ Welcome to ZK-AI Identity Verifier")
 
     # Step 1: Record voice (real-time)
@@ -32,5 +65,238 @@ def verify_identity():
     else:
         print("❌ Access Denied: Bot behavior detected")
 
-if __name__ == "__main__":
+
+# 📂 Item sources (generators, so millions of files never sit in a list) --------
+
+def label_from_path(path: str):
+    """
+    1 / 0 when a directory or file name says human / bot (the training
+    layout of voice_data/ and data/), else None.
+    """
+    for part in reversed(os.path.normpath(path).lower().split(os.sep)):
+        if "human" in part:
+            return 1
+        if "bot" in part:
+            return 0
+    return None
+
+
+def _walk(directory: str):
+    # scandir streams entries; each directory is sorted only so reruns list items in the same order
+    stack = [directory]
+    while stack:
+        folder = stack.pop()
+        with os.scandir(folder) as entries:
+            names = sorted((entry.name, entry.is_dir()) for entry in entries)
+        stack.extend(os.path.join(folder, name) for name, is_dir in reversed(names) if is_dir)
+        for name, is_dir in names:
+            if not is_dir:
+                yield os.path.join(folder, name)
+
+
+def items_from_directories(directories: list):
+    for directory in directories:
+        for path in _walk(directory):
+            ext = os.path.splitext(path)[1].lower()
+            if ext in VOICE_EXTENSIONS:
+                yield {"id": path, "voice": path, "keystroke": None, "label": label_from_path(path)}
+            elif ext in KEYSTROKE_EXTENSIONS:
+                yield {"id": path, "voice": None, "keystroke": path, "label": label_from_path(path)}
+
+
+def items_from_manifest(manifest: str):
+    base = os.path.dirname(os.path.abspath(manifest))
+    with open(manifest, newline="") as f:
+        for row in csv.DictReader(f):
+            paths = {m: os.path.join(base, row[m]) if row.get(m) else None for m in ("voice", "keystroke")}
+            path = paths["voice"] or paths["keystroke"]
+            label = row.get("label")
+            yield {
+                "id": row.get("id") or path,
+                **paths,
+                "label": int(label) if label not in (None, "") else label_from_path(path),
+            }
+
+
+def in_shard(item_id: str, shard: tuple) -> bool:
+    index, count = shard
+    return count == 1 or zlib.crc32(item_id.encode()) % count == index
+
+
+def parse_shard(spec: str) -> tuple:
+    try:
+        index, count = (int(x) for x in spec.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"❌ --shard takes i/n, got {spec!r}") from None
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"❌ Shard index must be in [0, {count}), got {index}")
+    return index, count
+
+
+# ⚙️ Workers ------------------------------------------------------------------
+
+def _init_batch_worker():
+    # 📦 Models and feature matrices load once per worker, not once per item
+    from voice.features import mel_basis, dct_basis
+    from zk_ai_backend.model_registry import registry
+
+    mel_basis()
+    dct_basis()
+    registry.load_all()
+
+
+def verify_chunk(items: list) -> list:
+    """
+    Scores every modality each item has. Failures are reported per item.
+    """
+    from zk_ai_backend.verifier import score_voice, score_keystroke
+
+    scorers = {"voice": score_voice, "keystroke": score_keystroke}
+    results = []
+    for item in items:
+        result = dict(item)
+        for modality, score in scorers.items():
+            result[f"{modality}_result"] = None
+            if not item[modality]:
+                continue
+            start = time.perf_counter()
+            try:
+                with open(item[modality], "rb") as f:
+                    result[f"{modality}_result"] = int(score(f.read()))
+            except Exception as e:
+                result["error"] = f"{modality}: {e}"
+            result[f"{modality}_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        results.append(result)
+    return results
+
+
+def _chunks(items, size: int):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _completed_ids(path: str) -> set:
+    """
+    Ids already in a results file. A torn last line from an interrupted run
+    is cut off so new results append cleanly.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    complete = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                done.add(json.loads(line)["id"])
+            except (ValueError, KeyError):
+                pass
+            complete += len(line)
+    if complete < os.path.getsize(path):
+        os.truncate(path, complete)
+    return done
+
+
+def run_batch(items, out: str, workers: int, chunk: int, policy) -> dict:
+    """
+    Streams `items` through the pool and appends results to `out`.
+    Returns summary counters.
+    """
+    summary = {"items": 0, "errors": 0, "human": 0, "bot": 0, "correct": {}, "labelled": {}}
+
+    def record(results, f):
+        for result in results:
+            observed = {m: result[f"{m}_result"] for m in ("voice", "keystroke") if result[m]}
+            verdict = policy.decide({"voice": None, "keystroke": None, **observed}, set()) \
+                if "error" not in result else None
+            result["verified"] = verdict
+            f.write(json.dumps(result) + "\n")
+            summary["items"] += 1
+            if verdict is None:
+                summary["errors"] += 1
+                continue
+            summary["human" if verdict else "bot"] += 1
+            if result["label"] is not None:
+                for name, value in (*observed.items(), ("verified", int(verdict))):
+                    summary["labelled"][name] = summary["labelled"].get(name, 0) + 1
+                    summary["correct"][name] = summary["correct"].get(name, 0) + (value == result["label"])
+
+    with open(out, "a") as f:
+        if workers <= 1:
+            _init_batch_worker()
+            for batch in _chunks(items, chunk):
+                record(verify_chunk(batch), f)
+            return summary
+
+        # A few chunks per worker in flight keeps every process busy without buffering the dataset
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker) as executor:
+            pending = set()
+            for batch in _chunks(items, chunk):
+                pending.add(executor.submit(verify_chunk, batch))
+                if len(pending) >= workers * 4:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record(future.result(), f)
+            for future in pending:
+                record(future.result(), f)
+    return summary
+
+
+def batch(args) -> int:
+    from zk_ai_backend.decision import parse_policy
+
+    if not args.paths and not args.manifest:
+        print("❌ Give directories to scan or --manifest.")
+        return 1
+    items = items_from_manifest(args.manifest) if args.manifest else items_from_directories(args.paths)
+    items = (item for item in items if in_shard(item["id"], args.shard))
+    if args.resume:
+        done = _completed_ids(args.out)
+        print(f"⏭️ Resuming: {len(done)} items already in {args.out}")
+        items = (item for item in items if item["id"] not in done)
+    elif os.path.exists(args.out):
+        os.remove(args.out)
+
+    start = time.perf_counter()
+    summary = run_batch(items, args.out, args.workers, args.chunk, parse_policy(args.policy))
+    elapsed = time.perf_counter() - start
+
+    print(f"\n🧾 {summary['items']} items in {elapsed:.2f}s ({summary['items'] / max(elapsed, 1e-9):.1f} items/s, "
+          f"{args.workers} worker(s), shard {args.shard[0]}/{args.shard[1]}) -> {args.out}")
+    print(f"🧑 human {summary['human']}  🤖 bot {summary['bot']}  ❌ errors {summary['errors']}")
+    for name, total in summary["labelled"].items():
+        print(f"🎯 {name} accuracy on labelled items: {summary['correct'][name] / total:.3f} ({total})")
+    return 0
+
+
+def main() -> int:
+    from zk_ai_backend.decision import VERIFY_POLICY
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command")
+    bulk = commands.add_parser("batch", help="verify recorded voice clips and keystroke CSVs offline")
+    bulk.add_argument("paths", nargs="*", help="directories to scan, e.g. voice_data/ data/")
+    bulk.add_argument("--manifest", help="CSV with id, voice, keystroke[, label] columns")
+    bulk.add_argument("--out", default="verify_results.jsonl", help="JSON Lines results file")
+    bulk.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (1 = in-process)")
+    bulk.add_argument("--chunk", type=int, default=BATCH_CHUNK, help="items per pool task")
+    bulk.add_argument("--shard", type=parse_shard, default=(0, 1), help="i/n: only this slice of the items")
+    bulk.add_argument("--resume", action="store_true", help="skip items already in --out")
+    bulk.add_argument("--policy", default=VERIFY_POLICY, help="decision policy name or JSON spec")
+    args = parser.parse_args()
+
+    if args.command == "batch":
+        return batch(args)
     verify_identity()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
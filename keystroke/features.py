@@ -0,0 +1,213 @@
+# keystroke/features.py
+"""
+Fixed-size keystroke features for samples of any length.
+
+Every sample is reduced to the same vector, so one model serves any
+passphrase length:
+
+- down-down (digraph) latency statistics and a log-spaced histogram,
+- rhythm entropy (normalised Shannon entropy of that histogram),
+- hold-time and up-down latency statistics, plus a flag saying whether
+  press/release times were available at all.
+
+Interval-only recordings (data/*.csv, record_keystroke.py) carry no hold
+times; their hold/up-down block is zero with the flag off. Samples are
+processed as one contiguous value array plus offsets, so a whole corpus is
+featurised in a handful of NumPy calls.
+"""
+import os
+
+import numpy as np
+
+from keystroke.parser import KeystrokeFormatError, parse_presses, hold_times, down_down, up_down
+
+# Uploads from the frontend are in milliseconds, the corpus in seconds
+UPLOAD_TIME_SCALE = 1e-3
+MIN_PRESSES = 3
+# Digraph latency histogram edges in seconds (log-spaced, open-ended ends)
+HIST_EDGES = np.geomspace(0.03, 2.0, 11)
+N_BINS = len(HIST_EDGES) + 1
+STATS = ("mean", "std", "median", "min", "max", "cv")
+
+FEATURE_NAMES = (
+    [f"dd_{s}" for s in STATS]
+    + [f"dd_hist_{i}" for i in range(N_BINS)]
+    + ["rhythm_entropy"]
+    + [f"hold_{s}" for s in STATS]
+    + [f"ud_{s}" for s in STATS]
+    + ["has_press_times", "log_presses"]
+)
+N_FEATURES = len(FEATURE_NAMES)
+
+
+def _segment_ids(offsets: np.ndarray) -> np.ndarray:
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def segment_stats(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Per-segment STATS for values[offsets[i]:offsets[i+1]]; shape (n, len(STATS)).
+    Empty segments give zeros.
+    """
+    n = len(offsets) - 1
+    out = np.zeros((n, len(STATS)))
+    lengths = np.diff(offsets)
+    filled = lengths > 0
+    if not filled.any():
+        return out
+    ids = _segment_ids(offsets)
+    count = np.maximum(lengths, 1)
+    mean = np.bincount(ids, values, minlength=n) / count
+    var = np.bincount(ids, (values - mean[ids]) ** 2, minlength=n) / count
+
+    # Sort inside each segment once for min / max / median
+    order = np.lexsort((values, ids))
+    ordered = values[order]
+    starts = offsets[:-1][filled]
+    ends = offsets[1:][filled] - 1
+    lo = starts + (lengths[filled] - 1) // 2
+    hi = starts + lengths[filled] // 2
+
+    out[:, 0] = mean
+    out[:, 1] = np.sqrt(var)
+    out[filled, 2] = (ordered[lo] + ordered[hi]) / 2
+    out[filled, 3] = ordered[starts]
+    out[filled, 4] = ordered[ends]
+    out[:, 5] = np.divide(out[:, 1], mean, out=np.zeros(n), where=mean > 0)
+    out[~filled] = 0.0
+    return out
+
+
+def segment_histogram(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Per-segment fraction of values in each HIST_EDGES bin; shape (n, N_BINS).
+    """
+    n = len(offsets) - 1
+    bins = np.searchsorted(HIST_EDGES, values)
+    counts = np.bincount(_segment_ids(offsets) * N_BINS + bins, minlength=n * N_BINS)
+    counts = counts.reshape(n, N_BINS).astype(np.float64)
+    totals = counts.sum(axis=1, keepdims=True)
+    return np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+
+
+def rhythm_entropy(histogram: np.ndarray) -> np.ndarray:
+    """
+    Shannon entropy of each histogram row, scaled to [0, 1].
+    """
+    logs = np.log(histogram, out=np.zeros_like(histogram), where=histogram > 0)
+    return -(histogram * logs).sum(axis=1) / np.log(N_BINS)
+
+
+def features_batch(dd, dd_offsets, hold=None, hold_offsets=None, ud=None, ud_offsets=None) -> np.ndarray:
+    """
+    Features for n samples given as contiguous value arrays plus offsets
+    (CSR layout). Hold / up-down arrays may be omitted for interval-only data.
+    Returns shape (n, N_FEATURES).
+    """
+    dd = np.asarray(dd, dtype=np.float64)
+    dd_offsets = np.asarray(dd_offsets)
+    n = len(dd_offsets) - 1
+    out = np.zeros((n, N_FEATURES))
+
+    histogram = segment_histogram(dd, dd_offsets)
+    k = len(STATS)
+    out[:, :k] = segment_stats(dd, dd_offsets)
+    out[:, k:k + N_BINS] = histogram
+    out[:, k + N_BINS] = rhythm_entropy(histogram)
+    col = k + N_BINS + 1
+    if hold is not None:
+        hold_offsets = np.asarray(hold_offsets)
+        out[:, col:col + k] = segment_stats(np.asarray(hold, dtype=np.float64), hold_offsets)
+        out[:, col + k:col + 2 * k] = segment_stats(np.asarray(ud, dtype=np.float64), np.asarray(ud_offsets))
+        out[:, col + 2 * k] = np.diff(hold_offsets) > 0
+    # Presses = intervals + 1
+    out[:, col + 2 * k + 1] = np.log1p(np.diff(dd_offsets) + 1)
+    return out
+
+
+def features_from_times(times: np.ndarray, scale: float = UPLOAD_TIME_SCALE) -> np.ndarray:
+    """
+    Features for one sample of [down, up] press times. Returns shape (N_FEATURES,).
+    """
+    if len(times) < MIN_PRESSES:
+        raise KeystrokeFormatError(f"⚠️ Too few key presses (got {len(times)}, need at least {MIN_PRESSES}).")
+    times = times * scale
+    dd, hold, ud = down_down(times), hold_times(times), up_down(times)
+    return features_batch(
+        dd, [0, len(dd)], hold, [0, len(hold)], ud, [0, len(ud)]
+    )[0]
+
+
+def features_from_intervals(intervals) -> np.ndarray:
+    """
+    Features for one interval-only sample (down-down deltas in seconds).
+    """
+    intervals = np.asarray(intervals, dtype=np.float64).reshape(-1)
+    if len(intervals) < MIN_PRESSES - 1:
+        raise KeystrokeFormatError(f"⚠️ Too few key presses (got {len(intervals) + 1}, need at least {MIN_PRESSES}).")
+    return features_batch(intervals, [0, len(intervals)])[0]
+
+
+def is_event_csv(data: bytes) -> bool:
+    return data.lstrip().lower().startswith(b"key,")
+
+
+def parse_intervals(data: bytes) -> np.ndarray:
+    try:
+        return np.array(data.split(), dtype=np.float64)
+    except ValueError:
+        raise KeystrokeFormatError("⚠️ CSV format invalid. Expected key,event,time rows or one interval per line.") from None
+
+
+def features_from_csv(data: bytes) -> np.ndarray:
+    """
+    Features for a key,event,time upload or an interval-only recording.
+    """
+    if is_event_csv(data):
+        _, times = parse_presses(data)
+        return features_from_times(times)
+    return features_from_intervals(parse_intervals(data))
+
+
+def load_corpus(data_dir: str = "data"):
+    """
+    Reads every CSV in `data_dir` into one feature matrix.
+    Interval files (one delta in seconds per line) are parsed in a single
+    pass over their joined text; key,event,time files go through the parser.
+    Labels: 1 if "human" is in the file name, else 0.
+    """
+    names = sorted(f for f in os.listdir(data_dir) if f.endswith(".csv"))
+    interval_chunks, interval_labels, interval_lengths = [], [], []
+    event_rows, event_labels = [], []
+    for name in names:
+        with open(os.path.join(data_dir, name), "rb") as f:
+            data = f.read()
+        label = 1 if "human" in name else 0
+        if is_event_csv(data):
+            _, times = parse_presses(data)
+            if len(times) < MIN_PRESSES:
+                print(f"⚠️ Skipped {name} ({len(times)} presses)")
+                continue
+            event_rows.append(features_from_times(times))
+            event_labels.append(label)
+        else:
+            lines = data.split()
+            if len(lines) < MIN_PRESSES - 1:
+                print(f"⚠️ Skipped {name} (length {len(lines)})")
+                continue
+            interval_chunks.append(data.strip())
+            interval_lengths.append(len(lines))
+            interval_labels.append(label)
+
+    parts, labels = [], []
+    if interval_chunks:
+        values = parse_intervals(b"\n".join(interval_chunks))
+        offsets = np.concatenate([[0], np.cumsum(interval_lengths)])
+        parts.append(features_batch(values, offsets))
+        labels += interval_labels
+    if event_rows:
+        parts.append(np.vstack(event_rows))
+        labels += event_labels
+    if not parts:
+        return np.empty((0, N_FEATURES)), np.empty(0, dtype=int)
+    return np.vstack(parts), np.array(labels)
@@ -0,0 +1,85 @@
+# keystroke/parser.py
+"""
+Single-pass parser for `key,event,time` keystroke logs.
+
+Each down event is paired with the next up event of the same key, so
+overlapping presses (rolling into the next key before releasing) pair
+correctly. Presses are kept in the order their keys went down.
+"""
+import numpy as np
+
+HEADER = (b"key", b"event", b"time")
+
+
+class KeystrokeFormatError(ValueError):
+    pass
+
+
+def _rows(lines: list):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        # rsplit so a quoted "," key still parses
+        parts = line.rsplit(b",", 2)
+        if len(parts) != 3:
+            raise KeystrokeFormatError(f"⚠️ Malformed keystroke row: {line[:40]!r}")
+        yield parts
+
+
+def parse_presses(data: bytes):
+    """
+    Returns (keys, times) where times is a float64 array of shape (n, 2)
+    holding [down, up] per press.
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    lines = data.splitlines()
+    rows = _rows(lines)
+    header = next(rows, None)
+    if header is None or tuple(p.strip().lower() for p in header) != HEADER:
+        raise KeystrokeFormatError("⚠️ CSV format invalid. Expected columns: key, event, time")
+
+    # At most one press per line; counted like splitlines() so CR-only logs and unmatched downs fit
+    times = np.empty((len(lines), 2), dtype=np.float64)
+    keys = []
+    held = {}
+    n = 0
+    for key, event, t in rows:
+        key = key.strip().strip(b'"')
+        event = event.strip()
+        try:
+            t = float(t)
+        except ValueError:
+            raise KeystrokeFormatError(f"⚠️ Invalid keystroke time {t[:20]!r}") from None
+        if event == b"down":
+            if key in held:
+                continue  # auto-repeat while the key is still held
+            held[key] = n
+            times[n, 0] = t
+            keys.append(key.decode(errors="replace"))
+            n += 1
+        elif event == b"up":
+            index = held.pop(key, None)
+            if index is None:
+                raise KeystrokeFormatError(f"⚠️ Key up without key down for {key.decode(errors='replace')!r}.")
+            times[index, 1] = t
+        else:
+            raise KeystrokeFormatError(f"⚠️ Unknown keystroke event {event[:20]!r}")
+
+    if held:
+        raise KeystrokeFormatError("⚠️ Mismatched number of key down/up events.")
+    return keys, times[:n]
+
+
+def hold_times(times: np.ndarray) -> np.ndarray:
+    return times[:, 1] - times[:, 0]
+
+
+def down_down(times: np.ndarray) -> np.ndarray:
+    return np.diff(times[:, 0])
+
+
+def up_down(times: np.ndarray) -> np.ndarray:
+    # Negative when the next key goes down before the previous one is released
+    return times[1:, 0] - times[:-1, 1]
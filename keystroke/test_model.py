@@ -1,35 +1,60 @@
 #test_model.py
 
-import joblib
-import numpy as np
-import pandas as pd
 import os
+from keystroke.parser import KeystrokeFormatError, parse_presses, hold_times
+from keystroke.features import N_FEATURES, features_from_csv, is_event_csv, parse_intervals
 
 MODEL_PATH = "models/keystroke_model.joblib"
+# Models trained before keystroke.features took exactly 10 values
+LEGACY_N_FEATURES = 10
+
+def read_keystroke_bytes(source) -> bytes:
+    """
+    Accepts raw upload bytes, a path, or any binary/text file-like object.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, "read"):
+        data = source.read()
+        return data.encode() if isinstance(data, str) else data
+    with open(source, "rb") as f:
+        return f.read()
+
+def legacy_features(data: bytes):
+    """
+    The original 10-value input: hold durations of a key,event,time upload,
+    or the raw intervals of a record_keystroke.py file.
+    """
+    if not is_event_csv(data):
+        values = parse_intervals(data)
+    else:
+        _, times = parse_presses(data)
+        # Feature 1: Hold durations (up - down of the same key press)
+        values = hold_times(times)
+
+    if len(values) != LEGACY_N_FEATURES:
+        raise KeystrokeFormatError(f"⚠️ Invalid keystroke sample length (got {len(values)}, expected {LEGACY_N_FEATURES} values).")
+    return values
+
+def keystroke_features(source, n_features=N_FEATURES):
+    """
+    Feature row for a keystroke sample given as bytes, a path or a file-like object.
+    `n_features` is the model's n_features_in_, so legacy 10-feature models keep working.
+    """
+    data = read_keystroke_bytes(source)
+    if n_features == LEGACY_N_FEATURES:
+        return legacy_features(data)
+    if n_features != N_FEATURES:
+        raise ValueError(f"❌ Keystroke model expects {n_features} features; this build produces {N_FEATURES}.")
+    return features_from_csv(data)
 
 def predict_keystroke_file(file_path, model=None):
     if model is None:
         if not os.path.exists(MODEL_PATH):
             raise FileNotFoundError("❌ Keystroke model not found.")
-        model = joblib.load(MODEL_PATH)
-
-    df = pd.read_csv(file_path)
-
-    # Sanity check: ensure the structure is right
-    if not set(['key', 'event', 'time']).issubset(df.columns):
-        raise ValueError("⚠️ CSV format invalid. Expected columns: key, event, time")
-
-    key_downs = df[df['event'] == 'down'].reset_index(drop=True)
-    key_ups = df[df['event'] == 'up'].reset_index(drop=True)
+        import joblib
 
-    if len(key_downs) != len(key_ups):
-        raise ValueError("⚠️ Mismatched number of key down/up events.")
-
-    if len(key_downs) != 10:
-        raise ValueError(f"⚠️ Invalid keystroke sample length (got {len(key_downs)}, expected 10 key presses).")
-
-    # Feature 1: Hold durations (key_ups.time - key_downs.time)
-    hold_durations = key_ups['time'].values - key_downs['time'].values
-    X = hold_durations.reshape(1, -1)
+        model = joblib.load(MODEL_PATH)
 
+    X = keystroke_features(file_path, model.n_features_in_).reshape(1, -1)
     return model.predict(X)[0]  # 0 = Bot, 1 = Human
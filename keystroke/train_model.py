@@ -1,35 +1,22 @@
 import os
-import pandas as pd
 import numpy as np
 from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
+from keystroke.features import load_corpus, N_FEATURES
 
 def load_data(data_dir="data"):
-    X = []
-    y = []
-
-    for file in os.listdir(data_dir):
-        if file.endswith(".csv"):
-            path = os.path.join(data_dir, file)
-            df = pd.read_csv(path, header=None).squeeze()
-
-            if len(df) == 10:  # Only use samples with exactly 10 intervals
-                X.append(df.to_numpy())
-                label = 1 if "human" in file else 0
-                y.append(label)
-            else:
-                print(f"⚠️ Skipped {file} (length {len(df)})")
-
-    return np.array(X), np.array(y)
+    # Any sample length: every CSV becomes one fixed-size keystroke.features row
+    return load_corpus(data_dir)
 
 def train():
     X, y = load_data()
 
-    print(f"Loaded {len(X)} samples")
+    print(f"Loaded {len(X)} samples ({N_FEATURES} features each)")
 
-    model = LogisticRegression()
+    model = make_pipeline(StandardScaler(), LogisticRegression())
     model.fit(X, y)
 
     y_pred = model.predict(X)
@@ -43,7 +30,7 @@ def train():
     print("💾 Model saved to models/keystroke_model.joblib")
 
     # Save feature weights
-    np.save("models/keystroke_feature_weights.npy", model.coef_)
+    np.save("models/keystroke_feature_weights.npy", model[-1].coef_)
     print("📊 Feature weights saved to models/keystroke_feature_weights.npy")
 
 if __name__ == "__main__":
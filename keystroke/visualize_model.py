@@ -1,5 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from keystroke.features import FEATURE_NAMES
 
 # Load feature weights
 weights = np.load("models/keystroke_feature_weights.npy")[0]
@@ -7,7 +8,11 @@ weights = np.load("models/keystroke_feature_weights.npy")[0]
 # Plotting
 plt.figure(figsize=(10, 4))
 plt.bar(range(1, len(weights)+1), weights, color="skyblue")
-plt.xlabel("Keystroke Interval Position (1–10)")
+if len(weights) == len(FEATURE_NAMES):
+    plt.xticks(range(1, len(weights)+1), FEATURE_NAMES, rotation=90)
+    plt.xlabel("Keystroke Feature")
+else:
+    plt.xlabel("Keystroke Interval Position (1–10)")
 plt.ylabel("Weight (Importance)")
 plt.title("🔍 Keystroke Feature Importance (Logistic Regression)")
 plt.grid(True)
@@ -0,0 +1,67 @@
+"""
+🧾 Batch-verify Groth16 proofs off-chain against verification.key.
+
+    python verify_proofs.py proof.json <cid>.zkp zk_proofs/ --workers 4
+
+Accepts proof.json files, backend proofs carrying a Groth16 section (binary
+.zkp records as stored and pinned, or older JSON ones with a "groth16"
+field), directories of any of these, or JSON files holding a list of proofs.
+"""
+import os
+import sys
+import time
+import argparse
+
+from zk_ai_backend.zk.batch_verifier import verify_batch, ZK_VERIFICATION_KEY_PATH
+from zk_ai_backend.proof_record import load_json
+
+PROOF_EXTENSIONS = (".json", ".zkp")
+
+
+def collect_proofs(paths: list) -> list:
+    """
+    Returns [(label, proof_dict)] for every proof found under `paths`.
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(os.path.join(path, n) for n in os.listdir(path) if n.endswith(PROOF_EXTENSIONS))
+        else:
+            files = [path]
+        for file_path in files:
+            # Binary records decode to the same JSON view the API returns
+            with open(file_path, "rb") as f:
+                data = load_json(f.read())
+            if isinstance(data, list):
+                found += [(f"{file_path}[{i}]", proof) for i, proof in enumerate(data)]
+            else:
+                found.append((file_path, data))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="proof files or directories")
+    parser.add_argument("--vk", default=ZK_VERIFICATION_KEY_PATH, help="ZoKrates verification.key")
+    parser.add_argument("--workers", type=int, default=1, help="processes to shard large batches over")
+    args = parser.parse_args()
+
+    proofs = collect_proofs(args.paths)
+    if not proofs:
+        print("❌ No proofs found.")
+        return 1
+
+    start = time.perf_counter()
+    results = verify_batch([p for _, p in proofs], workers=args.workers, verification_key_path=args.vk)
+    elapsed = time.perf_counter() - start
+
+    for (label, _), ok in zip(proofs, results):
+        print(f"{'✅' if ok else '❌'} {label}")
+    valid = sum(results)
+    print(f"\n🧾 {valid}/{len(results)} proofs valid in {elapsed:.2f}s "
+          f"({len(results) / elapsed:.2f} proofs/s, {args.workers} worker(s))")
+    return 0 if valid == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# voice/feature_store.py
+"""
+On-disk cache of voice training features.
+
+Rows live in a memory-mapped `features.npy`; `index.json` maps each clip
+path to its row plus the file size and mtime it was computed from. The whole
+store is tied to feature_config_hash(), so changing any MFCC setting
+invalidates it. Missing or changed clips are featurised across a process pool.
+"""
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from voice.features import N_MFCC, BATCH_SIZE, feature_config_hash, load_audio, mfcc_mean_batch, speech_audio
+
+FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR", ".feature_store/voice")
+
+
+def _file_key(path: str) -> dict:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _extract_chunk(paths: list) -> list:
+    """
+    Worker: [(row or None, error or None)] for one chunk of files.
+    """
+    signals, loaded, results = [], [], [(None, None)] * len(paths)
+    for i, path in enumerate(paths):
+        try:
+            # Clips without speech fail here, like unreadable ones
+            signals.append(speech_audio(load_audio(path)))
+            loaded.append(i)
+        except Exception as e:
+            results[i] = (None, str(e))
+    if signals:
+        for i, row in zip(loaded, mfcc_mean_batch(signals)):
+            results[i] = (row, None)
+    return results
+
+
+class FeatureStore:
+    def __init__(self, directory: str = FEATURE_STORE_DIR):
+        self.directory = directory
+        self.features_path = os.path.join(directory, "features.npy")
+        self.index_path = os.path.join(directory, "index.json")
+        self.config_hash = feature_config_hash()
+
+    def _load(self):
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+            if index.get("config_hash") != self.config_hash:
+                print("♻️ Feature config changed, rebuilding feature store")
+                return {}, None
+            return index["files"], np.load(self.features_path, mmap_mode="r")
+        except (OSError, ValueError, KeyError):
+            return {}, None
+
+    def _save(self, files: dict, features: np.ndarray):
+        os.makedirs(self.directory, exist_ok=True)
+        # Write both files beside the originals, then swap them in
+        tmp_features = self.features_path + ".tmp.npy"
+        np.save(tmp_features, features)
+        tmp_index = self.index_path + ".tmp"
+        with open(tmp_index, "w") as f:
+            json.dump({"config_hash": self.config_hash, "files": files}, f)
+        os.replace(tmp_features, self.features_path)
+        os.replace(tmp_index, self.index_path)
+
+    def build(self, paths: list, n_jobs: int = None, batch_size: int = BATCH_SIZE):
+        """
+        Returns (X, kept_paths, stats) for `paths`, recomputing only new or
+        changed files. Files that fail to load are reported and left out.
+        """
+        cached_files, cached = self._load()
+        keys = {p: _file_key(p) for p in paths}
+
+        rows = {}
+        todo = []
+        for path in paths:
+            entry = cached_files.get(path)
+            if entry is not None and cached is not None and \
+                    entry["size"] == keys[path]["size"] and entry["mtime_ns"] == keys[path]["mtime_ns"]:
+                rows[path] = np.asarray(cached[entry["row"]])
+            else:
+                todo.append(path)
+
+        failed = {}
+        start = time.perf_counter()
+        if todo:
+            workers = n_jobs or os.cpu_count() or 1
+            # Small reruns still spread across every worker
+            size = max(1, min(batch_size, -(-len(todo) // workers)))
+            chunks = [todo[i:i + size] for i in range(0, len(todo), size)]
+            if workers == 1 or len(chunks) == 1:
+                results = list(map(_extract_chunk, chunks))
+            else:
+                with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+                    results = list(executor.map(_extract_chunk, chunks))
+            for chunk, chunk_results in zip(chunks, results):
+                for path, (row, error) in zip(chunk, chunk_results):
+                    if error is None:
+                        rows[path] = row
+                    else:
+                        failed[path] = error
+        elapsed = time.perf_counter() - start
+
+        kept = [p for p in paths if p in rows]
+        X = np.empty((len(kept), N_MFCC), dtype=np.float32)
+        for i, path in enumerate(kept):
+            X[i] = rows[path]
+        if todo or len(cached_files) != len(kept):
+            self._save({p: {"row": i, **keys[p]} for i, p in enumerate(kept)}, X)
+
+        computed = len(todo) - len(failed)
+        stats = {
+            "files": len(paths),
+            "cached": len(kept) - computed,
+            "computed": computed,
+            "failed": failed,
+            "extract_seconds": elapsed,
+            "files_per_second": computed / elapsed if computed and elapsed > 0 else None,
+        }
+        return X, kept, stats
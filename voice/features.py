@@ -0,0 +1,193 @@
+# voice/features.py
+"""
+Batched MFCC-mean features shared by training and inference.
+
+Reproduces librosa.feature.mfcc(y, sr=16000, n_mfcc=13) with librosa's
+defaults (2048-point Hann STFT, hop 512, zero-padded centering, 128 Slaney
+mel bands, power_to_db with top_db=80, orthonormal DCT-II), but runs a whole
+batch through one NumPy pass with the mel and DCT matrices built once.
+Clips pass through voice.vad.speech_segment first (`speech_audio`).
+"""
+import hashlib
+import json
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from voice.vad import speech_segment, vad_config
+
+SAMPLE_RATE = 16000
+N_MFCC = 13
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+TOP_DB = 80.0
+AMIN = 1e-10
+BATCH_SIZE = 32
+
+
+def feature_config() -> dict:
+    return {
+        "sample_rate": SAMPLE_RATE,
+        "n_mfcc": N_MFCC,
+        "n_fft": N_FFT,
+        "hop_length": HOP_LENGTH,
+        "n_mels": N_MELS,
+        "top_db": TOP_DB,
+        "vad": vad_config(),
+    }
+
+
+def feature_config_hash() -> str:
+    """
+    Short digest of the feature settings, for invalidating cached features.
+    """
+    blob = json.dumps(feature_config(), sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+def _hz_to_mel(freqs):
+    # Slaney scale: linear below 1 kHz, logarithmic above
+    freqs = np.asanyarray(freqs, dtype=np.float64)
+    f_sp = 200.0 / 3
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+    mels = freqs / f_sp
+    log_t = freqs >= min_log_hz
+    mels = np.where(log_t, min_log_mel + np.log(np.maximum(freqs, min_log_hz) / min_log_hz) / logstep, mels)
+    return mels
+
+
+def _mel_to_hz(mels):
+    mels = np.asanyarray(mels, dtype=np.float64)
+    f_sp = 200.0 / 3
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+    freqs = f_sp * mels
+    log_t = mels >= min_log_mel
+    return np.where(log_t, min_log_hz * np.exp(logstep * (mels - min_log_mel)), freqs)
+
+
+@lru_cache(maxsize=8)
+def mel_basis(sr: int = SAMPLE_RATE, n_fft: int = N_FFT, n_mels: int = N_MELS) -> np.ndarray:
+    """
+    Slaney-normalised mel filterbank, shape (n_mels, 1 + n_fft // 2).
+    """
+    fftfreqs = np.fft.rfftfreq(n_fft, 1.0 / sr)
+    mel_f = _mel_to_hz(np.linspace(_hz_to_mel(0.0), _hz_to_mel(sr / 2.0), n_mels + 2))
+    fdiff = np.diff(mel_f)
+    ramps = np.subtract.outer(mel_f, fftfreqs)
+
+    lower = -ramps[:-2] / fdiff[:-1, None]
+    upper = ramps[2:] / fdiff[1:, None]
+    weights = np.maximum(0, np.minimum(lower, upper))
+    weights *= (2.0 / (mel_f[2:n_mels + 2] - mel_f[:n_mels]))[:, None]
+    weights = weights.astype(np.float32)
+    weights.setflags(write=False)
+    return weights
+
+
+@lru_cache(maxsize=8)
+def dct_basis(n_mfcc: int = N_MFCC, n_mels: int = N_MELS) -> np.ndarray:
+    """
+    First `n_mfcc` rows of the orthonormal DCT-II matrix, shape (n_mfcc, n_mels).
+    """
+    n = np.arange(n_mels)
+    k = np.arange(n_mfcc)[:, None]
+    basis = np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2.0 / n_mels)
+    basis[0] /= np.sqrt(2.0)
+    basis = basis.astype(np.float32)
+    basis.setflags(write=False)
+    return basis
+
+
+@lru_cache(maxsize=8)
+def hann_window(n_fft: int = N_FFT) -> np.ndarray:
+    window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)).astype(np.float32)
+    window.setflags(write=False)
+    return window
+
+
+def n_frames(n_samples: int) -> int:
+    return 1 + n_samples // HOP_LENGTH
+
+
+def _log_mel_frames(signals, sr: int):
+    """
+    Returns (log-mel dB frames (B, T, n_mels), valid-frame mask (B, T)) for one batch.
+    Signals are zero-padded on both sides like librosa's centered STFT, then
+    right-padded to a common length; padded frames are masked out.
+    """
+    pad = N_FFT // 2
+    lengths = np.array([len(s) for s in signals])
+    padded = np.zeros((len(signals), lengths.max() + 2 * pad), dtype=np.float32)
+    for i, s in enumerate(signals):
+        padded[i, pad:pad + len(s)] = s
+
+    frames = sliding_window_view(padded, N_FFT, axis=1)[:, ::HOP_LENGTH]
+    spec = np.fft.rfft(frames * hann_window(N_FFT), axis=-1)
+    power = spec.real ** 2 + spec.imag ** 2
+    mel = power.astype(np.float32, copy=False) @ mel_basis(sr, N_FFT, N_MELS).T
+    log_mel = 10.0 * np.log10(np.maximum(mel, AMIN))
+
+    frame_counts = 1 + lengths // HOP_LENGTH
+    mask = np.arange(log_mel.shape[1])[None, :] < frame_counts[:, None]
+    return log_mel, mask
+
+
+def mfcc_mean_batch(signals, sr: int = SAMPLE_RATE, batch_size: int = BATCH_SIZE) -> np.ndarray:
+    """
+    MFCC means for a list of equal-rate mono signals. Returns shape (N, N_MFCC).
+    Processes `batch_size` signals per NumPy pass to bound peak memory.
+    """
+    signals = [np.asarray(s, dtype=np.float32).reshape(-1) for s in signals]
+    out = np.empty((len(signals), N_MFCC), dtype=np.float32)
+    dct = dct_basis(N_MFCC, N_MELS)
+
+    for start in range(0, len(signals), batch_size):
+        chunk = signals[start:start + batch_size]
+        log_mel, mask = _log_mel_frames(chunk, sr)
+
+        # power_to_db's top_db floor is relative to each clip's own peak
+        peak = np.where(mask[..., None], log_mel, -np.inf).max(axis=(1, 2))
+        log_mel = np.maximum(log_mel, (peak - TOP_DB)[:, None, None])
+
+        mfcc = log_mel @ dct.T
+        mfcc *= mask[..., None]
+        out[start:start + len(chunk)] = mfcc.sum(axis=1) / mask.sum(axis=1)[:, None]
+    return out
+
+
+def mfcc_mean(signal, sr: int = SAMPLE_RATE) -> np.ndarray:
+    return mfcc_mean_batch([signal], sr)[0]
+
+
+def load_audio(file_path, sr: int = SAMPLE_RATE) -> np.ndarray:
+    import librosa
+
+    audio, _ = librosa.load(file_path, sr=sr)
+    return audio
+
+
+def speech_audio(audio, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    The part of a clip that features are computed on (see voice.vad).
+    Raises voice.vad.NoSpeechDetected for clips without speech.
+    """
+    return speech_segment(audio, sr)[0]
+
+
+def extract_features(file_path) -> np.ndarray:
+    return mfcc_mean(speech_audio(load_audio(file_path)))
+
+
+def extract_features_batch(file_paths, batch_size: int = BATCH_SIZE) -> np.ndarray:
+    out = np.empty((len(file_paths), N_MFCC), dtype=np.float32)
+    for start in range(0, len(file_paths), batch_size):
+        paths = file_paths[start:start + batch_size]
+        signals = [speech_audio(load_audio(p)) for p in paths]
+        out[start:start + len(paths)] = mfcc_mean_batch(signals, batch_size=batch_size)
+    return out
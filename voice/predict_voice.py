@@ -1,16 +1,10 @@
 #predict_voice.py
 import joblib
-import librosa
-import numpy as np
 import os
+from voice.features import SAMPLE_RATE, extract_features, mfcc_mean, speech_audio
 
 MODEL_PATH = "models/voice_model.joblib"
 
-def extract_features(file_path):
-    audio, sr = librosa.load(file_path, sr=16000)
-    mfcc = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=13)
-    return np.mean(mfcc.T, axis=0)
-
 def predict_voice_file(file_path, model=None):
     if model is None:
         if not os.path.exists(MODEL_PATH):
@@ -19,9 +13,18 @@ def predict_voice_file(file_path, model=None):
 
     features = extract_features(file_path).reshape(1, -1)
     return model.predict(features)[0]  # 0=Bot, 1=Human
-    print(f"[DEBUG] Audio shape: {audio.shape}, Sample rate: {sr}")
-    print(f"[DEBUG] Duration: {audio.shape[0] / sr:.2f} seconds")
-    print(f"[DEBUG] Extracted shape: {features.shape}")
+
+def predict_voice_audio(audio, sr=SAMPLE_RATE, model=None):
+    """
+    Same as predict_voice_file, but for samples already decoded in memory.
+    """
+    if model is None:
+        if not os.path.exists(MODEL_PATH):
+            raise FileNotFoundError("❌ Voice model not found.")
+        model = joblib.load(MODEL_PATH)
+
+    features = mfcc_mean(speech_audio(audio, sr), sr).reshape(1, -1)
+    return model.predict(features)[0]  # 0=Bot, 1=Human
 
 
 # CLI optional
@@ -1,29 +1,13 @@
 import sounddevice as sd
-import scipy.io.wavfile as wav
-import librosa
-import numpy as np
 import joblib
 import os
-import tempfile
+import queue
+from voice.streaming import StreamingVoiceClassifier, STREAM_MAX_SECONDS
+from voice.vad import NoSpeechDetected
 
 MODEL_PATH = "models/voice_model.joblib"
 SAMPLE_RATE = 16000
-DURATION = 5  # seconds
-
-def record_temp_audio():
-    print("🎙️ Start speaking...")
-    recording = sd.rec(int(SAMPLE_RATE * DURATION), samplerate=SAMPLE_RATE, channels=1, dtype='int16')
-    sd.wait()
-    
-    temp_path = tempfile.mktemp(suffix=".wav")
-    wav.write(temp_path, SAMPLE_RATE, recording)
-    print(f"✅ Audio recorded to temp file")
-    return temp_path
-
-def extract_features(file_path):
-    audio, sr = librosa.load(file_path, sr=SAMPLE_RATE)
-    mfcc = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=13)
-    return np.mean(mfcc.T, axis=0)
+CHUNK_SECONDS = 0.1  # classify after every 100 ms of audio
 
 def predict_realtime():
     if not os.path.exists(MODEL_PATH):
@@ -31,17 +15,32 @@ def predict_realtime():
         return
 
     model = joblib.load(MODEL_PATH)
-    audio_file = record_temp_audio()
-    features = extract_features(audio_file).reshape(1, -1)
-    prediction = model.predict(features)[0]
+    classifier = StreamingVoiceClassifier(model, sr=SAMPLE_RATE)
+    chunks = queue.Queue()
 
-    os.remove(audio_file)
+    def on_audio(indata, frames, time_info, status):
+        chunks.put(indata[:, 0].copy())
 
-    if prediction == 1:
+    # 🎙️ Score chunk by chunk and stop as soon as the model is confident
+    print("🎙️ Start speaking...")
+    with sd.InputStream(samplerate=SAMPLE_RATE, channels=1, dtype='float32',
+                        blocksize=int(SAMPLE_RATE * CHUNK_SECONDS), callback=on_audio):
+        try:
+            while True:
+                update = classifier.push(chunks.get())
+                print(f"\r⏱️ {update['seconds']:.1f}s  P(human)={update['confidence']:.2f}", end="", flush=True)
+                if update["final"]:
+                    break
+        except NoSpeechDetected as e:
+            print(f"\n{e}")
+            return
+    print()
+
+    if update["decision"] == 1:
         print("🧑 Detected: Human")
     else:
         print("🤖 Detected: Bot")
 
 if __name__ == "__main__":
-    input("🎤 Press Enter to record 5s voice and predict...")
+    input(f"🎤 Press Enter to speak (up to {STREAM_MAX_SECONDS:.0f}s) and predict...")
     predict_realtime()
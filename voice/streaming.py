@@ -0,0 +1,232 @@
+# voice/streaming.py
+"""
+Incremental MFCC-mean features and early-exit classification for live audio.
+
+Samples arrive in arbitrary chunks. Every complete STFT window is turned into
+a log-mel frame as soon as it is available and stored in a fixed-size ring;
+the MFCC mean is kept as a running sum and only rebuilt when the clip's peak
+(and with it the top_db floor) moves. After `finish()` the result equals
+voice.features.mfcc_mean over the whole signal.
+
+Like /verify, a stream is only decided once voice/vad.py finds enough
+speech in it, never runs past VOICE_VAD_MAX_SECONDS, and ends with
+NoSpeechDetected if it runs out without speech. Silence is not trimmed:
+the running mean has already seen every frame.
+"""
+import os
+
+import numpy as np
+
+from voice.features import (
+    SAMPLE_RATE, N_MFCC, N_FFT, HOP_LENGTH, N_MELS, TOP_DB, AMIN,
+    mel_basis, dct_basis, hann_window,
+)
+from voice.vad import speech_segment, NoSpeechDetected, VAD_MAX_SECONDS
+
+# 🎚️ Stop as soon as P(human) or P(bot) reaches this confidence
+STREAM_THRESHOLD = float(os.getenv("STREAM_THRESHOLD", "0.9"))
+# ⏱️ Never decide on less audio than this, never listen longer than that
+STREAM_MIN_SECONDS = float(os.getenv("STREAM_MIN_SECONDS", "1.0"))
+STREAM_MAX_SECONDS = float(os.getenv("STREAM_MAX_SECONDS", "5.0"))
+
+
+class StreamingMFCC:
+    """
+    Running MFCC mean over at most `max_seconds` of the most recent audio.
+    """
+
+    def __init__(self, sr: int = SAMPLE_RATE, max_seconds: float = STREAM_MAX_SECONDS):
+        self.sr = sr
+        self.capacity = 1 + int(max_seconds * sr) // HOP_LENGTH
+        # Ring of log-mel frames (dB, before the top_db floor)
+        self._frames = np.empty((self.capacity, N_MELS), dtype=np.float32)
+        self._count = 0
+        self._head = 0
+        # Samples not yet covered by a full window; starts with librosa's centering pad
+        self._pending = np.zeros(N_FFT // 2, dtype=np.float32)
+        self._peak = -np.inf
+        self._floor = -np.inf
+        self._sum = np.zeros(N_MELS, dtype=np.float64)
+        self.samples = 0
+        self.total_frames = 0
+        self.finished = False
+
+    @property
+    def seconds(self) -> float:
+        return self.samples / self.sr
+
+    @property
+    def n_frames(self) -> int:
+        return self._count
+
+    def _log_mel(self, windows: np.ndarray) -> np.ndarray:
+        spec = np.fft.rfft(windows * hann_window(N_FFT), axis=-1)
+        power = (spec.real ** 2 + spec.imag ** 2).astype(np.float32, copy=False)
+        mel = power @ mel_basis(self.sr, N_FFT, N_MELS).T
+        return 10.0 * np.log10(np.maximum(mel, AMIN))
+
+    def _valid(self) -> np.ndarray:
+        if self._count < self.capacity:
+            return self._frames[:self._count]
+        return self._frames
+
+    def _rebuild(self):
+        frames = self._valid()
+        self._peak = frames.max() if len(frames) else -np.inf
+        self._floor = self._peak - TOP_DB
+        self._sum = np.maximum(frames, self._floor).sum(axis=0, dtype=np.float64)
+
+    def _append(self, log_mel: np.ndarray):
+        overwritten = None
+        for row in log_mel:
+            slot = self._head
+            if self._count == self.capacity:
+                old = self._frames[slot].copy()
+                self._sum -= np.maximum(old, self._floor)
+                overwritten = old.max() if overwritten is None else max(overwritten, old.max())
+            else:
+                self._count += 1
+            self._frames[slot] = row
+            self._head = (slot + 1) % self.capacity
+
+        new_peak = log_mel.max()
+        if new_peak > self._peak or (overwritten is not None and overwritten >= self._peak):
+            # The top_db floor moved, so every stored frame has to be re-clipped
+            self._rebuild()
+        else:
+            self._sum += np.maximum(log_mel, self._floor).sum(axis=0, dtype=np.float64)
+
+    def push(self, samples) -> int:
+        """
+        Adds mono float samples at `self.sr`. Returns the number of new frames.
+        """
+        if self.finished:
+            raise RuntimeError("❌ Stream already finished.")
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        self.samples += len(samples)
+        buf = np.concatenate([self._pending, samples])
+        if len(buf) < N_FFT:
+            self._pending = buf
+            return 0
+        n = 1 + (len(buf) - N_FFT) // HOP_LENGTH
+        windows = np.lib.stride_tricks.sliding_window_view(buf, N_FFT)[::HOP_LENGTH][:n]
+        self._append(self._log_mel(windows))
+        self._pending = buf[n * HOP_LENGTH:].copy()
+        self.total_frames += n
+        return n
+
+    def finish(self) -> int:
+        """
+        Flushes the trailing frames with librosa's right-side centering pad.
+        """
+        if self.finished:
+            return 0
+        self.finished = True
+        missing = 1 + self.samples // HOP_LENGTH - self.total_frames
+        if missing <= 0:
+            return 0
+        buf = np.concatenate([self._pending, np.zeros(N_FFT, dtype=np.float32)])
+        windows = np.lib.stride_tricks.sliding_window_view(buf, N_FFT)[::HOP_LENGTH][:missing]
+        self._append(self._log_mel(windows))
+        self.total_frames += missing
+        return missing
+
+    def mean(self) -> np.ndarray:
+        """
+        Current MFCC mean, shape (N_MFCC,).
+        """
+        if self._count == 0:
+            return np.zeros(N_MFCC, dtype=np.float32)
+        mean_log_mel = (self._sum / self._count).astype(np.float32)
+        return dct_basis(N_MFCC, N_MELS) @ mean_log_mel
+
+
+class StreamingVoiceClassifier:
+    """
+    Scores the running MFCC mean after every chunk and stops as soon as the
+    model is confident enough (or the time budget is used up).
+    """
+
+    def __init__(self, model, sr: int = SAMPLE_RATE, threshold: float = STREAM_THRESHOLD,
+                 min_seconds: float = STREAM_MIN_SECONDS, max_seconds: float = STREAM_MAX_SECONDS):
+        self.model = model
+        self.threshold = threshold
+        self.min_seconds = min_seconds
+        # Same cap as the upload path
+        self.max_seconds = min(max_seconds, VAD_MAX_SECONDS) if VAD_MAX_SECONDS else max_seconds
+        self.features = StreamingMFCC(sr, self.max_seconds)
+        self.decision = None
+        self._human_column = list(model.classes_).index(1)
+        # Raw samples for the VAD, which needs the clip's own noise floor and peak
+        self._audio = np.empty(int(self.max_seconds * sr), dtype=np.float32)
+        self._audio_len = 0
+        self._has_speech = False
+
+    def _speech_found(self, required: bool) -> bool:
+        """
+        Whether the audio so far holds enough speech; once true it stays true.
+        With `required`, missing speech raises NoSpeechDetected instead.
+        """
+        if not self._has_speech:
+            try:
+                speech_segment(self._audio[:self._audio_len], self.features.sr, trim=False, max_seconds=None)
+                self._has_speech = True
+            except NoSpeechDetected:
+                if required:
+                    raise
+        return self._has_speech
+
+    def confidence(self) -> float:
+        """
+        P(human) for the audio seen so far.
+        """
+        row = self.features.mean().reshape(1, -1)
+        return float(self.model.predict_proba(row)[0, self._human_column])
+
+    def _update(self) -> dict:
+        p_human = self.confidence()
+        seconds = self.features.seconds
+        conclusive = max(p_human, 1.0 - p_human) >= self.threshold and seconds >= self.min_seconds
+        out_of_audio = seconds >= self.max_seconds or self.features.finished
+        # 🤫 Confidence about silence means nothing: keep listening, and give up once the audio runs out
+        if (conclusive or out_of_audio) and not self._speech_found(required=out_of_audio):
+            conclusive = False
+        if conclusive or out_of_audio:
+            self.decision = int(p_human >= 0.5)  # 0=Bot, 1=Human
+        return {
+            "seconds": round(seconds, 3),
+            "frames": self.features.n_frames,
+            "confidence": round(p_human, 4),
+            "decision": self.decision,
+            "final": self.decision is not None,
+        }
+
+    def push(self, samples) -> dict:
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        kept = samples[:len(self._audio) - self._audio_len]
+        self._audio[self._audio_len:self._audio_len + len(kept)] = kept
+        self._audio_len += len(kept)
+        self.features.push(samples)
+        if self.features.seconds >= self.max_seconds:
+            self.features.finish()
+        return self._update()
+
+    def finish(self) -> dict:
+        self.features.finish()
+        return self._update()
+
+
+def pcm_to_float(data: bytes, sample_format: str = "s16") -> np.ndarray:
+    """
+    Decodes little-endian mono PCM (`s16` or `f32`) into float32 samples.
+    """
+    dtypes = {"s16": "<i2", "f32": "<f4"}
+    if sample_format not in dtypes:
+        raise ValueError(f"❌ Unsupported PCM format '{sample_format}' (use s16 or f32).")
+    dtype = np.dtype(dtypes[sample_format])
+    if len(data) % dtype.itemsize:
+        raise ValueError(f"❌ PCM chunk of {len(data)} bytes is not a whole number of {sample_format} samples.")
+    samples = np.frombuffer(data, dtype=dtype).astype(np.float32)
+    if sample_format == "s16":
+        samples /= 32768.0
+    return samples
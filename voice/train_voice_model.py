@@ -1,39 +1,54 @@
-# voice/train_voice_model.py
+# voice/train_voice_model.py  (run from the repo root: python -m voice.train_voice_model)
 import os
+import argparse
 import numpy as np
-import librosa
 from sklearn.ensemble import RandomForestClassifier
 import joblib
+from voice.feature_store import FeatureStore, FEATURE_STORE_DIR
 
 DATASET_DIR = "voice_data"
 MODEL_PATH = "models/voice_model.joblib"
 
-def extract_features(file_path):
-    audio, sr = librosa.load(file_path, sr=16000)
-    mfcc = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=13)
-    return np.mean(mfcc.T, axis=0)
-
-X = []
-y = []
-
-for label_dir, label_val in [("human", 1), ("bot", 0)]:
-    folder = os.path.join(DATASET_DIR, label_dir)
-    for filename in os.listdir(folder):
-        if filename.endswith(".wav"):
-            file_path = os.path.join(folder, filename)
-            try:
-                features = extract_features(file_path)
-                X.append(features)
+
+def list_dataset(dataset_dir=DATASET_DIR):
+    paths, y = [], []
+    for label_dir, label_val in [("human", 1), ("bot", 0)]:
+        folder = os.path.join(dataset_dir, label_dir)
+        for filename in sorted(os.listdir(folder)):
+            if filename.endswith(".wav"):
+                paths.append(os.path.join(folder, filename))
                 y.append(label_val)
-                print(f"✅ Processed: {file_path}")
-            except Exception as e:
-                print(f"❌ Failed: {file_path} - {e}")
-
-# Train model
-clf = RandomForestClassifier(n_estimators=100, random_state=42)
-clf.fit(X, y)
-
-# Save model
-os.makedirs("models", exist_ok=True)
-joblib.dump(clf, MODEL_PATH)
-print(f"🎉 Model saved to {MODEL_PATH}")
+    return paths, y
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-jobs", type=int, default=-1, help="feature workers and forest jobs (-1 = all cores)")
+    parser.add_argument("--store", default=FEATURE_STORE_DIR, help="feature store directory")
+    args = parser.parse_args()
+    n_jobs = os.cpu_count() if args.n_jobs == -1 else args.n_jobs
+
+    paths, labels = list_dataset()
+    label_of = dict(zip(paths, labels))
+
+    # 🗄️ Only new or changed clips are featurised; the rest come from the store
+    X, kept, stats = FeatureStore(args.store).build(paths, n_jobs=n_jobs)
+    for path, error in stats["failed"].items():
+        print(f"❌ Failed: {path} - {error}")
+    rate = f", {stats['files_per_second']:.1f} files/s" if stats["files_per_second"] else ""
+    print(f"✅ Features for {len(kept)} clips: {stats['cached']} cached, "
+          f"{stats['computed']} computed in {stats['extract_seconds']:.2f}s{rate}")
+    y = np.array([label_of[p] for p in kept])
+
+    # Train model
+    clf = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=n_jobs)
+    clf.fit(X, y)
+
+    # Save model
+    os.makedirs("models", exist_ok=True)
+    joblib.dump(clf, MODEL_PATH)
+    print(f"🎉 Model saved to {MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# voice/vad.py
+"""
+No-speech gate and length cap ahead of MFCC extraction, built on energy /
+zero-crossing voice activity detection.
+
+The clip is cut into 32 ms frames, and every frame's energy (dB) and
+zero-crossing rate come out of one NumPy pass. A frame is speech when its
+energy clears the highest of three floors:
+
+- the clip's noise floor (10th percentile) plus VAD_FLOOR_MARGIN_DB
+- its peak minus VAD_RANGE_DB
+- VAD_ABS_FLOOR_DB
+
+Frames with a noise-like ZCR (above VAD_MAX_ZCR) must clear that floor by
+another VAD_FLOOR_MARGIN_DB, so hiss and clicks are not counted while loud
+fricatives still are. Speech frames are then widened by VAD_PAD_FRAMES on
+each side to keep word onsets and tails.
+
+`speech_segment` rejects clips with less than VOICE_VAD_MIN_SPEECH_SECONDS
+of speech before any model runs, and caps the audio that reaches the MFCC
+stage at VOICE_VAD_MAX_SECONDS. That gate and cap are what it does by
+default: the shipped voice model was trained on untrimmed clips, so no
+frames are dropped from clips that pass.
+
+VOICE_VAD_TRIM=1 additionally drops every non-speech frame before the
+MFCCs. It is off until a voice model trained with it is shipped
+(benchmarks/bench_vad.py reports how often the current model disagrees
+on trimmed clips). Trimming changes the features, so it is part of
+feature_config(); train the voice model with the same setting it is
+served with.
+"""
+import os
+
+import numpy as np
+
+VAD_FRAME_SECONDS = 0.032
+VAD_TRIM = os.getenv("VOICE_VAD_TRIM", "0") == "1"
+VAD_MAX_SECONDS = float(os.getenv("VOICE_VAD_MAX_SECONDS", "10"))
+VAD_MIN_SPEECH_SECONDS = float(os.getenv("VOICE_VAD_MIN_SPEECH_SECONDS", "0.25"))
+VAD_FLOOR_MARGIN_DB = 10.0
+VAD_RANGE_DB = 45.0
+VAD_ABS_FLOOR_DB = -55.0
+VAD_MAX_ZCR = 0.35
+VAD_PAD_FRAMES = 3
+
+
+class NoSpeechDetected(ValueError):
+    pass
+
+
+def vad_config() -> dict:
+    return {
+        "frame_seconds": VAD_FRAME_SECONDS,
+        "trim": VAD_TRIM,
+        "max_seconds": VAD_MAX_SECONDS,
+        "min_speech_seconds": VAD_MIN_SPEECH_SECONDS,
+        "floor_margin_db": VAD_FLOOR_MARGIN_DB,
+        "range_db": VAD_RANGE_DB,
+        "abs_floor_db": VAD_ABS_FLOOR_DB,
+        "max_zcr": VAD_MAX_ZCR,
+        "pad_frames": VAD_PAD_FRAMES,
+    }
+
+
+def frame_length(sr: int) -> int:
+    return max(1, int(round(VAD_FRAME_SECONDS * sr)))
+
+
+def _frames(audio: np.ndarray, frame: int) -> np.ndarray:
+    # The last partial frame is zero-padded rather than dropped
+    n = -(-len(audio) // frame)
+    padded = np.zeros(n * frame, dtype=np.float32)
+    padded[:len(audio)] = audio
+    return padded.reshape(n, frame)
+
+
+def frame_stats(audio: np.ndarray, sr: int) -> tuple:
+    """
+    (energy in dB, zero-crossing rate) per frame.
+    """
+    frames = _frames(np.asarray(audio, dtype=np.float32).reshape(-1), frame_length(sr))
+    energy = 10.0 * np.log10(np.einsum("ij,ij->i", frames, frames) / frames.shape[1] + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frames.shape[1]
+    return energy, zcr
+
+
+def _pad(speech: np.ndarray, frames: int) -> np.ndarray:
+    if not frames or not speech.any():
+        return speech
+    return np.convolve(speech, np.ones(2 * frames + 1), mode="same") > 0
+
+
+def speech_mask(audio: np.ndarray, sr: int, pad_frames: int = VAD_PAD_FRAMES) -> np.ndarray:
+    """
+    Boolean speech flag per frame, onsets and tails widened by `pad_frames`.
+    """
+    energy, zcr = frame_stats(audio, sr)
+    if not len(energy):
+        return np.zeros(0, dtype=bool)
+    floor = max(np.percentile(energy, 10) + VAD_FLOOR_MARGIN_DB, energy.max() - VAD_RANGE_DB, VAD_ABS_FLOOR_DB)
+    speech = (energy >= floor) & ((zcr <= VAD_MAX_ZCR) | (energy >= floor + VAD_FLOOR_MARGIN_DB))
+    return _pad(speech, pad_frames)
+
+
+def speech_segment(audio: np.ndarray, sr: int, trim: bool = VAD_TRIM, max_seconds: float = VAD_MAX_SECONDS,
+                   min_speech_seconds: float = VAD_MIN_SPEECH_SECONDS) -> tuple:
+    """
+    Returns (audio for feature extraction, stats). Raises NoSpeechDetected
+    when the clip holds less than `min_speech_seconds` of speech.
+    """
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    frame = frame_length(sr)
+    # Judged before padding, so an isolated click cannot pass as speech
+    raw = speech_mask(audio, sr, pad_frames=0)
+    speech_seconds = np.count_nonzero(raw) * frame / sr
+    if speech_seconds < min_speech_seconds:
+        raise NoSpeechDetected(f"❌ No speech detected in the voice clip ({speech_seconds:.2f} s of "
+                               f"{len(audio) / sr:.2f} s; at least {min_speech_seconds:g} s needed).")
+
+    speech = _pad(raw, VAD_PAD_FRAMES)
+    if trim:
+        kept = _frames(audio, frame)[speech].reshape(-1)
+        if speech[-1]:
+            kept = kept[:len(kept) - (len(speech) * frame - len(audio))]
+    else:
+        kept = audio
+    if max_seconds:
+        kept = kept[:int(max_seconds * sr)]
+    return kept, {
+        "seconds": len(audio) / sr,
+        "speech_seconds": speech_seconds,
+        "kept_seconds": len(kept) / sr,
+        "kept_fraction": len(kept) / max(len(audio), 1),
+    }
@@ -1,31 +1,38 @@
-import json
-import time
-import hashlib
+# generate_proof.py
+"""
+Kept for old scripts. Proofs are recorded in the shared proof ledger by
+zk_ai_backend.generate_proof (which returns the proof hash); this wrapper
+keeps the old contract of returning the path of a zk_proof_*.json copy in
+the working directory. Works from any directory:
+
+    python zk-proof-uploader/generate_proof.py 1 1
+"""
 import os
+import sys
+import json
+
+# 📂 Repo root, so zk_ai_backend imports without PYTHONPATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zk_ai_backend.generate_proof import generate_proof as record_proof  # noqa: E402
+from zk_ai_backend.proof_ledger import ledger  # noqa: E402
+
+__all__ = ["generate_proof"]
 
 
 def generate_proof(voice_result: int, keystroke_result: int) -> str:
     """
-    Generates a ZK-style proof JSON with a hash, returns the file path.
+    Records a proof in the ledger, returns the path of its JSON copy.
     """
-    # Step 1: Combine results into a proof dict
-    is_verified = voice_result == 1 and keystroke_result == 1
-    proof = {
-        "voice_result": int(voice_result),
-        "keystroke_result": int(keystroke_result),
-        "verified": is_verified,
-        "timestamp": int(time.time())
-    }
-
-    # Step 2: Hash the proof for tamper-evidence
-    proof_string = json.dumps(proof, sort_keys=True)
-    proof_hash = hashlib.sha256(proof_string.encode()).hexdigest()
-    proof["hash"] = proof_hash
-
-    # Step 3: Save to local JSON file
-    filename = f"zk_proof_{int(time.time())}.json"
-    filepath = os.path.join(os.getcwd(), filename)
+    proof_hash = record_proof(voice_result, keystroke_result)
+    proof = ledger.get(proof_hash)
+    # The hash in the name keeps proofs from the same second apart
+    filepath = os.path.join(os.getcwd(), f"zk_proof_{proof['timestamp']}_{proof_hash[:12]}.json")
     with open(filepath, "w") as f:
         json.dump(proof, f, indent=2)
-
     return filepath
+
+
+if __name__ == "__main__":
+    voice, keystroke = (int(x) for x in sys.argv[1:3]) if len(sys.argv) >= 3 else (1, 1)
+    print(f"🧾 Proof written to {generate_proof(voice, keystroke)}")
@@ -0,0 +1,367 @@
+# anchoring.py
+"""
+Batched on-chain anchoring of pinned proofs.
+
+Instead of one transaction per verification, every pinned (proof hash, CID)
+pair becomes a leaf in the current window's Merkle tree (see merkle.py).
+Every ANCHOR_WINDOW_SECONDS the window is sealed:
+- only its root is submitted to the chain, via ZKIdentityVerifier.anchorRoot
+- the leaves are written to ANCHOR_DIR/batch_<id>.bin
+- the metadata (root, tx hash, block) goes to ANCHOR_DIR/batch_<id>.json
+
+`inclusion(proof_hash)` returns the leaf, sibling path and root, which is
+enough to check a proof against the anchored root offline with
+merkle.verify_inclusion.
+
+ANCHOR_CHAIN picks the backend:
+- "local" (the default) is an in-process stand-in for an Ethereum node, persisted to JSON
+- "web3" sends real transactions (needs web3, ANCHOR_RPC_URL, ANCHOR_CONTRACT and ANCHOR_PRIVATE_KEY)
+- "off" disables anchoring
+
+The open window lives in memory. After a crash it is rebuilt from the pinned
+proofs in the proof ledger that no sealed batch covers yet.
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+
+from .merkle import IncrementalMerkleTree, leaf_hash, verify_inclusion, DIGEST_SIZE
+
+ANCHOR_CHAIN = os.getenv("ANCHOR_CHAIN", "local")
+ANCHOR_WINDOW_SECONDS = float(os.getenv("ANCHOR_WINDOW_SECONDS", "60"))
+ANCHOR_DIR = os.getenv("ANCHOR_DIR", ".anchors")
+ANCHOR_RPC_URL = os.getenv("ANCHOR_RPC_URL")
+ANCHOR_CONTRACT = os.getenv("ANCHOR_CONTRACT")
+ANCHOR_PRIVATE_KEY = os.getenv("ANCHOR_PRIVATE_KEY")
+
+# Sealed trees kept in memory for inclusion paths
+ANCHOR_TREE_CACHE = 4
+
+ANCHOR_ABI = [
+    {
+        "name": "anchorRoot", "type": "function", "stateMutability": "nonpayable",
+        "inputs": [{"name": "root", "type": "bytes32"}, {"name": "leaves", "type": "uint256"}],
+        "outputs": [],
+    },
+    {
+        "name": "anchoredAt", "type": "function", "stateMutability": "view",
+        "inputs": [{"name": "", "type": "bytes32"}],
+        "outputs": [{"name": "", "type": "uint256"}],
+    },
+]
+
+
+class AnchorChainError(RuntimeError):
+    pass
+
+
+class LocalChain:
+    """
+    Stand-in for the anchoring contract. Each root gets its own block,
+    tx hashes are chained sha256 digests, and a root can only be anchored once.
+    """
+
+    name = "local"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self.blocks = json.load(f)
+        except (OSError, ValueError):
+            self.blocks = []
+        self._roots = {block["root"]: block["block"] for block in self.blocks}
+
+    def submit_root(self, root: bytes, leaves: int) -> dict:
+        with self._lock:
+            if root.hex() in self._roots:
+                raise AnchorChainError(f"❌ Root {root.hex()} is already anchored.")
+            previous = bytes.fromhex(self.blocks[-1]["tx_hash"][2:]) if self.blocks else b""
+            block = {
+                "block": len(self.blocks) + 1,
+                "tx_hash": "0x" + hashlib.sha256(previous + root + leaves.to_bytes(32, "big")).hexdigest(),
+                "root": root.hex(),
+                "leaves": leaves,
+                "timestamp": int(time.time()),
+            }
+            self.blocks.append(block)
+            self._roots[block["root"]] = block["block"]
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.blocks, f)
+            os.replace(tmp, self.path)
+        return {"chain": self.name, "tx_hash": block["tx_hash"], "block": block["block"]}
+
+    def anchored_at(self, root: bytes):
+        return self._roots.get(root.hex())
+
+
+class Web3Chain:
+    """
+    Calls anchorRoot(bytes32, uint256) on the deployed ZKIdentityVerifier.
+    """
+
+    name = "web3"
+
+    def __init__(self, rpc_url: str = ANCHOR_RPC_URL, contract: str = ANCHOR_CONTRACT,
+                 private_key: str = ANCHOR_PRIVATE_KEY):
+        if not (rpc_url and contract and private_key):
+            raise AnchorChainError("❌ ANCHOR_RPC_URL, ANCHOR_CONTRACT and ANCHOR_PRIVATE_KEY must be set.")
+        from web3 import Web3
+
+        self.w3 = Web3(Web3.HTTPProvider(rpc_url))
+        self.contract = self.w3.eth.contract(address=Web3.to_checksum_address(contract), abi=ANCHOR_ABI)
+        self.account = self.w3.eth.account.from_key(private_key)
+
+    def submit_root(self, root: bytes, leaves: int) -> dict:
+        tx = self.contract.functions.anchorRoot(root, leaves).build_transaction({
+            "from": self.account.address,
+            "nonce": self.w3.eth.get_transaction_count(self.account.address),
+        })
+        signed = self.account.sign_transaction(tx)
+        raw = getattr(signed, "raw_transaction", None) or signed.rawTransaction
+        receipt = self.w3.eth.wait_for_transaction_receipt(self.w3.eth.send_raw_transaction(raw))
+        if receipt["status"] != 1:
+            raise AnchorChainError(f"❌ anchorRoot reverted in tx {receipt['transactionHash'].hex()}")
+        return {"chain": self.name, "tx_hash": receipt["transactionHash"].hex(), "block": receipt["blockNumber"]}
+
+    def anchored_at(self, root: bytes):
+        block = self.contract.functions.anchoredAt(root).call()
+        return block or None
+
+
+def get_chain(kind: str = ANCHOR_CHAIN, directory: str = ANCHOR_DIR):
+    if kind == "off":
+        return None
+    if kind == "local":
+        return LocalChain(os.path.join(directory, "local_chain.json"))
+    if kind == "web3":
+        return Web3Chain()
+    raise ValueError(f"❌ Unknown ANCHOR_CHAIN: {kind!r}")
+
+
+def verify_receipt(receipt: dict, proof_hash: str, cid: str) -> bool:
+    """
+    Offline check that (proof hash, CID) is a leaf under the receipt's root.
+    Whether that root is on chain is a separate anchoredAt(root) lookup.
+    """
+    leaf = leaf_hash(proof_hash, cid)
+    return leaf.hex() == receipt["leaf"] and verify_inclusion(leaf, receipt["path"], bytes.fromhex(receipt["root"]))
+
+
+class AnchorService:
+    def __init__(self, chain=None, kind: str = ANCHOR_CHAIN, directory: str = ANCHOR_DIR,
+                 window: float = ANCHOR_WINDOW_SECONDS):
+        self.kind = chain.name if chain is not None else kind
+        self._chain = chain
+        self.directory = directory
+        self.window = window
+        self._lock = threading.Lock()
+        self._seal_lock = threading.Lock()
+        self._tree = IncrementalMerkleTree()
+        self._keys = bytearray()  # proof hashes of the open window, in leaf order
+        self._pending = {}  # proof hash -> leaf index in the open window
+        self._batches = {}  # batch id -> metadata
+        self._located = {}  # proof hash -> (batch id, leaf index)
+        self._trees = OrderedDict()
+        self._task = None
+        self.enabled = self.kind != "off"
+
+    @property
+    def chain(self):
+        # Built on first use so importing the app never touches web3 or an RPC node
+        if self._chain is None and self.enabled:
+            self._chain = get_chain(self.kind, self.directory)
+        return self._chain
+
+    # 📂 Batches on disk --------------------------------------------------------
+
+    def _path(self, batch: int, suffix: str) -> str:
+        return os.path.join(self.directory, f"batch_{batch:06d}.{suffix}")
+
+    def _read_batch(self, batch: int):
+        with open(self._path(batch, "bin"), "rb") as f:
+            data = f.read()
+        n = len(data) // (2 * DIGEST_SIZE)
+        return data[:n * DIGEST_SIZE], data[n * DIGEST_SIZE:]
+
+    def load(self, ledger=None):
+        """
+        Indexes sealed batches, then re-queues pinned proofs from `ledger`
+        that none of them cover.
+        """
+        if not self.enabled:
+            return
+        try:
+            names = sorted(n for n in os.listdir(self.directory) if n.startswith("batch_") and n.endswith(".json"))
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            with open(os.path.join(self.directory, name)) as f:
+                meta = json.load(f)
+            keys, _ = self._read_batch(meta["batch"])
+            self._batches[meta["batch"]] = meta
+            for i in range(meta["leaves"]):
+                self._located[keys[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE].hex()] = (meta["batch"], i)
+        if ledger is not None:
+            recovered = 0
+            for proof_hash, cid in ledger.pinned():
+                if proof_hash not in self._located and proof_hash not in self._pending:
+                    self.add(proof_hash, cid)
+                    recovered += 1
+            if recovered:
+                print(f"⚓ Re-queued {recovered} pinned proofs that were never anchored")
+
+    # 🌳 Window -----------------------------------------------------------------
+
+    def add(self, proof_hash: str, cid: str):
+        if not self.enabled:
+            return
+        leaf = leaf_hash(proof_hash, cid)
+        with self._lock:
+            if proof_hash in self._pending or proof_hash in self._located:
+                return
+            self._pending[proof_hash] = self._tree.size
+            self._tree.append(leaf)
+            self._keys += bytes.fromhex(proof_hash)
+
+    def seal(self):
+        """
+        Closes the open window, stores its leaves and anchors its root.
+        Earlier batches whose submission failed are retried first.
+        """
+        if not self.enabled:
+            return None
+        with self._seal_lock:
+            for meta in list(self._batches.values()):
+                if meta.get("block") is None:
+                    self._submit(meta, retry=True)
+            with self._lock:
+                if self._tree.size == 0:
+                    return None
+                tree, keys, pending = self._tree, bytes(self._keys), self._pending
+                self._tree, self._keys, self._pending = IncrementalMerkleTree(), bytearray(), {}
+
+            batch = max(self._batches, default=0) + 1
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(batch, "bin"), "wb") as f:
+                f.write(keys)
+                f.write(tree.levels[0])
+            meta = {"batch": batch, "root": tree.root().hex(), "leaves": tree.size,
+                    "sealed_at": int(time.time()), "chain": self.kind, "tx_hash": None, "block": None}
+            with self._lock:
+                self._batches[batch] = meta
+                for proof_hash, index in pending.items():
+                    self._located[proof_hash] = (batch, index)
+                self._trees[batch] = tree
+                while len(self._trees) > ANCHOR_TREE_CACHE:
+                    self._trees.popitem(last=False)
+            self._submit(meta)
+            return meta
+
+    def _submit(self, meta: dict, retry: bool = False):
+        root = bytes.fromhex(meta["root"])
+        try:
+            # A failed attempt may still have been mined (only the receipt wait failed);
+            # resubmitting would revert with "Root already anchored" forever
+            block = self.chain.anchored_at(root) if retry else None
+            if block:
+                meta.update(block=block)
+                print(f"⚓ Batch {meta['batch']} was already anchored in block {block}")
+            else:
+                receipt = self.chain.submit_root(root, meta["leaves"])
+                meta.update(tx_hash=receipt["tx_hash"], block=receipt["block"])
+                print(f"⚓ Anchored batch {meta['batch']} ({meta['leaves']} proofs) in tx {meta['tx_hash']}")
+        except Exception as e:
+            print(f"⚠️ Anchoring batch {meta['batch']} failed, will retry: {e}")
+        tmp = self._path(meta["batch"], "json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._path(meta["batch"], "json"))
+
+    # 🔎 Inclusion proofs -------------------------------------------------------
+
+    def _tree_for(self, batch: int) -> IncrementalMerkleTree:
+        with self._lock:
+            tree = self._trees.get(batch)
+            if tree is not None:
+                self._trees.move_to_end(batch)
+                return tree
+        _, leaves = self._read_batch(batch)
+        tree = IncrementalMerkleTree.from_leaves(leaves)
+        with self._lock:
+            self._trees[batch] = tree
+            while len(self._trees) > ANCHOR_TREE_CACHE:
+                self._trees.popitem(last=False)
+        return tree
+
+    def inclusion(self, proof_hash: str):
+        """
+        {status, batch, index, leaf, path, root, chain, tx_hash, block};
+        status is "pending" while the proof's window is still open. tx_hash
+        is None when a lost receipt was recovered through anchored_at.
+        """
+        with self._lock:
+            if proof_hash in self._pending:
+                return {"status": "pending", "index": self._pending[proof_hash], "window_size": self._tree.size}
+            located = self._located.get(proof_hash)
+        if located is None:
+            return None
+        batch, index = located
+        tree = self._tree_for(batch)
+        meta = self._batches[batch]
+        return {
+            "status": "anchored" if meta["block"] else "sealed",
+            "batch": batch,
+            "index": index,
+            "leaf": tree.leaf(index).hex(),
+            "path": tree.path(index),
+            **{key: meta[key] for key in ("root", "chain", "tx_hash", "block")},
+        }
+
+    # ⏱️ Background sealing ------------------------------------------------------
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.window)
+            try:
+                await asyncio.to_thread(self.seal)
+            except Exception as e:
+                print(f"⚠️ Anchor window failed to seal: {e}")
+
+    async def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Anchor whatever the last window collected
+        await asyncio.to_thread(self.seal)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "chain": self.kind if self.enabled else None,
+                "window_seconds": self.window,
+                "pending": self._tree.size,
+                "batches": len(self._batches),
+                "sealed_proofs": len(self._located),
+                "unsubmitted_batches": sum(1 for m in self._batches.values() if m.get("block") is None),
+                "last_root": self._batches[max(self._batches)]["root"] if self._batches else None,
+            }
+
+
+anchor = AnchorService()
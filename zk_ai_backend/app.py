@@ -1,17 +1,90 @@
-from fastapi import FastAPI, UploadFile, File
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Request
+from fastapi.responses import PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional
-import shutil
 import os
 import json
-import uuid
-import requests
+import time
+import asyncio
+from contextlib import asynccontextmanager
 
-from zk_ai_backend.verifier import run_verification_pipeline
-from zk_ai_backend.proof_uploader import upload_to_ipfs
-from zk_ai_backend.langchain_explainer import explain_proof
+from zk_ai_backend.verifier import run_verification_pipeline_async, reject_async, batchers, warmup as warmup_pipeline
+from zk_ai_backend.decision import engine
+from zk_ai_backend.proof_uploader import pinner, PinataNotConfigured
+from zk_ai_backend.langchain_explainer import explain_proof, get_llm, ExplainerNotConfigured
+from zk_ai_backend.model_registry import registry
+from zk_ai_backend.audio_decoder import AudioDecodeError, AudioTooLong
+from zk_ai_backend.uploads import read_verify_upload, UploadRejected
+from zk_ai_backend.worker_pool import pool, PoolSaturated
+from zk_ai_backend.metrics import metrics, profiler, PROFILE_SLOW_MS
+from zk_ai_backend.proof_cache import proof_cache
+from zk_ai_backend.idempotency import verify_cache, request_key
+from zk_ai_backend.proof_ledger import ledger
+from zk_ai_backend.proof_record import ProofRecord, load_json
+from zk_ai_backend.anchoring import anchor
+from zk_ai_backend.cid import cid_from_url
+from zk_ai_backend.zk.zk_generator import ZK_PROVER
+from zk_ai_backend.zk.prover import get_prover
+from voice.streaming import StreamingVoiceClassifier, pcm_to_float
+from voice.features import SAMPLE_RATE
+from voice.vad import NoSpeechDetected, vad_config
+from keystroke.parser import KeystrokeFormatError
 
-app = FastAPI()
+
+# 🔥 Opt-in: pay first-request costs (JIT, caches, LLM client) during startup instead
+ZK_WARMUP = os.getenv("ZK_WARMUP", "0") == "1"
+
+
+class ProofFetchError(RuntimeError):
+    pass
+
+
+class ExplainerUnavailable(RuntimeError):
+    pass
+
+
+def warmup():
+    warmup_pipeline()
+    try:
+        get_llm()
+    except Exception as e:
+        print(f"⚠️ Explainer unavailable, /verify still works: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 📦 Load models once per worker and watch their files for hot reload
+    registry.load_all()
+    registry.start_watcher()
+    if profiler is not None:
+        profiler.start()
+    pool.start()
+    # 📒 Rebuild the proof ledger indexes before the first proof is appended
+    await asyncio.to_thread(ledger.open)
+    # ⚓ Index sealed anchor batches and re-queue pinned proofs no batch covers yet
+    await asyncio.to_thread(anchor.load, ledger)
+    await anchor.start()
+    await pinner.start()
+    for batcher in batchers.values():
+        await batcher.start()
+    if ZK_PROVER:
+        # 🔏 Parse out.r1cs / proving.key and precompute the four witness templates once
+        await asyncio.to_thread(get_prover().precompute)
+    if ZK_WARMUP:
+        await asyncio.to_thread(warmup)
+    yield
+    for batcher in batchers.values():
+        await batcher.stop()
+    await pinner.close()
+    await anchor.close()
+    await asyncio.to_thread(ledger.close)
+    pool.shutdown()
+    if profiler is not None:
+        profiler.stop()
+    registry.stop_watcher()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # 🌐 Enable CORS so frontend can call backend
 app.add_middleware(
@@ -21,46 +94,279 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+# 📈 Request latency per route, plus a folded-stack profile for slow requests
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        end = time.perf_counter()
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        metrics.observe("zk_http_request_seconds", end - start, route=path)
+        metrics.inc("zk_http_requests_total", route=path, status=status)
+        if profiler is not None and (end - start) * 1000 >= PROFILE_SLOW_MS:
+            dumped = await asyncio.to_thread(profiler.dump, start, end, f"{request.method}_{path}")
+            if dumped:
+                print(f"🔥 Slow {request.method} {path} ({(end - start) * 1000:.0f} ms), profile: {dumped}")
+
+
 # 🔐 Endpoint: Identity verification
-@app.post("/verify")
-async def verify_user(
-    voice: Optional[UploadFile] = File(None),
-    keystroke: Optional[UploadFile] = File(None)
-):
-    voice_path = f"temp_voice_{uuid.uuid4().hex}.wav"
-    keystroke_path = f"temp_keys_{uuid.uuid4().hex}.csv"
-
-    # Save files
-    if voice:
-        with open(voice_path, "wb") as vfile:
-            shutil.copyfileobj(voice.file, vfile)
-    if keystroke:
-        with open(keystroke_path, "wb") as kfile:
-            shutil.copyfileobj(keystroke.file, kfile)
-
-    # 🔍 Run verification
-    is_verified, zk_proof = run_verification_pipeline(
-        voice_path if voice else None,
-        keystroke_path if keystroke else None
-    )
-
-    # 📤 Upload ZK proof to IPFS
-    ipfs_url = upload_to_ipfs(zk_proof)
-    zk_proof["ipfs_url"] = ipfs_url
-
-    # 🧹 Cleanup
-    if os.path.exists(voice_path):
-        os.remove(voice_path)
-    if os.path.exists(keystroke_path):
-        os.remove(keystroke_path)
-
-    # ✅ Return result
+# Form fields: voice (WAV/WebM/Ogg) and keystroke (CSV), both optional. The body is
+# parsed by hand so oversized or mistyped uploads are refused while streaming in.
+VERIFY_FORM_SCHEMA = {
+    "requestBody": {"content": {"multipart/form-data": {"schema": {
+        "type": "object",
+        "properties": {
+            "voice": {"type": "string", "format": "binary"},
+            "keystroke": {"type": "string", "format": "binary"},
+        },
+    }}}},
+}
+
+
+@app.post("/verify", openapi_extra=VERIFY_FORM_SCHEMA)
+async def verify_user(request: Request):
+    # 🚦 Refuse immediately when the worker pool is already full
+    try:
+        pool.admit()
+    except PoolSaturated as e:
+        metrics.inc("zk_failures_total", stage="pool_saturated")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    admitted = True
+
+    def release():
+        nonlocal admitted
+        if admitted:
+            admitted = False
+            pool.release()
+
+    try:
+        # 📥 Stream uploads into bounded in-memory buffers — nothing touches the disk
+        with metrics.span("upload_read"):
+            try:
+                uploads = await read_verify_upload(request)
+            except UploadRejected as e:
+                metrics.inc("zk_failures_total", stage=f"upload_{e.reason}")
+                raise HTTPException(status_code=e.status_code, detail=str(e))
+        voice_data, keystroke_data, digests = uploads["voice"], uploads["keystroke"], uploads["digests"]
+        key = request_key(digests)
+
+        async def compute() -> bytes:
+            # 🔁 Exact replays of an earlier recording are refused before any model runs
+            replayed = await verify_cache.replayed(digests)
+            try:
+                if replayed and verify_cache.replay_action == "reject":
+                    is_verified, zk_proof, decision = await reject_async("replay", voice_data, keystroke_data)
+                else:
+                    # 🔍 Run verification on the worker pool
+                    is_verified, zk_proof, decision = await run_verification_pipeline_async(voice_data,
+                                                                                            keystroke_data)
+            except AudioTooLong as e:
+                metrics.inc("zk_failures_total", stage="upload_too_long")
+                raise HTTPException(status_code=413, detail=str(e))
+            except NoSpeechDetected as e:
+                metrics.inc("zk_failures_total", stage="voice_no_speech")
+                raise HTTPException(status_code=422, detail=str(e))
+            except AudioDecodeError as e:
+                metrics.inc("zk_failures_total", stage="voice_decode")
+                raise HTTPException(status_code=400, detail=str(e))
+            except KeystrokeFormatError as e:
+                metrics.inc("zk_failures_total", stage="keystroke_format")
+                raise HTTPException(status_code=400, detail=str(e))
+            finally:
+                release()
+            if replayed:
+                decision["replayed"] = replayed
+            body = json.dumps(await publish(is_verified, zk_proof, decision)).encode()
+            # Only once the proof is recorded and pinned (a failed attempt must stay retryable),
+            # and only for modalities a model scored; cancelled ones never counted
+            await verify_cache.remember(digests, decision["evaluated"])
+            return body
+
+        # ♻️ Retries of the same upload within IDEMPOTENCY_TTL get the stored proof and CID
+        body, reused = await verify_cache.get_or_compute(key, compute)
+    finally:
+        release()
+
+    return Response(body, media_type="application/json",
+                    headers={"Idempotency-Key": key, "Idempotency-Reused": "true" if reused else "false"})
+
+
+async def publish(is_verified: bool, zk_proof: ProofRecord, decision: dict) -> dict:
+    payload = zk_proof.encode()
+
+    # 📒 Record the proof durably; concurrent requests share one fsync
+    with metrics.span("ledger_append"):
+        await ledger.append_async(zk_proof)
+
+    # 📤 Upload ZK proof to IPFS (or queue it, in write-behind mode)
+    with metrics.span("ipfs_upload"):
+        try:
+            ipfs_url = await pinner.pin_bytes(payload)
+        except PinataNotConfigured as e:
+            # Pinata not configured: still answer, just without an IPFS link
+            print(f"⚠️ Skipping IPFS upload: {e}")
+            ipfs_url = None
+    if ipfs_url:
+        # 🗂️ Keep our own proof locally so /explain-proof never has to download it
+        cid = cid_from_url(ipfs_url)
+        await proof_cache.aput("proof", cid, bytes(payload))
+        await ledger.link_cid_async(zk_proof.hash, cid)
+        anchor.add(zk_proof.hash, cid)
+    metrics.inc("zk_verify_outcomes_total", outcome="human" if is_verified else "bot")
+
+    # ✅ Return result; the JSON view (plus where it was pinned) exists only here
     return {
         "verified": bool(is_verified),
-        "proof": zk_proof,
+        "proof": {**zk_proof.to_json(), "ipfs_url": ipfs_url},
+        "decision": decision,
         "contract": "0x7EF2e0048f5bAeDe046f6BF797943daF4ED8CB47"
     }
-    print(f"✅ Final verification result: {bool(is_verified)}")
+
+
+# 🎙️ Endpoint: Streaming voice classification
+# Client sends binary frames of mono PCM (?format=s16|f32, ?sr=16000, the only rate
+# accepted) and may send the text "end" to force a decision. Server answers every chunk
+# with {seconds, frames, confidence, decision, final} and closes once final is true; a
+# stream that runs out without speech gets {error} and close code 1003 instead.
+@app.websocket("/ws/voice")
+async def stream_voice(websocket: WebSocket, format: str = "s16", sr: int = 16000):
+    await websocket.accept()
+    # The voice model only knows 16 kHz MFCCs; other rates would be scored silently wrong
+    if sr != SAMPLE_RATE:
+        await websocket.send_json({"error": f"❌ Unsupported sample rate {sr} Hz; send {SAMPLE_RATE} Hz PCM."})
+        await websocket.close(code=1003)
+        return
+    classifier = StreamingVoiceClassifier(registry.get("voice"), sr=sr)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                try:
+                    samples = pcm_to_float(message["bytes"], format)
+                except ValueError as e:
+                    await websocket.send_json({"error": str(e)})
+                    await websocket.close(code=1003)
+                    return
+                step = (classifier.push, samples)
+            elif message.get("text") == "end":
+                step = (classifier.finish,)
+            else:
+                continue
+            try:
+                update = await asyncio.to_thread(*step)
+            except NoSpeechDetected as e:
+                metrics.inc("zk_failures_total", stage="voice_no_speech")
+                await websocket.send_json({"error": str(e)})
+                await websocket.close(code=1003)
+                return
+            await websocket.send_json(update)
+            if update["final"]:
+                await websocket.close()
+                return
+    except WebSocketDisconnect:
+        return
+
+
+# 📈 Endpoint: Prometheus scrape target
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# 📦 Endpoint: Loaded model versions, load times and resident memory
+@app.get("/models")
+async def model_stats():
+    return registry.stats()
+
+
+# 📊 Endpoint: Micro-batching counters per model
+@app.get("/batchers")
+async def batcher_stats():
+    return {name: batcher.stats() for name, batcher in batchers.items()}
+
+
+# ⚖️ Endpoint: Decision policy, the learned per-modality costs that order evaluation, and the no-speech gate
+@app.get("/decision")
+async def decision_stats():
+    return {**engine.stats(), "voice_gate": vad_config()}
+
+
+# 🚦 Endpoint: Worker pool queue depth and per-stage timings
+@app.get("/pool")
+async def pool_stats():
+    return pool.snapshot()
+
+
+# 📌 Endpoint: IPFS pinning counters and write-behind backlog
+@app.get("/pinner")
+async def pinner_stats():
+    return pinner.stats()
+
+
+# 🗂️ Endpoint: Proof / explanation cache hit rates
+@app.get("/cache")
+async def cache_stats():
+    return proof_cache.stats()
+
+
+# ♻️ Endpoint: Idempotent /verify reuse and replay detections
+@app.get("/idempotency")
+async def idempotency_stats():
+    return verify_cache.stats()
+
+
+# 📒 Endpoint: Proof ledger size, segments and group-commit batching
+@app.get("/ledger")
+async def ledger_stats():
+    return ledger.stats()
+
+
+# 🔎 Endpoint: Proofs issued in a time window (unix seconds), oldest first
+@app.get("/proofs")
+async def list_proofs(since: Optional[float] = None, until: Optional[float] = None, limit: int = 100):
+    proofs = await asyncio.to_thread(lambda: list(ledger.range(since, until, min(limit, 1000))))
+    return {"count": len(proofs), "proofs": proofs}
+
+
+# 🔎 Endpoint: One proof by hash or CID
+@app.get("/proofs/{key}")
+async def get_proof(key: str):
+    proof = ledger.get(key) or ledger.get_by_cid(key)
+    if proof is None:
+        raise HTTPException(status_code=404, detail="❌ Unknown proof hash or CID.")
+    return {"proof": proof, "cid": ledger.cid_for(proof["hash"])}
+
+
+# ⚓ Endpoint: Anchoring window size and sealed batches
+@app.get("/anchor")
+async def anchor_stats():
+    return anchor.stats()
+
+
+# ⚓ Endpoint: Merkle inclusion receipt for one proof (check it with anchoring.verify_receipt)
+@app.get("/anchor/{proof_hash}")
+async def anchor_receipt(proof_hash: str):
+    receipt = await asyncio.to_thread(anchor.inclusion, proof_hash)
+    if receipt is None:
+        raise HTTPException(status_code=404, detail="❌ Proof was never pinned or anchored.")
+    return receipt
+
+
+# 🔏 Endpoint: Groth16 prover stage timings (load, witness, MSM, serialization)
+@app.get("/prover")
+async def prover_stats():
+    if not ZK_PROVER:
+        return {"enabled": False}
+    return {"enabled": True, "timings": get_prover().timings}
 
 
 # 🧠 Endpoint: LangChain Explanation
@@ -69,21 +375,43 @@ async def explain_proof_endpoint(payload: dict):
     ipfs_url = payload.get("ipfs_url")
     if not ipfs_url:
         return {"error": "Missing 'ipfs_url'"}
+    # 🔒 Only the CID is taken from the caller; the proof is always fetched from our gateway
+    cid = cid_from_url(ipfs_url)
+    if not cid:
+        return {"error": "'ipfs_url' must be an IPFS URL of the form .../ipfs/<cid>"}
 
-    try:
-        # ⬇️ Download ZK proof from IPFS
-        response = requests.get(ipfs_url)
-        response.raise_for_status()
-        zk_proof = response.json()
-    except Exception as e:
-        return {"error": f"Failed to fetch proof from IPFS: {str(e)}"}
+    async def fetch_proof() -> bytes:
+        # ⬇️ Download ZK proof from IPFS; bytes that do not hash to the CID are refused, never cached
+        with metrics.span("proof_fetch"):
+            return await pinner.fetch(cid)
+
+    async def build_explanation() -> bytes:
+        try:
+            proof_bytes = await proof_cache.get_or_fetch("proof", cid, fetch_proof)
+            zk_proof = load_json(proof_bytes)
+        except Exception as e:
+            raise ProofFetchError(f"Failed to fetch proof from IPFS: {str(e)}") from e
 
-    # 🧠 Generate explanation with LangChain
-    explanation_text = explain_proof(zk_proof)
+        # 🧠 Generate explanation with LangChain (blocking LLM call, so off the event loop)
+        try:
+            with metrics.span("explain_llm"):
+                explanation_text = await asyncio.to_thread(explain_proof, zk_proof)
+        except (ExplainerNotConfigured, ImportError) as e:
+            raise ExplainerUnavailable(f"Explainer unavailable: {str(e)}") from e
 
-    # 📤 Upload explanation to IPFS
-    explanation_obj = {"explanation": explanation_text}
-    ipfs_explanation_url = upload_to_ipfs(explanation_obj)
-    explanation_obj["ipfs_url"] = ipfs_explanation_url
+        # 📤 Upload explanation to IPFS
+        explanation_obj = {"explanation": explanation_text}
+        with metrics.span("explanation_pin"):
+            ipfs_explanation_url = await pinner.pin_json(explanation_obj)
+        explanation_obj["ipfs_url"] = ipfs_explanation_url
+        return json.dumps(explanation_obj).encode()
+
+    try:
+        # ♻️ Proofs are immutable per CID, so their explanation is too
+        explanation = await proof_cache.get_or_fetch("explanation", cid, build_explanation)
+    except (ProofFetchError, ExplainerUnavailable) as e:
+        stage = "proof_fetch" if isinstance(e, ProofFetchError) else "explainer_unavailable"
+        metrics.inc("zk_failures_total", stage=stage)
+        return {"error": str(e)}
 
-    return explanation_obj
+    return json.loads(explanation)
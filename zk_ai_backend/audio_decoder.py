@@ -0,0 +1,197 @@
+# audio_decoder.py
+import os
+import struct
+import numpy as np
+
+TARGET_SR = 16000
+# ⏱️ Longest voice clip accepted; longer uploads are refused rather than truncated
+MAX_VOICE_SECONDS = float(os.getenv("MAX_VOICE_SECONDS", "30"))
+
+# 🎚️ Sample rates a WAV header may declare; anything else is refused before resampling
+MIN_WAV_SR = 8000
+MAX_WAV_SR = 192000
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class AudioDecodeError(ValueError):
+    pass
+
+
+class AudioTooLong(AudioDecodeError):
+    pass
+
+
+def sniff_format(data) -> str:
+    """
+    Guesses the container from its magic bytes: 'wav', 'webm', 'ogg' or 'unknown'.
+    """
+    head = bytes(data[:12])
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"\x1a\x45\xdf\xa3":  # EBML header (WebM / Matroska)
+        return "webm"
+    if head[:4] == b"OggS":
+        return "ogg"
+    return "unknown"
+
+
+def wav_declared_seconds(head):
+    """
+    Duration announced by a WAV header, read from however many leading bytes
+    have arrived. Returns None until the fmt and data chunk headers are both
+    in `head`, or when the writer left the data size open.
+    """
+    view = memoryview(head)
+    byte_rate = None
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = bytes(view[offset:offset + 4])
+        (chunk_size,) = struct.unpack_from("<I", view, offset + 4)
+        if chunk_id == b"fmt ":
+            if offset + 20 > len(view):
+                return None
+            (byte_rate,) = struct.unpack_from("<I", view, offset + 16)
+        elif chunk_id == b"data":
+            if not byte_rate or chunk_size in (0, 0xFFFFFFFF):
+                return None
+            return chunk_size / byte_rate
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _check_duration(samples: int, sr: int, max_seconds):
+    if max_seconds is not None and samples > max_seconds * sr:
+        raise AudioTooLong(f"❌ Voice clip is {samples / sr:.1f} s; the limit is {max_seconds:g} s.")
+
+
+def _pcm_to_float32(raw: memoryview, fmt: int, bits: int) -> np.ndarray:
+    if fmt == WAVE_FORMAT_IEEE_FLOAT:
+        dtype = {32: "<f4", 64: "<f8"}.get(bits)
+        if dtype is None:
+            raise AudioDecodeError(f"❌ Unsupported float WAV bit depth: {bits}")
+        samples = np.frombuffer(raw, dtype=dtype, count=len(raw) // (bits // 8))
+        return samples.astype(np.float32, copy=False)
+
+    if bits == 8:
+        samples = np.frombuffer(raw, dtype=np.uint8)
+        return (samples.astype(np.float32) - 128.0) / 128.0
+    if bits == 16:
+        samples = np.frombuffer(raw, dtype="<i2", count=len(raw) // 2)
+        return samples.astype(np.float32) / 32768.0
+    if bits == 24:
+        b = np.frombuffer(raw, dtype=np.uint8, count=len(raw) // 3 * 3).reshape(-1, 3).astype(np.int32)
+        samples = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        samples = np.where(samples & 0x800000, samples - 0x1000000, samples)
+        return samples.astype(np.float32) / 8388608.0
+    if bits == 32:
+        samples = np.frombuffer(raw, dtype="<i4", count=len(raw) // 4)
+        return samples.astype(np.float32) / 2147483648.0
+    raise AudioDecodeError(f"❌ Unsupported PCM WAV bit depth: {bits}")
+
+
+def decode_wav(data) -> tuple:
+    """
+    Parses a RIFF/WAVE buffer in place. Returns (mono float32 samples, sample rate).
+    """
+    view = memoryview(data)
+    if sniff_format(view) != "wav":
+        raise AudioDecodeError("❌ Not a RIFF/WAVE buffer.")
+
+    fmt = channels = sr = bits = None
+    pcm = None
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = bytes(view[offset:offset + 4])
+        (chunk_size,) = struct.unpack_from("<I", view, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            if chunk_size < 16 or body + 16 > len(view):
+                raise AudioDecodeError("❌ WAV fmt chunk is truncated.")
+            fmt, channels, sr, _, _, bits = struct.unpack_from("<HHIIHH", view, body)
+            if fmt == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40 and body + 26 <= len(view):
+                # First two bytes of the SubFormat GUID carry the real format code
+                (fmt,) = struct.unpack_from("<H", view, body + 24)
+        elif chunk_id == b"data":
+            # Streaming writers leave the size as 0 / 0xFFFFFFFF; take the rest of the buffer
+            end = len(view) if chunk_size in (0, 0xFFFFFFFF) else min(body + chunk_size, len(view))
+            pcm = view[body:end]
+            break
+        offset = body + chunk_size + (chunk_size & 1)
+
+    if fmt is None or pcm is None:
+        raise AudioDecodeError("❌ WAV is missing its fmt or data chunk.")
+    if fmt not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+        raise AudioDecodeError(f"❌ Unsupported WAV format code: {fmt:#x}")
+    # Header fields come straight from the upload; bad ones would divide by zero below
+    if channels < 1:
+        raise AudioDecodeError(f"❌ Invalid WAV channel count: {channels}")
+    if bits not in (8, 16, 24, 32, 64) or (fmt == WAVE_FORMAT_PCM and bits == 64):
+        raise AudioDecodeError(f"❌ Unsupported WAV bit depth: {bits}")
+    # resample_poly's cost follows the declared ratio, and the duration limit trusts this rate too
+    if not MIN_WAV_SR <= sr <= MAX_WAV_SR:
+        raise AudioDecodeError(f"❌ Unsupported WAV sample rate: {sr} Hz "
+                               f"(expected {MIN_WAV_SR}-{MAX_WAV_SR} Hz).")
+
+    frame_bytes = channels * (bits // 8)
+    pcm = pcm[:len(pcm) // frame_bytes * frame_bytes]
+    audio = _pcm_to_float32(pcm, fmt, bits)
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    return audio, sr
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int = TARGET_SR) -> np.ndarray:
+    if orig_sr == target_sr:
+        return audio
+    from math import gcd
+    from scipy.signal import resample_poly
+
+    g = gcd(orig_sr, target_sr)
+    return resample_poly(audio, target_sr // g, orig_sr // g).astype(np.float32, copy=False)
+
+
+def decode_with_ffmpeg(data, target_sr: int = TARGET_SR, max_seconds: float = None) -> np.ndarray:
+    """
+    Decodes any ffmpeg-readable container (WebM/Opus, Ogg, MP3...) through
+    stdin/stdout pipes straight into float32 samples — no intermediate files.
+    With `max_seconds`, ffmpeg stops just past the limit instead of decoding
+    the whole stream, and the clip is rejected.
+    """
+    import ffmpeg
+
+    output_args = {"format": "f32le", "acodec": "pcm_f32le", "ac": 1, "ar": target_sr}
+    if max_seconds is not None:
+        output_args["t"] = max_seconds + 0.1
+    try:
+        out, _ = (
+            ffmpeg
+            .input("pipe:0")
+            .output("pipe:1", **output_args)
+            .run(input=bytes(data), capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as e:
+        raise AudioDecodeError(f"❌ ffmpeg could not decode audio: {e.stderr.decode(errors='replace')[-200:]}") from e
+    except FileNotFoundError as e:
+        raise AudioDecodeError("❌ ffmpeg binary not found; cannot decode compressed audio.") from e
+    audio = np.frombuffer(out, dtype="<f4")
+    _check_duration(len(audio), target_sr, max_seconds)
+    return audio
+
+
+def decode_audio(data, target_sr: int = TARGET_SR, max_seconds: float = MAX_VOICE_SECONDS) -> np.ndarray:
+    """
+    Turns an uploaded voice blob into a mono float32 buffer at `target_sr`.
+    Raises AudioTooLong past `max_seconds` (None disables the limit).
+    """
+    if not data:
+        raise AudioDecodeError("❌ Empty audio upload.")
+    if sniff_format(data) == "wav":
+        audio, sr = decode_wav(data)
+        # Checked before resampling, the most expensive step here
+        _check_duration(len(audio), sr, max_seconds)
+        return resample(audio, sr, target_sr)
+    # The frontend labels MediaRecorder output as voice.wav even when it is WebM
+    return decode_with_ffmpeg(data, target_sr, max_seconds)
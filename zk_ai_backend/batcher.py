@@ -0,0 +1,120 @@
+# batcher.py
+import os
+import time
+import asyncio
+import numpy as np
+
+# 📦 Flush a batch once it holds this many rows...
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "32"))
+# ⏱️ ...or once the oldest row has waited this long
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+
+
+class MicroBatcher:
+    """
+    Collects single feature rows from concurrent requests and scores them with
+    one `predict` / `predict_proba` call per batch.
+
+    `get_model` is called per batch, so a hot-reloaded model is picked up
+    without restarting the batcher.
+    """
+
+    def __init__(self, name: str, get_model, max_batch_size: int = BATCH_MAX_SIZE,
+                 max_wait_ms: float = BATCH_MAX_WAIT_MS, method: str = "predict"):
+        self.name = name
+        self.get_model = get_model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.method = method
+        self._queue = None
+        self._task = None
+        self.batches = 0
+        self.rows = 0
+        self.predict_seconds = 0.0
+
+    async def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run(), name=f"batcher-{self.name}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, row):
+        """
+        Queues one feature row and waits for its own prediction.
+        """
+        if self._task is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((np.asarray(row, dtype=np.float64).reshape(-1), future))
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Drain whatever is already queued without yielding
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _score(self, X: np.ndarray) -> np.ndarray:
+        model = self.get_model()
+        return getattr(model, self.method)(X)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Requests that gave up (client disconnect, timeout) are dropped here
+            batch = [(row, fut) for row, fut in batch if not fut.cancelled()]
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                X = np.vstack([row for row, _ in batch])
+                # Keep the event loop free while sklearn runs
+                results = await loop.run_in_executor(None, self._score, X)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            finally:
+                self.predict_seconds += time.perf_counter() - start
+
+            self.batches += 1
+            self.rows += len(batch)
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "predict_ms_total": round(self.predict_seconds * 1000, 3),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
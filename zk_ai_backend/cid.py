@@ -0,0 +1,75 @@
+# cid.py
+import hashlib
+import re
+
+# Files up to one default IPFS chunk (256 KiB) become a single dag-pb leaf
+CHUNK_SIZE = 262144
+
+_B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_CID_RE = re.compile(r"/ipfs/([A-Za-z0-9]+)")
+
+
+class CIDMismatch(ValueError):
+    pass
+
+
+def _b58encode(data: bytes) -> str:
+    n = int.from_bytes(data, "big")
+    out = ""
+    while n:
+        n, rem = divmod(n, 58)
+        out = _B58_ALPHABET[rem] + out
+    pad = len(data) - len(data.lstrip(b"\0"))
+    return "1" * pad + out
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def compute_cid(data: bytes) -> str:
+    """
+    CIDv0 that `ipfs add` / Pinata pinFileToIPFS (cidVersion 0) assign to
+    `data`, computed locally. Only single-chunk files are supported.
+    """
+    if len(data) > CHUNK_SIZE:
+        raise ValueError(f"❌ Local CID only supports payloads up to {CHUNK_SIZE} bytes.")
+
+    # UnixFS Data { Type = File; Data = data; filesize = len(data) }
+    unixfs = b"\x08\x02"
+    if data:
+        unixfs += b"\x12" + _varint(len(data)) + data
+    unixfs += b"\x18" + _varint(len(data))
+    # dag-pb PBNode { Data = unixfs } with no links
+    node = b"\x0a" + _varint(len(unixfs)) + unixfs
+    multihash = b"\x12\x20" + hashlib.sha256(node).digest()
+    return _b58encode(multihash)
+
+
+def check_cid(data: bytes, cid: str) -> bytes:
+    """
+    Returns `data` if it is the content `cid` names, else raises CIDMismatch.
+    """
+    try:
+        actual = compute_cid(data)
+    except ValueError as e:
+        raise CIDMismatch(f"❌ Cannot check content against CID {cid}: {e}") from None
+    if actual != cid:
+        raise CIDMismatch(f"❌ Content does not match CID {cid} (hashes to {actual}).")
+    return data
+
+
+def cid_from_url(url: str):
+    """
+    Extracts the CID from a gateway URL like https://gateway/ipfs/<cid>, else None.
+    """
+    match = _CID_RE.search(url or "")
+    return match.group(1) if match else None
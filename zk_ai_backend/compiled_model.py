@@ -0,0 +1,163 @@
+# compiled_model.py
+"""
+Dependency-light inference for the trained classifiers.
+
+`export_model` flattens a fitted RandomForestClassifier into node tables
+(feature, threshold, left, right, value) and a LogisticRegression (or a
+StandardScaler + LogisticRegression pipeline) into one weight vector, and
+saves them as a plain .npz. The compiled models need only NumPy and expose
+the parts of the sklearn API the backend uses: predict, predict_proba,
+classes_ and n_features_in_.
+"""
+import numpy as np
+
+FOREST = "forest"
+LINEAR = "linear"
+
+
+class CompiledForest:
+    """
+    All trees in one set of node arrays; child indices are absolute and
+    leaves have left == -1. Rows walk every tree at once, one level per step.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, classes, n_features_in):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.n_features_in_ = int(n_features_in)
+
+    def predict_proba(self, X) -> np.ndarray:
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            left = self.left[node]
+            inner = left >= 0
+            if not inner.any():
+                break
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(inner, np.where(go_left, left, self.right[node]), node)
+        return self.value[node].mean(axis=1)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+class CompiledLinear:
+    """
+    Binary logistic regression with any input scaling folded into the weights.
+    """
+
+    def __init__(self, coef, intercept, classes, n_features_in):
+        self.coef = coef
+        self.intercept = float(intercept)
+        self.classes_ = classes
+        self.n_features_in_ = int(n_features_in)
+
+    def decision_function(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+
+    def predict_proba(self, X) -> np.ndarray:
+        p = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+
+def _export_forest(forest) -> dict:
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        leaf = tree.children_left < 0
+        value = tree.value[:, 0, :].astype(np.float64)
+        # Older sklearn stores class counts, newer stores fractions; normalise both
+        value /= value.sum(axis=1, keepdims=True)
+        roots.append(offset)
+        features.append(np.where(leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        lefts.append(np.where(leaf, -1, tree.children_left + offset))
+        rights.append(np.where(leaf, -1, tree.children_right + offset))
+        values.append(value)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+    return {
+        "kind": np.array(FOREST),
+        "feature": np.concatenate(features).astype(np.int32),
+        "threshold": np.concatenate(thresholds).astype(np.float64),
+        "left": np.concatenate(lefts).astype(np.int32),
+        "right": np.concatenate(rights).astype(np.int32),
+        "value": np.concatenate(values),
+        "roots": np.array(roots, dtype=np.int32),
+        "max_depth": np.array(max_depth),
+        "classes": np.asarray(forest.classes_),
+        "n_features_in": np.array(forest.n_features_in_),
+    }
+
+
+def _export_linear(model) -> dict:
+    steps = model.steps if hasattr(model, "steps") else [("model", model)]
+    clf = steps[-1][1]
+    if len(clf.classes_) != 2:
+        raise ValueError("❌ Only binary logistic regression can be compiled.")
+    coef = clf.coef_[0].astype(np.float64)
+    intercept = float(clf.intercept_[0])
+    # Fold preceding StandardScalers: w·((x - mean) / scale) + b
+    for _, step in reversed(steps[:-1]):
+        if type(step).__name__ != "StandardScaler":
+            raise ValueError(f"❌ Cannot compile pipeline step {type(step).__name__}.")
+        scale = step.scale_ if step.scale_ is not None else np.ones_like(coef)
+        mean = step.mean_ if step.mean_ is not None else np.zeros_like(coef)
+        coef = coef / scale
+        intercept -= float(coef @ mean)
+    return {
+        "kind": np.array(LINEAR),
+        "coef": coef,
+        "intercept": np.array(intercept),
+        "classes": np.asarray(clf.classes_),
+        "n_features_in": np.array(model.n_features_in_),
+    }
+
+
+def export_model(model) -> dict:
+    """
+    Flattens a fitted sklearn classifier into a dict of NumPy arrays.
+    """
+    final = model.steps[-1][1] if hasattr(model, "steps") else model
+    name = type(final).__name__
+    if name == "RandomForestClassifier" and final is model:
+        return _export_forest(model)
+    if name == "LogisticRegression":
+        return _export_linear(model)
+    raise ValueError(f"❌ Don't know how to compile {name}.")
+
+
+def save_compiled(model, path: str):
+    np.savez(path, **export_model(model))
+
+
+def from_arrays(arrays) -> object:
+    kind = str(arrays["kind"])
+    if kind == FOREST:
+        return CompiledForest(
+            arrays["feature"], arrays["threshold"], arrays["left"], arrays["right"],
+            arrays["value"], arrays["roots"], arrays["max_depth"],
+            arrays["classes"], arrays["n_features_in"],
+        )
+    if kind == LINEAR:
+        return CompiledLinear(arrays["coef"], arrays["intercept"], arrays["classes"], arrays["n_features_in"])
+    raise ValueError(f"❌ Unknown compiled model kind '{kind}'.")
+
+
+def load_compiled(path: str):
+    with np.load(path, allow_pickle=False) as data:
+        return from_arrays({key: data[key] for key in data.files})
@@ -0,0 +1,217 @@
+# decision.py
+"""
+Short-circuit decisions across the biometric modalities.
+
+A policy says when the modality results collected so far settle the
+verdict. Any modality still running, or not yet started, is then cancelled
+or skipped. Policies are plain data:
+
+    or        human if any modality says human (the /verify rule)
+    and       human only if every modality says human (identity_verifier.zok);
+              a missing upload counts as bot
+    weighted  human once sum(weight * result) >= threshold
+
+VERIFY_POLICY is one of those names or a JSON spec, e.g.
+{"kind": "weighted", "weights": {"voice": 0.7, "keystroke": 0.3}, "threshold": 0.5}
+
+Modalities are launched cheapest first, ordered by a running average of
+their measured cost. The next one starts as soon as the previous finishes
+without settling the verdict, or after VERIFY_HEDGE_MS, whichever comes
+first. So an easy keystroke decision never pays for voice decoding, and a
+hard one adds at most the hedge delay.
+"""
+import os
+import json
+import time
+import asyncio
+
+from .metrics import metrics
+
+VERIFY_POLICY = os.getenv("VERIFY_POLICY", "or")
+VERIFY_HEDGE_MS = float(os.getenv("VERIFY_HEDGE_MS", "10"))
+
+MODALITIES = ("voice", "keystroke")
+# Seconds; starting guesses until real timings come in
+DEFAULT_COSTS = {"keystroke": 0.001, "voice": 0.02}
+COST_SMOOTHING = 0.2
+
+
+class Policy:
+    def __init__(self, name: str, kind: str, weights: dict = None, threshold: float = 0.5):
+        if kind not in ("any", "all", "weighted"):
+            raise ValueError(f"❌ Unknown policy kind: {kind!r}")
+        self.name = name
+        self.kind = kind
+        self.weights = weights or {m: 1.0 / len(MODALITIES) for m in MODALITIES}
+        self.threshold = threshold
+
+    def decide(self, results: dict, pending) -> object:
+        """
+        True / False once `results` (modality -> 1, 0 or None when absent)
+        settle the verdict whatever the `pending` modalities return; None
+        while it is still open.
+        """
+        known = {m: r for m, r in results.items() if m not in pending}
+        if self.kind == "any":
+            if any(r == 1 for r in known.values()):
+                return True
+            return False if not pending else None
+        if self.kind == "all":
+            if any(r != 1 for r in known.values()):
+                return False
+            return True if not pending else None
+        score = sum(self.weights.get(m, 0.0) for m, r in known.items() if r == 1)
+        if score >= self.threshold:
+            return True
+        if score + sum(self.weights.get(m, 0.0) for m in pending) < self.threshold:
+            return False
+        return None
+
+    def describe(self) -> dict:
+        spec = {"name": self.name, "kind": self.kind}
+        if self.kind == "weighted":
+            spec.update(weights=self.weights, threshold=self.threshold)
+        return spec
+
+
+POLICIES = {
+    "or": Policy("or", "any"),
+    "and": Policy("and", "all"),
+    "weighted": Policy("weighted", "weighted", {"voice": 0.6, "keystroke": 0.4}, 0.5),
+}
+
+
+def parse_policy(spec: str) -> Policy:
+    if spec in POLICIES:
+        return POLICIES[spec]
+    try:
+        config = json.loads(spec)
+    except ValueError:
+        raise ValueError(f"❌ VERIFY_POLICY must be one of {sorted(POLICIES)} or a JSON spec, got {spec!r}") from None
+    return Policy(config.get("name", config["kind"]), config["kind"], config.get("weights"),
+                  float(config.get("threshold", 0.5)))
+
+
+class DecisionEngine:
+    def __init__(self, policy: Policy, hedge_ms: float = VERIFY_HEDGE_MS):
+        self.policy = policy
+        self.hedge = max(0.0, hedge_ms) / 1000
+        self.costs = dict(DEFAULT_COSTS)
+
+    def order(self, modalities) -> list:
+        return sorted(modalities, key=lambda m: self.costs.get(m, 0.0))
+
+    def _observe(self, modality: str, seconds: float):
+        self.costs[modality] += COST_SMOOTHING * (seconds - self.costs[modality])
+
+    def _record(self, verdict: bool, decided_by, order: list, evaluated: list, cancelled: list,
+                skipped: list, sizes: dict) -> dict:
+        unused = cancelled + skipped
+        saved = sum(self.costs.get(m, 0.0) for m in unused)
+        metrics.inc("zk_decisions_total", policy=self.policy.name, decided_by=decided_by or "none",
+                    verdict="human" if verdict else "bot")
+        for m in cancelled:
+            metrics.inc("zk_modality_skipped_total", modality=m, when="cancelled")
+        for m in skipped:
+            metrics.inc("zk_modality_skipped_total", modality=m, when="not_started")
+        if unused:
+            metrics.inc("zk_skipped_work_seconds_total", saved)
+        return {
+            "policy": self.policy.name,
+            "decided_by": decided_by,
+            "order": order,
+            "evaluated": evaluated,
+            "cancelled": cancelled,
+            "skipped": skipped,
+            "skipped_bytes": sum(sizes.get(m, 0) for m in unused),
+            "skipped_ms_estimate": round(saved * 1000, 3),
+        }
+
+    async def evaluate(self, jobs: dict, sizes: dict = None):
+        """
+        `jobs` maps each uploaded modality to a zero-argument coroutine
+        function returning its 0/1 result. Returns (verdict, results, record).
+        """
+        sizes = sizes or {}
+        results = {m: None for m in MODALITIES}
+        order = self.order(jobs)
+        waiting = list(order)
+        pending = set(order)
+        running = {}  # task -> (modality, started)
+        evaluated = []
+        decided_by = None
+        verdict = self.policy.decide(results, pending)
+
+        def launch():
+            modality = waiting.pop(0)
+            running[asyncio.ensure_future(jobs[modality]())] = (modality, time.perf_counter())
+
+        try:
+            while verdict is None:
+                if not running:
+                    launch()
+                timeout = self.hedge if waiting else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Hedge expired: overlap the next modality with the slow one
+                    launch()
+                    continue
+                for task in done:
+                    modality, started = running.pop(task)
+                    results[modality] = int(task.result())
+                    pending.discard(modality)
+                    evaluated.append(modality)
+                    self._observe(modality, time.perf_counter() - started)
+                verdict = self.policy.decide(results, pending)
+                if verdict is not None:
+                    decided_by = evaluated[-1]
+        finally:
+            # Cancelled pool jobs that have not started never run; running ones finish unseen
+            for task in running:
+                task.cancel()
+                # A job that failed as it was being cancelled has nobody left to report to
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        cancelled = [modality for modality, _ in running.values()]
+        return verdict, results, self._record(verdict, decided_by, order, evaluated, cancelled, waiting, sizes)
+
+    def reject(self, reason: str, modalities, sizes: dict = None) -> dict:
+        """
+        Record for a bot verdict reached before any modality ran (e.g. an exact replay).
+        """
+        return self._record(False, reason, [], [], [], self.order(modalities), sizes or {})
+
+    def stats(self) -> dict:
+        return {
+            "policy": self.policy.describe(),
+            "hedge_ms": self.hedge * 1000,
+            "cost_ms": {m: round(c * 1000, 3) for m, c in self.costs.items()},
+            "order": self.order(MODALITIES),
+        }
+
+    def evaluate_sync(self, jobs: dict, sizes: dict = None):
+        """
+        Blocking variant: modalities run one at a time, cheapest first.
+        """
+        sizes = sizes or {}
+        results = {m: None for m in MODALITIES}
+        order = self.order(jobs)
+        pending = set(order)
+        evaluated = []
+        decided_by = None
+        verdict = self.policy.decide(results, pending)
+        for modality in order:
+            if verdict is not None:
+                break
+            started = time.perf_counter()
+            results[modality] = int(jobs[modality]())
+            self._observe(modality, time.perf_counter() - started)
+            pending.discard(modality)
+            evaluated.append(modality)
+            verdict = self.policy.decide(results, pending)
+            if verdict is not None:
+                decided_by = modality
+        skipped = [m for m in order if m not in evaluated]
+        return verdict, results, self._record(verdict, decided_by, order, evaluated, [], skipped, sizes)
+
+
+engine = DecisionEngine(parse_policy(VERIFY_POLICY))
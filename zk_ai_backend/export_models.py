@@ -0,0 +1,20 @@
+# export_models.py  (run from the repo root: python -m zk_ai_backend.export_models)
+"""
+Writes a NumPy-only .npz next to each registry model's .joblib file.
+Serve them with MODEL_COMPILED=1.
+"""
+import joblib
+
+from zk_ai_backend.compiled_model import save_compiled
+from zk_ai_backend.model_registry import registry, compiled_path
+
+
+def main():
+    for name, path in registry.paths.items():
+        target = compiled_path(path)
+        save_compiled(joblib.load(path), target)
+        print(f"🗜️ Compiled {name} model {path} -> {target}")
+
+
+if __name__ == "__main__":
+    main()
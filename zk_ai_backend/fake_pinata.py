@@ -0,0 +1,65 @@
+# fake_pinata.py
+"""
+Local stand-in for the Pinata pinning API and gateway.
+
+    uvicorn zk_ai_backend.fake_pinata:app --port 8081
+    PINATA_API_URL=http://localhost:8081 PINATA_GATEWAY_URL=http://localhost:8081/ipfs \
+    PINATA_API_KEY=dev PINATA_SECRET_API_KEY=dev uvicorn zk_ai_backend.app:app
+
+FAKE_PINATA_FAIL_RATE (0..1) makes that share of pin requests answer 503 and
+FAKE_PINATA_LATENCY_MS delays every pin, for exercising retries and pooling.
+"""
+import os
+import json
+import time
+import random
+import asyncio
+from fastapi import FastAPI, UploadFile, File, Form, Request, HTTPException
+from fastapi.responses import Response
+
+from zk_ai_backend.cid import compute_cid
+
+FAIL_RATE = float(os.getenv("FAKE_PINATA_FAIL_RATE", "0"))
+LATENCY_MS = float(os.getenv("FAKE_PINATA_LATENCY_MS", "0"))
+
+app = FastAPI()
+pins = {}
+
+
+async def _simulate_network():
+    if LATENCY_MS:
+        await asyncio.sleep(LATENCY_MS / 1000)
+    if random.random() < FAIL_RATE:
+        raise HTTPException(status_code=503, detail="simulated outage")
+
+
+def _store(payload: bytes) -> dict:
+    cid = compute_cid(payload)
+    pins[cid] = payload
+    return {
+        "IpfsHash": cid,
+        "PinSize": len(payload),
+        "Timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+@app.post("/pinning/pinFileToIPFS")
+async def pin_file(file: UploadFile = File(...), pinataOptions: str = Form(None), pinataMetadata: str = Form(None)):
+    await _simulate_network()
+    return _store(await file.read())
+
+
+@app.post("/pinning/pinJSONToIPFS")
+async def pin_json(request: Request):
+    await _simulate_network()
+    body = await request.json()
+    content = body.get("pinataContent", body)
+    return _store(json.dumps(content, sort_keys=True, separators=(",", ":")).encode())
+
+
+@app.get("/ipfs/{cid}")
+async def gateway(cid: str):
+    if cid not in pins:
+        raise HTTPException(status_code=404, detail="not pinned")
+    payload = pins[cid]
+    return Response(payload, media_type="application/json" if payload[:1] == b"{" else "application/octet-stream")
@@ -1,32 +1,18 @@
 #genearte_proof.py
-import json
 import time
-import hashlib
-import os
+
+from zk_ai_backend.proof_ledger import ledger
+from zk_ai_backend.proof_record import ProofRecord
 
 
 def generate_proof(voice_result: int, keystroke_result: int) -> str:
     """
-    Generates a ZK-style proof JSON with a hash, returns the file path.
+    Generates a binary proof record, records it in the proof ledger and
+    returns its hash (look it up again with ledger.get).
     """
-    # Step 1: Combine results into a proof dict
+    # Step 1: Combine results into a proof record
     is_verified = voice_result == 1 and keystroke_result == 1
-    proof = {
-        "voice_result": int(voice_result),
-        "keystroke_result": int(keystroke_result),
-        "verified": is_verified,
-        "timestamp": int(time.time())
-    }
-
-    # Step 2: Hash the proof for tamper-evidence
-    proof_string = json.dumps(proof, sort_keys=True)
-    proof_hash = hashlib.sha256(proof_string.encode()).hexdigest()
-    proof["hash"] = proof_hash
-
-    # Step 3: Save to local JSON file
-    filename = f"zk_proof_{int(time.time())}.json"
-    filepath = os.path.join(os.getcwd(), filename)
-    with open(filepath, "w") as f:
-        json.dump(proof, f, indent=2)
+    proof = ProofRecord(voice_result, keystroke_result, is_verified, int(time.time()))
 
-    return filepath
+    # Step 2: Append to the ledger (durable once this returns); the hash covers the record's bytes
+    return ledger.append(proof)
@@ -0,0 +1,165 @@
+# idempotency.py
+"""
+Idempotent /verify and exact-replay detection, both keyed by content hashes.
+
+uploads.py hashes every field while it streams in, so keys cost no extra
+pass over the bytes.
+
+- The request key is sha256 over the model fingerprint, the decision
+  policy, the prover and VAD settings and the voice and keystroke
+  digests. For IDEMPOTENCY_TTL seconds a retry of the same upload gets
+  back the stored response (same proof, same CID) without decoding,
+  scoring, proving or pinning anything. Concurrent retries share one
+  computation. A model reload or settings change gives new keys, so
+  stale verdicts are never served.
+- The replay index remembers, for REPLAY_TTL seconds, every voice and
+  keystroke digest a model actually scored (not ones the policy cancelled),
+  with the upload it came in and when. Real recordings never repeat byte
+  for byte, so bytes already scored as part of a different upload are a
+  replay. The upload identity covers the bytes alone, so a retry stays a
+  retry across model reloads and setting changes. With
+  REPLAY_ACTION=reject a replay is answered as a bot before any model
+  runs; with "flag" it is scored as usual and only marked; "off" disables
+  the check.
+
+Both stores are ProofCache instances under IDEMPOTENCY_DIR, so they survive
+restarts and are bounded in memory and on disk.
+"""
+import os
+import json
+import time
+import hashlib
+
+from .proof_cache import ProofCache
+from .model_registry import registry
+from .decision import engine
+from .metrics import metrics
+from .zk.zk_generator import ZK_PROVER
+from voice.vad import vad_config
+
+IDEMPOTENCY_DIR = os.getenv("IDEMPOTENCY_DIR", ".idempotency")
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "600"))
+IDEMPOTENCY_MEMORY_BYTES = int(os.getenv("IDEMPOTENCY_MEMORY_BYTES", str(8 * 1024 * 1024)))
+IDEMPOTENCY_DISK_BYTES = int(os.getenv("IDEMPOTENCY_DISK_BYTES", str(64 * 1024 * 1024)))
+REPLAY_TTL = float(os.getenv("REPLAY_TTL", str(30 * 24 * 3600)))
+REPLAY_INDEX_BYTES = int(os.getenv("REPLAY_INDEX_BYTES", str(64 * 1024 * 1024)))
+REPLAY_ACTION = os.getenv("REPLAY_ACTION", "reject")
+
+REPLAY_ACTIONS = ("reject", "flag", "off")
+
+
+def request_key(digests: dict) -> str:
+    """
+    Idempotency key for one upload under the models and policy being served now.
+    """
+    material = {
+        "models": registry.fingerprint(),
+        "policy": engine.policy.describe(),
+        "prover": ZK_PROVER,
+        "vad": vad_config(),
+        "voice": digests.get("voice"),
+        "keystroke": digests.get("keystroke"),
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+
+def upload_key(digests: dict) -> str:
+    """
+    Identity of the uploaded bytes alone, independent of what is being served.
+    """
+    material = {modality: digests.get(modality) for modality in ("voice", "keystroke")}
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+
+class VerifyCache:
+    """
+    Stored /verify responses by request key, plus the replay index of
+    per-modality content digests.
+    """
+
+    def __init__(self, directory: str = IDEMPOTENCY_DIR, ttl: float = IDEMPOTENCY_TTL,
+                 replay_ttl: float = REPLAY_TTL, replay_action: str = REPLAY_ACTION):
+        if replay_action not in REPLAY_ACTIONS:
+            raise ValueError(f"❌ REPLAY_ACTION must be one of {REPLAY_ACTIONS}, got {replay_action!r}")
+        self.replay_action = replay_action
+        self.responses = ProofCache(os.path.join(directory, "responses"), IDEMPOTENCY_MEMORY_BYTES,
+                                    IDEMPOTENCY_DISK_BYTES, ttl)
+        # Entries are a few dozen bytes, so the memory tier covers most of the window
+        self.seen = ProofCache(os.path.join(directory, "seen"), REPLAY_INDEX_BYTES // 4,
+                               REPLAY_INDEX_BYTES, replay_ttl)
+        self.computed = 0
+        self.reused = 0
+        self.replays = {"voice": 0, "keystroke": 0}
+
+    async def get_or_compute(self, key: str, compute):
+        """
+        Returns (response bytes, reused). `compute()` runs once per key and
+        TTL window however many retries arrive.
+        """
+        computed = False
+
+        async def run() -> bytes:
+            nonlocal computed
+            computed = True
+            return await compute()
+
+        body = await self.responses.get_or_fetch("verify", key, run)
+        if computed:
+            self.computed += 1
+        else:
+            self.reused += 1
+            metrics.inc("zk_idempotent_hits_total")
+        return body, not computed
+
+    async def replayed(self, digests: dict) -> dict:
+        """
+        {modality: {"first_scored_at": unix seconds}} for every modality
+        whose exact bytes were already scored as part of a different upload.
+        Bytes first scored in this same upload are a retry, not a replay.
+        """
+        if self.replay_action == "off":
+            return {}
+        upload = upload_key(digests)
+        found = {}
+        for modality, digest in digests.items():
+            entry = await self.seen.aget(modality, digest) if digest else None
+            if entry is None:
+                continue
+            try:
+                first = json.loads(entry)
+            except ValueError:
+                continue  # bare request key from before uploads were recorded; cannot tell a retry apart
+            if first["upload"] == upload:
+                continue
+            found[modality] = {"first_scored_at": first["scored_at"]}
+            self.replays[modality] += 1
+            metrics.inc("zk_replays_total", modality=modality, action=self.replay_action)
+        return found
+
+    async def remember(self, digests: dict, scored):
+        """
+        Adds the digests of the modalities in `scored` (those a model actually
+        ran on) to the replay index.
+        """
+        if self.replay_action == "off":
+            return
+        entry = json.dumps({"upload": upload_key(digests), "scored_at": int(time.time())}).encode()
+        for modality in scored:
+            digest = digests.get(modality)
+            if digest and await self.seen.aget(modality, digest) is None:
+                await self.seen.aput(modality, digest, entry)
+
+    def stats(self) -> dict:
+        return {
+            "ttl": self.responses.ttl,
+            "replay_ttl": self.seen.ttl,
+            "replay_action": self.replay_action,
+            "computed": self.computed,
+            "reused": self.reused,
+            "replays": dict(self.replays),
+            "responses": self.responses.stats(),
+            "seen": self.seen.stats(),
+        }
+
+
+verify_cache = VerifyCache()
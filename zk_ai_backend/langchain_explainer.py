@@ -1,19 +1,12 @@
 #langchain_explainer.py
 
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
-from langchain_huggingface import HuggingFaceEndpoint
-from langchain.prompts import PromptTemplate
 
 load_dotenv()
 
-# ✅ Set up the updated HuggingFaceEndpoint class correctly
-llm = HuggingFaceEndpoint(
-    repo_id="mistralai/Mistral-7B-Instruct-v0.3",
-    huggingfacehub_api_token=os.environ["HUGGINGFACEHUB_API_TOKEN"],
-    temperature=0.2,
-    max_new_tokens=200,
-)
+MODEL_REPO_ID = "mistralai/Mistral-7B-Instruct-v0.3"
 
 # 🧠 Prompt
 template = """
@@ -25,12 +18,39 @@ Here is a proof dictionary:
 Explain in simple words why the user was verified or not.
 """
 
-prompt = PromptTemplate(template=template, input_variables=["proof"])
+class ExplainerNotConfigured(EnvironmentError):
+    pass
+
+@lru_cache(maxsize=1)
+def get_llm():
+    """
+    Builds the HuggingFaceEndpoint on first use, so importing this module is
+    cheap and a missing token only affects /explain-proof.
+    """
+    from langchain_huggingface import HuggingFaceEndpoint
+
+    token = os.environ.get("HUGGINGFACEHUB_API_TOKEN")
+    if not token:
+        raise ExplainerNotConfigured("❌ HUGGINGFACEHUB_API_TOKEN not found in .env file.")
+
+    # ✅ Set up the updated HuggingFaceEndpoint class correctly
+    return HuggingFaceEndpoint(
+        repo_id=MODEL_REPO_ID,
+        huggingfacehub_api_token=token,
+        temperature=0.2,
+        max_new_tokens=200,
+    )
+
+@lru_cache(maxsize=1)
+def get_prompt():
+    from langchain.prompts import PromptTemplate
+
+    return PromptTemplate(template=template, input_variables=["proof"])
 
 def explain_proof(zk_proof: dict) -> dict:
-    full_prompt = prompt.format(proof=zk_proof)
-    explanation = llm.invoke(full_prompt)
+    full_prompt = get_prompt().format(proof=zk_proof)
+    explanation = get_llm().invoke(full_prompt)
     return {
         "explanation": explanation,
-        "from_model": "mistralai/Mistral-7B-Instruct-v0.3"
+        "from_model": MODEL_REPO_ID
     }
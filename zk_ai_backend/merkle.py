@@ -0,0 +1,184 @@
+# merkle.py
+"""
+SHA-256 Merkle trees over proof leaves.
+
+    leaf  = sha256(0x00 || proof hash (32 bytes) || CID)
+    node  = sha256(0x01 || left || right)
+
+The prefixes keep a leaf from ever being passed off as an interior node. A
+level with an odd node count carries its last node up unchanged, so n leaves
+need exactly n - 1 interior hashes.
+
+Levels are stored as flat byte strings of 32-byte digests. `build_levels`
+hashes a whole level per pass over one contiguous buffer. Past
+MERKLE_PARALLEL_LEAVES leaves it splits the tree into power-of-two subtrees
+and builds them in a process pool. `IncrementalMerkleTree` keeps only the
+nodes whose subtree is complete. Appending a leaf is amortised O(1), and the
+root or an inclusion path is O(log n) at any time.
+"""
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+MERKLE_PARALLEL_LEAVES = int(os.getenv("MERKLE_PARALLEL_LEAVES", str(1 << 18)))
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+DIGEST_SIZE = 32
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+
+def leaf_hash(proof_hash: str, cid: str) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + bytes.fromhex(proof_hash) + cid.encode()).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def hash_pairs(level: bytes) -> bytes:
+    """
+    Hashes nodes (0,1), (2,3), ... of a flat level; an odd last node is dropped.
+    """
+    pairs = len(level) // (2 * DIGEST_SIZE)
+    if pairs == 0:
+        return b""
+    # One contiguous 0x01 || left || right row per pair, laid out in a single copy
+    rows = np.empty((pairs, 1 + 2 * DIGEST_SIZE), dtype=np.uint8)
+    rows[:, 0] = NODE_PREFIX[0]
+    rows[:, 1:] = np.frombuffer(level, dtype=np.uint8, count=pairs * 2 * DIGEST_SIZE).reshape(pairs, -1)
+    flat = rows.tobytes()
+    width = rows.shape[1]
+    sha256 = hashlib.sha256
+    return b"".join([sha256(flat[i:i + width]).digest() for i in range(0, len(flat), width)])
+
+
+def _complete_levels(leaves: bytes) -> list:
+    """
+    Stable levels of a tree: level k holds the nodes whose 2**k leaves are all present.
+    """
+    levels = [bytes(leaves)]
+    while len(levels[-1]) >= 2 * DIGEST_SIZE:
+        levels.append(hash_pairs(levels[-1]))
+    return levels
+
+
+def build_levels(leaves: bytes, workers: int = None) -> list:
+    """
+    Stable levels for a flat buffer of leaf digests, building aligned
+    subtrees in parallel for large inputs.
+    """
+    n = len(leaves) // DIGEST_SIZE
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or n < MERKLE_PARALLEL_LEAVES:
+        return _complete_levels(leaves)
+
+    # Aligned power-of-two chunks never pair across a chunk boundary below their top
+    height = max(1, (n // workers).bit_length() - 1)
+    chunk = (1 << height) * DIGEST_SIZE
+    chunks = [leaves[i:i + chunk] for i in range(0, len(leaves), chunk)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        parts = list(executor.map(_complete_levels, chunks))
+    levels = [b"".join(part[k] for part in parts if k < len(part)) for k in range(height + 1)]
+    while len(levels[-1]) >= 2 * DIGEST_SIZE:
+        levels.append(hash_pairs(levels[-1]))
+    return levels
+
+
+class IncrementalMerkleTree:
+    """
+    Append-only tree. `levels[k]` holds the nodes whose subtree of 2**k
+    leaves is complete. The right edge, at most one node per level, is
+    derived on demand.
+    """
+
+    def __init__(self, levels: list = None):
+        self.levels = [bytearray(level) for level in levels] if levels else [bytearray()]
+        self.size = len(self.levels[0]) // DIGEST_SIZE
+
+    @classmethod
+    def from_leaves(cls, leaves: bytes, workers: int = None):
+        return cls(build_levels(leaves, workers))
+
+    def append(self, leaf: bytes):
+        self.levels[0] += leaf
+        self.size += 1
+        # Binary-counter carry: every even count completes a node one level up
+        k = 0
+        while len(self.levels[k]) // DIGEST_SIZE % 2 == 0:
+            level = self.levels[k]
+            node = node_hash(bytes(level[-2 * DIGEST_SIZE:-DIGEST_SIZE]), bytes(level[-DIGEST_SIZE:]))
+            if k + 1 == len(self.levels):
+                self.levels.append(bytearray())
+            self.levels[k + 1] += node
+            k += 1
+
+    def _node(self, k: int, i: int) -> bytes:
+        return bytes(self.levels[k][i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE])
+
+    def _edges(self) -> list:
+        """
+        edges[k] is the incomplete right-edge node at level k, or None.
+        The last entry is the root.
+        """
+        edges = []
+        carry = None
+        for k, level in enumerate(self.levels):
+            edges.append(carry)
+            count = len(level) // DIGEST_SIZE
+            if count % 2:
+                last = self._node(k, count - 1)
+                carry = last if carry is None else node_hash(last, carry)
+        edges.append(carry)
+        return edges
+
+    def root(self) -> bytes:
+        if self.size == 0:
+            return EMPTY_ROOT
+        top = self.levels[-1]
+        edges = self._edges()
+        return edges[-1] if edges[-1] is not None else bytes(top[-DIGEST_SIZE:])
+
+    def leaf(self, index: int) -> bytes:
+        return self._node(0, index)
+
+    def path(self, index: int) -> list:
+        """
+        Sibling hashes from leaf to root as [(hex digest, "left" | "right")];
+        levels where the node is carried up have no entry.
+        """
+        if not 0 <= index < self.size:
+            raise IndexError(f"❌ Leaf {index} is outside a tree of {self.size}")
+        edges = self._edges()
+        path = []
+        position = index
+        for k, level in enumerate(self.levels):
+            count = len(level) // DIGEST_SIZE
+            sibling = position ^ 1
+            if sibling < count:
+                node = self._node(k, sibling)
+            elif sibling == count and edges[k] is not None:
+                node = edges[k]
+            else:
+                node = None
+            if node is not None:
+                path.append((node.hex(), "left" if sibling < position else "right"))
+            position >>= 1
+        return path
+
+
+def merkle_root(leaves: bytes, workers: int = None) -> bytes:
+    return IncrementalMerkleTree(build_levels(leaves, workers)).root() if leaves else EMPTY_ROOT
+
+
+def verify_inclusion(leaf: bytes, path: list, root: bytes) -> bool:
+    """
+    Recomputes the root from a leaf digest and its path; needs nothing else.
+    """
+    node = leaf
+    for sibling_hex, side in path:
+        sibling = bytes.fromhex(sibling_hex)
+        node = node_hash(sibling, node) if side == "left" else node_hash(node, sibling)
+    return node == root
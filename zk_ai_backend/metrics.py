@@ -0,0 +1,275 @@
+# metrics.py
+"""
+Lightweight in-process instrumentation: per-stage latency histograms,
+labelled counters and gauges, rendered in the Prometheus text format.
+
+Spans and counter increments inside a worker-pool job are collected by the
+job and handed back to the parent process, so stage timings and counters
+look the same for thread and process pools. With METRICS_ENABLED=0 spans,
+timings and counters are all no-ops.
+
+The optional sampling profiler (PROFILE_SLOW_MS > 0) snapshots every thread's
+stack each PROFILE_INTERVAL_MS into a ring buffer; when a request is slower
+than the threshold, the samples taken during it are written as folded stacks
+(flamegraph.pl / speedscope input) to PROFILE_DIR.
+"""
+import os
+import sys
+import time
+import bisect
+import itertools
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# 🔥 Requests slower than this get a folded-stack profile (0 disables the sampler)
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", ".profiles")
+
+# Seconds; spans range from sub-millisecond parsing to multi-second IPFS calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_local = threading.local()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple, le: str = None) -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    if le is not None:
+        parts.append(f'le="{le}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count", "peak")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.peak = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+        self.peak = max(self.peak, value)
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms = {}  # name -> {labels: Histogram}
+        self._counters = {}  # name -> {labels: float}
+        self._gauges = {}  # name -> (help, fn)
+        self._help = {}
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    # ⏱️ Timings ---------------------------------------------------------------
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def record(self, stage: str, seconds: float):
+        """
+        Records one stage timing, or hands it to the enclosing pool job.
+        """
+        if not self.enabled:
+            return
+        collected = getattr(_local, "collected", None)
+        if collected is not None:
+            collected["spans"].append((stage, seconds))
+        else:
+            self.observe("zk_stage_seconds", seconds, stage=stage)
+
+    @contextmanager
+    def span(self, stage: str):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    # 🔢 Counters and gauges ---------------------------------------------------
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        collected = getattr(_local, "collected", None)
+        if collected is not None:
+            collected["counters"].append((name, amount, key))
+            return
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def merge(self, collected: dict):
+        """
+        Records what collect_job_metrics gathered inside a pool job.
+        """
+        for stage, seconds in collected["spans"]:
+            self.record(stage, seconds)
+        for name, amount, key in collected["counters"]:
+            self.inc(name, amount, **dict(key))
+
+    def gauge(self, name: str, help_text: str, fn):
+        """
+        Registers a callback evaluated at scrape time.
+        """
+        self._gauges[name] = (help_text, fn)
+
+    # 📤 Export ----------------------------------------------------------------
+
+    def stage_snapshot(self) -> dict:
+        """
+        {stage: {count, mean_ms, max_ms}} for the JSON status endpoints.
+        """
+        with self._lock:
+            series = self._histograms.get("zk_stage_seconds", {})
+            return {
+                dict(key)["stage"]: {
+                    "count": h.count,
+                    "mean_ms": round(h.total / h.count * 1000, 3),
+                    "max_ms": round(h.peak * 1000, 3),
+                }
+                for key, h in series.items() if h.count
+            }
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(h.buckets, h.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, bound)} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, '+Inf')} {h.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {h.total}")
+                    lines.append(f"{name}_count{_format_labels(key)} {h.count}")
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+        for name, (help_text, fn) in sorted(self._gauges.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {fn()}")
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def collect_job_metrics():
+    """
+    Inside a pool job: gathers the job's spans and counter increments
+    instead of recording them, so the parent can merge them after the job
+    returns (a process-pool worker's own registry is never scraped).
+    """
+    previous = getattr(_local, "collected", None)
+    collected = _local.collected = {"spans": [], "counters": []}
+    try:
+        yield collected
+    finally:
+        _local.collected = previous
+
+
+metrics = MetricsRegistry()
+metrics.describe("zk_stage_seconds", "Seconds spent per pipeline stage.")
+metrics.describe("zk_http_request_seconds", "HTTP request latency by route.")
+metrics.describe("zk_http_requests_total", "HTTP requests by route and status.")
+metrics.describe("zk_verify_outcomes_total", "Final /verify decisions.")
+metrics.describe("zk_predictions_total", "Per-modality model predictions.")
+metrics.describe("zk_failures_total", "Failures by stage.")
+metrics.describe("zk_decisions_total", "Verdicts by policy and the modality that settled them.")
+metrics.describe("zk_modality_skipped_total", "Modalities cancelled or never started after a verdict.")
+metrics.describe("zk_skipped_work_seconds_total", "Estimated modality seconds saved by short-circuiting.")
+metrics.describe("zk_idempotent_hits_total", "/verify retries answered from the idempotency cache.")
+metrics.describe("zk_vad_seconds_total", "Voice seconds kept for or dropped before MFCC extraction.")
+metrics.describe("zk_replays_total", "Uploads whose exact bytes were seen in an earlier request.")
+
+
+class SamplingProfiler:
+    """
+    Background thread sampling all thread stacks into a bounded ring.
+    """
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS, max_samples: int = 20000,
+                 out_dir: str = PROFILE_DIR):
+        self.interval = interval_ms / 1000
+        self.out_dir = out_dir
+        self._samples = deque(maxlen=max_samples)
+        self._stop = threading.Event()
+        self._thread = None
+        self._seq = itertools.count()
+
+    def _folded(self, frame) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    self._samples.append((now, self._folded(frame)))
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def dump(self, start: float, end: float, label: str):
+        """
+        Writes the stacks sampled between perf_counter stamps `start` and `end`.
+        Returns the file path, or None if nothing was sampled.
+        """
+        stacks = Counter(stack for t, stack in list(self._samples) if start <= t <= end)
+        if not stacks:
+            return None
+        os.makedirs(self.out_dir, exist_ok=True)
+        safe = "".join(c if c.isalnum() else "_" for c in label).strip("_")
+        path = os.path.join(self.out_dir, f"{int(time.time() * 1000)}_{next(self._seq)}_{safe}.folded")
+        with open(path, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+profiler = SamplingProfiler() if PROFILE_SLOW_MS > 0 else None
@@ -0,0 +1,199 @@
+# model_registry.py
+import os
+import sys
+import time
+import hashlib
+import threading
+import resource
+
+VOICE_MODEL_PATH = os.getenv("VOICE_MODEL_PATH", "models/voice_model.joblib")
+KEYSTROKE_MODEL_PATH = os.getenv("KEYSTROKE_MODEL_PATH", "models/keystroke_model.joblib")
+
+# 🗺️ Memory-map the estimator arrays instead of copying them into every worker
+MODEL_MMAP = os.getenv("MODEL_MMAP", "0") == "1"
+# 🔁 Seconds between mtime checks for hot reload (0 disables the watcher)
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "5"))
+# 🗜️ Serve the NumPy-only .npz exports (python -m zk_ai_backend.export_models) when present
+MODEL_COMPILED = os.getenv("MODEL_COMPILED", "0") == "1"
+
+
+def compiled_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".npz"
+
+
+def current_rss_bytes() -> int:
+    """
+    Resident memory of this process in bytes (peak RSS where /proc is missing).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and kilobytes on Linux
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class ModelEntry:
+    __slots__ = ("name", "path", "model", "mtime", "version", "load_seconds", "rss_delta", "loaded_at")
+
+    def __init__(self, name, path, model, mtime, version, load_seconds, rss_delta):
+        self.name = name
+        self.path = path
+        self.model = model
+        self.mtime = mtime
+        self.version = version
+        self.load_seconds = load_seconds
+        self.rss_delta = rss_delta
+        self.loaded_at = time.time()
+
+
+class ModelRegistry:
+    """
+    Loads each model once and shares it across requests.
+
+    Entries are swapped atomically: a reload builds the new model completely
+    before replacing the dict slot, so readers always see a whole model.
+    """
+
+    def __init__(self, paths: dict, mmap: bool = MODEL_MMAP, reload_interval: float = MODEL_RELOAD_INTERVAL,
+                 compiled: bool = MODEL_COMPILED):
+        self.paths = dict(paths)
+        self.mmap = mmap
+        self.compiled = compiled
+        self.reload_interval = reload_interval
+        self._entries = {}
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def _resolve(self, name: str) -> str:
+        path = self.paths[name]
+        compiled = compiled_path(path)
+        # An export older than its .joblib is stale; serve the estimator until re-exported
+        if self.compiled and os.path.exists(compiled) and \
+                (not os.path.exists(path) or os.stat(compiled).st_mtime_ns >= os.stat(path).st_mtime_ns):
+            return compiled
+        return path
+
+    def _load(self, name: str) -> ModelEntry:
+        path = self._resolve(name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"❌ {name} model not found at {path}.")
+
+        mtime = os.stat(path).st_mtime_ns
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+        if path.endswith(".npz"):
+            from .compiled_model import load_compiled
+
+            model = load_compiled(path)
+        else:
+            import joblib
+
+            model = joblib.load(path, mmap_mode="r" if self.mmap else None)
+        load_seconds = time.perf_counter() - start
+        rss_delta = current_rss_bytes() - rss_before
+
+        previous = self._entries.get(name)
+        version = previous.version + 1 if previous else 1
+        entry = ModelEntry(name, path, model, mtime, version, load_seconds, rss_delta)
+        self._entries[name] = entry
+        print(f"📦 Loaded {name} model v{version} from {path} in {load_seconds * 1000:.1f} ms")
+        return entry
+
+    def load_all(self):
+        with self._load_lock:
+            for name in self.paths:
+                self._load(name)
+
+    def get(self, name: str):
+        """
+        Returns the shared model instance; only touches disk if it was never loaded.
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            with self._load_lock:
+                entry = self._entries.get(name) or self._load(name)
+        return entry.model
+
+    def check_for_updates(self) -> list:
+        """
+        Reloads every model whose file mtime changed. Returns the reloaded names.
+        """
+        reloaded = []
+        with self._load_lock:
+            for name in self.paths:
+                entry = self._entries.get(name)
+                path = self._resolve(name)
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                if entry is not None and path == entry.path and mtime == entry.mtime:
+                    continue
+                try:
+                    self._load(name)
+                    reloaded.append(name)
+                except Exception as e:
+                    # Keep serving the old model if the new file is half-written or broken
+                    print(f"⚠️ Failed to reload {name} model: {e}")
+        return reloaded
+
+    def _watch(self):
+        while not self._stop.wait(self.reload_interval):
+            self.check_for_updates()
+
+    def start_watcher(self):
+        if self.reload_interval <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.reload_interval + 1)
+            self._watcher = None
+
+    def fingerprint(self) -> str:
+        """
+        Identifies the model files being served. Unlike `version` it survives
+        restarts, and it changes whenever any model file is replaced.
+        """
+        digest = hashlib.sha256()
+        for name in sorted(self.paths):
+            entry = self._entries.get(name)
+            if entry is not None:
+                path, mtime = entry.path, entry.mtime
+            else:
+                path = self._resolve(name)
+                mtime = os.stat(path).st_mtime_ns if os.path.exists(path) else None
+            digest.update(f"{name}\0{path}\0{mtime}\n".encode())
+        return digest.hexdigest()[:16]
+
+    def stats(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint(),
+            "rss_bytes": current_rss_bytes(),
+            "mmap": self.mmap,
+            "compiled": self.compiled,
+            "models": {
+                name: {
+                    "path": entry.path,
+                    "version": entry.version,
+                    "mtime_ns": entry.mtime,
+                    "load_ms": round(entry.load_seconds * 1000, 3),
+                    "rss_delta_bytes": entry.rss_delta,
+                    "loaded_at": entry.loaded_at,
+                }
+                for name, entry in self._entries.items()
+            },
+        }
+
+
+registry = ModelRegistry({
+    "voice": VOICE_MODEL_PATH,
+    "keystroke": KEYSTROKE_MODEL_PATH,
+})
@@ -0,0 +1,201 @@
+# proof_cache.py
+import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+
+PROOF_CACHE_DIR = os.getenv("PROOF_CACHE_DIR", ".proof_cache")
+PROOF_CACHE_MEMORY_BYTES = int(os.getenv("PROOF_CACHE_MEMORY_BYTES", str(16 * 1024 * 1024)))
+PROOF_CACHE_DISK_BYTES = int(os.getenv("PROOF_CACHE_DISK_BYTES", str(256 * 1024 * 1024)))
+PROOF_CACHE_TTL = float(os.getenv("PROOF_CACHE_TTL", str(24 * 3600)))
+
+
+class ProofCache:
+    """
+    Two-tier cache keyed by (namespace, CID): an in-memory LRU in front of a
+    directory of files. Both tiers evict by total size (LRU / oldest first)
+    and by TTL. Concurrent misses for the same key share one in-flight fetch.
+    """
+
+    def __init__(self, directory: str = PROOF_CACHE_DIR, memory_bytes: int = PROOF_CACHE_MEMORY_BYTES,
+                 disk_bytes: int = PROOF_CACHE_DISK_BYTES, ttl: float = PROOF_CACHE_TTL):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.ttl = ttl
+        self._memory = OrderedDict()  # key -> (stored_at, value)
+        self._memory_size = 0
+        self._disk = None  # path -> (stored_at, size), oldest first
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        self._mem_lock = threading.Lock()
+        self._inflight = {}
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+    # 🧠 Memory tier -----------------------------------------------------------
+
+    def _memory_get(self, key):
+        with self._mem_lock:
+            item = self._memory.get(key)
+            if item is None:
+                return None
+            stored_at, value = item
+            if time.time() - stored_at > self.ttl:
+                self._memory_pop(key)
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _memory_pop(self, key):
+        _, value = self._memory.pop(key)
+        self._memory_size -= len(value)
+
+    def _memory_put(self, key, value: bytes, stored_at: float):
+        if len(value) > self.memory_bytes:
+            return
+        with self._mem_lock:
+            if key in self._memory:
+                self._memory_pop(key)
+            self._memory[key] = (stored_at, value)
+            self._memory_size += len(value)
+            while self._memory_size > self.memory_bytes:
+                self._memory_pop(next(iter(self._memory)))
+
+    # 💾 Disk tier -------------------------------------------------------------
+
+    def _path(self, key) -> str:
+        namespace, cid = key
+        return os.path.join(self.directory, namespace, cid)
+
+    def _disk_index(self) -> OrderedDict:
+        if self._disk is None:
+            entries = []
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    path = os.path.join(root, name)
+                    st = os.stat(path)
+                    entries.append((st.st_mtime, path, st.st_size))
+            entries.sort()
+            self._disk = OrderedDict((path, (mtime, size)) for mtime, path, size in entries)
+            self._disk_size = sum(size for _, size in self._disk.values())
+        return self._disk
+
+    def _disk_remove(self, path: str):
+        _, size = self._disk.pop(path)
+        self._disk_size -= size
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _disk_get(self, key):
+        path = self._path(key)
+        with self._lock:
+            entry = self._disk_index().get(path)
+            if entry is None:
+                return None
+            stored_at, _ = entry
+            if time.time() - stored_at > self.ttl:
+                self._disk_remove(path)
+                return None
+        try:
+            with open(path, "rb") as f:
+                return stored_at, f.read()
+        except FileNotFoundError:
+            return None
+
+    def _disk_put(self, key, value: bytes, stored_at: float):
+        if len(value) > self.disk_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(value)
+        os.replace(tmp, path)
+        with self._lock:
+            index = self._disk_index()
+            if path in index:
+                self._disk_size -= index.pop(path)[1]
+            index[path] = (stored_at, len(value))
+            self._disk_size += len(value)
+            while self._disk_size > self.disk_bytes:
+                self._disk_remove(next(iter(index)))
+
+    # 🔑 Public API ------------------------------------------------------------
+
+    def get(self, namespace: str, cid: str):
+        """
+        Returns cached bytes or None. May read from disk — use aget on the event loop.
+        """
+        key = (namespace, cid)
+        value = self._memory_get(key)
+        if value is not None:
+            self.hits["memory"] += 1
+            return value
+        found = self._disk_get(key)
+        if found is None:
+            return None
+        stored_at, value = found
+        self.hits["disk"] += 1
+        self._memory_put(key, value, stored_at)
+        return value
+
+    def put(self, namespace: str, cid: str, value: bytes):
+        key = (namespace, cid)
+        stored_at = time.time()
+        self._memory_put(key, value, stored_at)
+        self._disk_put(key, value, stored_at)
+
+    async def aget(self, namespace: str, cid: str):
+        # Memory hits never leave the event loop; only disk reads go to a thread
+        value = self._memory_get((namespace, cid))
+        if value is not None:
+            self.hits["memory"] += 1
+            return value
+        return await asyncio.to_thread(self.get, namespace, cid)
+
+    async def aput(self, namespace: str, cid: str, value: bytes):
+        await asyncio.to_thread(self.put, namespace, cid, value)
+
+    async def get_or_fetch(self, namespace: str, cid: str, fetch):
+        """
+        Returns the cached value, or awaits `fetch()` (a coroutine function
+        returning bytes) exactly once per key no matter how many callers miss.
+        """
+        value = await self.aget(namespace, cid)
+        if value is not None:
+            return value
+
+        key = (namespace, cid)
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+
+            async def load():
+                try:
+                    result = await fetch()
+                    await self.aput(namespace, cid, result)
+                    return result
+                finally:
+                    self._inflight.pop(key, None)
+
+            task = asyncio.ensure_future(load())
+            self._inflight[key] = task
+        # Shield so one caller disconnecting does not cancel the shared fetch
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "memory_items": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "disk_bytes": self._disk_size,
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "inflight": len(self._inflight),
+        }
+
+
+proof_cache = ProofCache()
@@ -0,0 +1,433 @@
+# proof_ledger.py
+"""
+Append-only ledger of every proof the backend issues.
+
+Records go to numbered segment files in PROOF_LEDGER_DIR. Each record is a
+fixed header followed by its payload:
+
+    length u32 | crc32 u32 | type u8 | timestamp i64 | proof hash (32 bytes) | payload
+
+A proof record's payload is the proof's canonical binary encoding
+(proof_record.py), the same bytes its hash covers; ledgers written before
+that hold canonical JSON instead and still read back. A CID record links a
+proof hash to the CID it was pinned under. Appends from all callers go
+through a single writer thread that group-commits everything queued: one
+write and one fsync per batch. Callers return only once their record is
+durable.
+
+Hash, CID and timestamp indexes live in memory. At open they are rebuilt
+from the record headers alone, without decoding any payload. A torn record at
+the end of the last segment, left by a crash, is truncated away.
+
+Usage (from the repo root):
+    python -m zk_ai_backend.proof_ledger stats
+    python -m zk_ai_backend.proof_ledger get <hash or CID>
+    python -m zk_ai_backend.proof_ledger export --since 3600 --out proofs.jsonl
+"""
+import os
+import json
+import time
+import zlib
+import queue
+import struct
+import bisect
+import asyncio
+import threading
+from concurrent.futures import Future
+
+from .proof_record import ProofRecord, is_record, load_json
+
+PROOF_LEDGER_DIR = os.getenv("PROOF_LEDGER_DIR", ".proof_ledger")
+PROOF_LEDGER_SEGMENT_BYTES = int(os.getenv("PROOF_LEDGER_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+# "0" trades durability for speed (benchmarks, throwaway environments)
+PROOF_LEDGER_FSYNC = os.getenv("PROOF_LEDGER_FSYNC", "1") == "1"
+PROOF_LEDGER_MAX_BATCH = int(os.getenv("PROOF_LEDGER_MAX_BATCH", "4096"))
+
+HEADER = struct.Struct("<IIBq32s")
+RECORD_PROOF = 1
+RECORD_CID = 2
+
+_SEGMENT_PREFIX = "segment_"
+_SEGMENT_SUFFIX = ".log"
+
+
+class LedgerLocked(RuntimeError):
+    pass
+
+
+def _encode(kind: int, timestamp: int, key: bytes, payload: bytes) -> bytes:
+    header_tail = HEADER.pack(len(payload), 0, kind, timestamp, key)[8:]
+    crc = zlib.crc32(payload, zlib.crc32(header_tail))
+    return HEADER.pack(len(payload), crc, kind, timestamp, key) + payload
+
+
+def _segment_name(number: int) -> str:
+    return f"{_SEGMENT_PREFIX}{number:06d}{_SEGMENT_SUFFIX}"
+
+
+class ProofLedger:
+    def __init__(self, directory: str = PROOF_LEDGER_DIR, segment_bytes: int = PROOF_LEDGER_SEGMENT_BYTES,
+                 fsync: bool = PROOF_LEDGER_FSYNC, max_batch: int = PROOF_LEDGER_MAX_BATCH):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._opened = False
+        self._readonly = True
+        self._by_hash = {}  # hash -> (segment, offset, length)
+        self._by_cid = {}  # cid -> hash
+        self._cid_of = {}  # hash -> cid
+        self._time_keys = []  # sorted (timestamp, seq)
+        self._time_locs = []  # matching locations
+        self._seq = 0
+        self._read_fds = {}
+        self._segment = None
+        self._write_fd = None
+        self._write_size = 0
+        self._lock_fd = None
+        self._queue = queue.Queue()
+        self._writer = None
+        self.records = 0
+        self.commits = 0
+        self.committed = 0
+        self.truncated_bytes = 0
+
+    # 📂 Opening and recovery ---------------------------------------------------
+
+    def _segments(self) -> list:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            int(name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)]) for name in names
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX)
+        )
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self.directory, _segment_name(segment))
+
+    def _index(self, kind: int, timestamp: int, key: bytes, location: tuple, payload: bytes = None):
+        proof_hash = key.hex()
+        if kind == RECORD_PROOF:
+            # Only nonce-less ZKP1 proofs (same results, same second) can share a hash; keep the first copy
+            self._by_hash.setdefault(proof_hash, location)
+            entry = (timestamp, self._seq)
+            self._seq += 1
+            i = bisect.bisect_right(self._time_keys, entry)
+            self._time_keys.insert(i, entry)
+            self._time_locs.insert(i, location)
+            self.records += 1
+        elif kind == RECORD_CID:
+            cid = payload.decode()
+            self._by_cid[cid] = proof_hash
+            self._cid_of[proof_hash] = cid
+
+    def _scan(self, segment: int, last: bool):
+        path = self._path(segment)
+        with open(path, "rb") as f:
+            data = f.read()
+        view = memoryview(data)
+        offset = 0
+        while offset + HEADER.size <= len(data):
+            length, crc, kind, timestamp, key = HEADER.unpack_from(view, offset)
+            end = offset + HEADER.size + length
+            if end > len(data):
+                break
+            header_crc = zlib.crc32(view[offset + 8:offset + HEADER.size])
+            if zlib.crc32(view[offset + HEADER.size:end], header_crc) != crc:
+                break
+            payload = bytes(view[offset + HEADER.size:end]) if kind == RECORD_CID else None
+            self._index(kind, timestamp, key, (segment, offset + HEADER.size, length), payload)
+            offset = end
+        if offset < len(data):
+            if last and not self._readonly:
+                # Torn tail from a crash mid-write: everything before it was fsynced
+                print(f"⚠️ Proof ledger: truncating {len(data) - offset} torn bytes from {path}")
+                with open(path, "r+b") as f:
+                    f.truncate(offset)
+                self.truncated_bytes += len(data) - offset
+            elif not last:
+                print(f"⚠️ Proof ledger: ignoring {len(data) - offset} unreadable bytes in {path}")
+        return offset
+
+    def open(self, readonly: bool = False):
+        """
+        Rebuilds the indexes from disk. A writable ledger also takes an
+        exclusive lock on the directory and starts the writer thread.
+        """
+        with self._open_lock:
+            if self._opened:
+                return self
+            self._readonly = readonly
+            if not readonly:
+                import fcntl
+
+                os.makedirs(self.directory, exist_ok=True)
+                self._lock_fd = os.open(os.path.join(self.directory, "LOCK"), os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    os.close(self._lock_fd)
+                    self._lock_fd = None
+                    raise LedgerLocked(f"❌ Proof ledger {self.directory} is open in another process; "
+                                       f"give each writer its own PROOF_LEDGER_DIR.") from None
+
+            start = time.perf_counter()
+            segments = self._segments()
+            size = 0
+            for i, segment in enumerate(segments):
+                size = self._scan(segment, last=i == len(segments) - 1)
+            if segments and not readonly:
+                print(f"📒 Proof ledger: {self.records} proofs in {len(segments)} segment(s), "
+                      f"indexed in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+            if not readonly:
+                self._open_segment(segments[-1] if segments else 0, size)
+                self._writer = threading.Thread(target=self._run, name="proof-ledger-writer", daemon=True)
+                self._writer.start()
+            self._opened = True
+            return self
+
+    def _open_segment(self, segment: int, size: int):
+        self._segment = segment
+        self._write_fd = os.open(self._path(segment), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._write_size = size
+
+    def close(self):
+        with self._open_lock:
+            if not self._opened:
+                return
+            if self._writer is not None:
+                self._queue.put(None)
+                self._writer.join()
+                self._writer = None
+            if self._write_fd is not None:
+                os.close(self._write_fd)
+                self._write_fd = None
+            for fd in self._read_fds.values():
+                os.close(fd)
+            self._read_fds.clear()
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+            self._opened = False
+
+    # ✍️ Group commit -----------------------------------------------------------
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+            # Everything queued while the previous fsync ran commits together
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+            if stopping:
+                return
+
+    def _commit(self, batch: list):
+        try:
+            if self._write_size >= self.segment_bytes:
+                if self.fsync:
+                    os.fsync(self._write_fd)
+                os.close(self._write_fd)
+                self._open_segment(self._segment + 1, 0)
+            buffer = bytearray()
+            locations = []
+            for record, _, _ in batch:
+                locations.append((self._segment, self._write_size + len(buffer) + HEADER.size,
+                                  len(record) - HEADER.size))
+                buffer += record
+            view = memoryview(buffer)
+            while view:
+                written = os.write(self._write_fd, view)
+                view = view[written:]
+            if self.fsync:
+                (getattr(os, "fdatasync", None) or os.fsync)(self._write_fd)
+            self._write_size += len(buffer)
+        except BaseException as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        with self._lock:
+            for (record, payload, _), location in zip(batch, locations):
+                _, _, kind, timestamp, key = HEADER.unpack_from(record)
+                self._index(kind, timestamp, key, location, payload)
+            self.commits += 1
+            self.committed += len(batch)
+        for (_, _, future), location in zip(batch, locations):
+            future.set_result(location)
+
+    def _submit(self, kind: int, timestamp: int, proof_hash: str, payload: bytes) -> Future:
+        if not self._opened:
+            self.open()
+        if self._readonly:
+            raise RuntimeError("❌ Proof ledger was opened read-only.")
+        future = Future()
+        record = _encode(kind, timestamp, bytes.fromhex(proof_hash), payload)
+        self._queue.put((record, payload if kind == RECORD_CID else None, future))
+        return future
+
+    def append(self, proof: ProofRecord) -> str:
+        """
+        Durably records a proof and returns its hash.
+        """
+        self._submit(RECORD_PROOF, proof.timestamp, proof.hash, proof.encode()).result()
+        return proof.hash
+
+    def link_cid(self, proof_hash: str, cid: str):
+        self._submit(RECORD_CID, int(time.time()), proof_hash, cid.encode()).result()
+
+    async def append_async(self, proof: ProofRecord) -> str:
+        future = self._submit(RECORD_PROOF, proof.timestamp, proof.hash, proof.encode())
+        await asyncio.wrap_future(future)
+        return proof.hash
+
+    async def link_cid_async(self, proof_hash: str, cid: str):
+        await asyncio.wrap_future(self._submit(RECORD_CID, int(time.time()), proof_hash, cid.encode()))
+
+    # 🔎 Lookups ----------------------------------------------------------------
+
+    def _read(self, location: tuple) -> dict:
+        return load_json(self._read_payload(location))
+
+    def _read_payload(self, location: tuple) -> bytes:
+        segment, offset, length = location
+        fd = self._read_fds.get(segment)
+        if fd is None:
+            with self._lock:
+                fd = self._read_fds.get(segment)
+                if fd is None:
+                    fd = self._read_fds[segment] = os.open(self._path(segment), os.O_RDONLY)
+        return os.pread(fd, length, offset)
+
+    def get(self, proof_hash: str):
+        if not self._opened:
+            self.open()
+        location = self._by_hash.get(proof_hash)
+        return self._read(location) if location is not None else None
+
+    def get_record(self, proof_hash: str):
+        """
+        The stored ProofRecord itself (None for unknown or pre-binary JSON proofs).
+        """
+        if not self._opened:
+            self.open()
+        location = self._by_hash.get(proof_hash)
+        if location is None:
+            return None
+        payload = self._read_payload(location)
+        return ProofRecord.decode(payload) if is_record(payload) else None
+
+    def get_by_cid(self, cid: str):
+        if not self._opened:
+            self.open()
+        proof_hash = self._by_cid.get(cid)
+        return self.get(proof_hash) if proof_hash is not None else None
+
+    def cid_for(self, proof_hash: str):
+        return self._cid_of.get(proof_hash)
+
+    def pinned(self) -> list:
+        """
+        (hash, CID) for every pinned proof, in the order the CIDs were linked.
+        """
+        with self._lock:
+            return list(self._cid_of.items())
+
+    def range(self, since: float = None, until: float = None, limit: int = None):
+        """
+        Yields proofs with since <= timestamp < until, oldest first.
+        """
+        if not self._opened:
+            self.open()
+        with self._lock:
+            lo = 0 if since is None else bisect.bisect_left(self._time_keys, (since, -1))
+            hi = len(self._time_keys) if until is None else bisect.bisect_left(self._time_keys, (until, -1))
+            if limit is not None:
+                hi = min(hi, lo + limit)
+            locations = self._time_locs[lo:hi]
+        for location in locations:
+            yield self._read(location)
+
+    def export(self, out, since: float = None, until: float = None) -> int:
+        """
+        Writes matching proofs as JSON Lines (with their CID, if pinned) to a
+        path or an open text file. Returns the number written.
+        """
+        if isinstance(out, str):
+            with open(out, "w") as f:
+                return self.export(f, since, until)
+        count = 0
+        for proof in self.range(since, until):
+            cid = self.cid_for(proof["hash"])
+            out.write(json.dumps({**proof, "cid": cid} if cid else proof, sort_keys=True) + "\n")
+            count += 1
+        return count
+
+    def stats(self) -> dict:
+        return {
+            "directory": self.directory,
+            "proofs": self.records,
+            "unique_hashes": len(self._by_hash),
+            "pinned": len(self._by_cid),
+            "segments": len(self._segments()),
+            "commits": self.commits,
+            "mean_batch": round(self.committed / self.commits, 2) if self.commits else None,
+            "queued": self._queue.qsize(),
+            "fsync": self.fsync,
+            "truncated_bytes": self.truncated_bytes,
+        }
+
+
+ledger = ProofLedger()
+
+
+def main():
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect the proof ledger.")
+    parser.add_argument("--dir", default=PROOF_LEDGER_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats")
+    get = commands.add_parser("get")
+    get.add_argument("key", help="proof hash or CID")
+    export = commands.add_parser("export")
+    export.add_argument("--since", type=float, default=None, help="seconds back from now")
+    export.add_argument("--until", type=float, default=None, help="seconds back from now")
+    export.add_argument("--out", default="-", help="JSON Lines path, or - for stdout")
+    args = parser.parse_args()
+
+    # Read-only: safe next to a running backend
+    reader = ProofLedger(args.dir).open(readonly=True)
+    if args.command == "stats":
+        print(json.dumps(reader.stats(), indent=2))
+    elif args.command == "get":
+        proof = reader.get(args.key) or reader.get_by_cid(args.key)
+        if proof is None:
+            sys.exit(f"❌ No proof with hash or CID {args.key}")
+        print(json.dumps(proof, indent=2))
+    else:
+        now = time.time()
+        since = now - args.since if args.since is not None else None
+        until = now - args.until if args.until is not None else None
+        count = reader.export(sys.stdout if args.out == "-" else args.out, since, until)
+        print(f"📤 Exported {count} proofs", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# proof_record.py
+"""
+Fixed-layout binary proof records: one canonical encoding for hashing,
+the proof ledger and IPFS.
+
+    magic "ZKP2" | flags u8 | input count u8 | reserved u16 | timestamp i64 | nonce 16B   (32 bytes)
+    [groth16: a.x a.y | b.x0 b.x1 b.y0 b.y1 | c.x c.y | inputs ...]  (32-byte big-endian each)
+
+flags: 1 voice human, 2 keystroke human, 4 verified, 8 Groth16 section present.
+The nonce is random per proof, so two verifications with the same results
+in the same second still get distinct records, hashes and CIDs. "ZKP1"
+records (the same header without a nonce) written before it existed still
+decode, and re-encode to their original bytes and hash.
+
+The proof hash is sha256 over exactly these bytes, so the hashed form, the
+stored form and the pinned form are the same. API fields such as ipfs_url
+are kept out of the record. `decode` reads a buffer in place: the header is
+unpacked from a memoryview and the Groth16 section stays a slice of it
+until someone asks for its JSON. `to_json` builds the dict view that the
+API, the ledger export and the explainer see. `encode_batch` and
+`hash_batch` pack and hash many header-only records as one flat buffer.
+"""
+import os
+import json
+import struct
+import hashlib
+
+import numpy as np
+
+MAGIC = b"ZKP2"
+HEADER = struct.Struct("<4sBBHq16s")
+NONCE_BYTES = 16
+# Nonce-less records from before ZKP2; read, never written
+MAGIC_V1 = b"ZKP1"
+HEADER_V1 = struct.Struct("<4sBBHq")
+FLAG_VOICE = 1
+FLAG_KEYSTROKE = 2
+FLAG_VERIFIED = 4
+FLAG_GROTH16 = 8
+
+FIELD_BYTES = 32
+GROTH16_POINT_FIELDS = 8  # a: 2, b: 4, c: 2
+RECORD_BYTES = HEADER.size
+
+# Same layout as HEADER, for the bulk path
+RECORD_DTYPE = np.dtype([("magic", "S4"), ("flags", "u1"), ("inputs", "u1"),
+                         ("reserved", "<u2"), ("timestamp", "<i8"), ("nonce", "V16")])
+
+
+class ProofFormatError(ValueError):
+    pass
+
+
+def _field(hex_value: str) -> bytes:
+    return int(hex_value, 16).to_bytes(FIELD_BYTES, "big")
+
+
+def _hex(view, i: int) -> str:
+    return "0x" + view[i * FIELD_BYTES:(i + 1) * FIELD_BYTES].hex()
+
+
+def pack_groth16(groth16: dict) -> bytes:
+    """
+    Packs a prover result ({"proof": {"a", "b", "c"}, "inputs"}) into field elements.
+    """
+    body = groth16["proof"]
+    (bx0, bx1), (by0, by1) = body["b"]
+    points = [*body["a"], bx0, bx1, by0, by1, *body["c"]]
+    return b"".join(_field(x) for x in points + list(groth16["inputs"]))
+
+
+def unpack_groth16(view) -> dict:
+    inputs = len(view) // FIELD_BYTES - GROTH16_POINT_FIELDS
+    return {
+        "scheme": "g16",
+        "curve": "bn128",
+        "proof": {
+            "a": [_hex(view, 0), _hex(view, 1)],
+            "b": [[_hex(view, 2), _hex(view, 3)], [_hex(view, 4), _hex(view, 5)]],
+            "c": [_hex(view, 6), _hex(view, 7)],
+        },
+        "inputs": [_hex(view, GROTH16_POINT_FIELDS + i) for i in range(inputs)],
+    }
+
+
+def is_record(payload) -> bool:
+    return bytes(payload[:len(MAGIC)]) in (MAGIC, MAGIC_V1)
+
+
+class ProofRecord:
+    __slots__ = ("voice_result", "keystroke_result", "verified", "timestamp", "nonce", "_groth16", "_encoded",
+                 "_hash")
+
+    def __init__(self, voice_result: int, keystroke_result: int, verified: bool, timestamp: int,
+                 groth16=None, nonce: bytes = None):
+        """
+        `groth16` is a prover result dict or its packed field elements.
+        `nonce` defaults to NONCE_BYTES fresh random bytes.
+        """
+        self.voice_result = int(voice_result)
+        self.keystroke_result = int(keystroke_result)
+        self.verified = bool(verified)
+        self.timestamp = int(timestamp)
+        self.nonce = os.urandom(NONCE_BYTES) if nonce is None else bytes(nonce)
+        if len(self.nonce) != NONCE_BYTES:
+            raise ProofFormatError(f"❌ Proof nonce must be {NONCE_BYTES} bytes, got {len(self.nonce)}.")
+        self._groth16 = pack_groth16(groth16) if isinstance(groth16, dict) else groth16
+        self._encoded = None
+        self._hash = None
+
+    @property
+    def flags(self) -> int:
+        return ((FLAG_VOICE if self.voice_result == 1 else 0) | (FLAG_KEYSTROKE if self.keystroke_result == 1 else 0)
+                | (FLAG_VERIFIED if self.verified else 0) | (FLAG_GROTH16 if self._groth16 is not None else 0))
+
+    def encode(self):
+        """
+        Canonical bytes (a memoryview when the record was decoded from a buffer).
+        """
+        if self._encoded is None:
+            groth16 = self._groth16 or b""
+            inputs = len(groth16) // FIELD_BYTES - GROTH16_POINT_FIELDS if groth16 else 0
+            if self.nonce is None:
+                header = HEADER_V1.pack(MAGIC_V1, self.flags, inputs, 0, self.timestamp)
+            else:
+                header = HEADER.pack(MAGIC, self.flags, inputs, 0, self.timestamp, self.nonce)
+            self._encoded = header + bytes(groth16)
+        return self._encoded
+
+    @property
+    def hash(self) -> str:
+        if self._hash is None:
+            self._hash = hashlib.sha256(self.encode()).hexdigest()
+        return self._hash
+
+    @property
+    def groth16(self):
+        return unpack_groth16(self._groth16) if self._groth16 is not None else None
+
+    @classmethod
+    def decode(cls, data) -> "ProofRecord":
+        """
+        Reads a record without copying `data` (bytes, bytearray, memoryview or mmap).
+        """
+        view = memoryview(data)
+        magic = bytes(view[:len(MAGIC)])
+        if magic not in (MAGIC, MAGIC_V1):
+            raise ProofFormatError(f"❌ Not a proof record (magic {magic!r}).")
+        header = HEADER if magic == MAGIC else HEADER_V1
+        if len(view) < header.size:
+            raise ProofFormatError(f"❌ Proof record is {len(view)} bytes; the header alone is {header.size}.")
+        _, flags, inputs, _, timestamp, *nonce = header.unpack_from(view)
+        size = header.size + ((GROTH16_POINT_FIELDS + inputs) * FIELD_BYTES if flags & FLAG_GROTH16 else 0)
+        if len(view) != size:
+            raise ProofFormatError(f"❌ Proof record is {len(view)} bytes; its header says {size}.")
+        record = cls.__new__(cls)
+        record.voice_result = flags & FLAG_VOICE
+        record.keystroke_result = (flags & FLAG_KEYSTROKE) >> 1
+        record.verified = bool(flags & FLAG_VERIFIED)
+        record.timestamp = timestamp
+        record.nonce = nonce[0] if nonce else None
+        record._groth16 = view[header.size:] if flags & FLAG_GROTH16 else None
+        record._encoded = view
+        record._hash = None
+        return record
+
+    def to_json(self) -> dict:
+        """
+        The JSON view served by the API; only built at the edge.
+        """
+        proof = {
+            "voice_result": self.voice_result,
+            "keystroke_result": self.keystroke_result,
+            "verified": self.verified,
+            "timestamp": self.timestamp,
+        }
+        if self.nonce is not None:
+            proof["nonce"] = self.nonce.hex()
+        if self._groth16 is not None:
+            proof["groth16"] = self.groth16
+        proof["hash"] = self.hash
+        return proof
+
+    def __reduce__(self):
+        # Crosses process boundaries as its canonical bytes
+        return ProofRecord.decode, (bytes(self.encode()),)
+
+    def __eq__(self, other):
+        return isinstance(other, ProofRecord) and bytes(self.encode()) == bytes(other.encode())
+
+    def __hash__(self):
+        return hash(bytes(self.encode()))
+
+    def __repr__(self):
+        return f"ProofRecord(hash={self.hash[:12]}…, verified={self.verified}, timestamp={self.timestamp})"
+
+
+def load_json(payload) -> dict:
+    """
+    JSON view of a stored or pinned proof, binary or (older proofs) JSON.
+    """
+    if is_record(payload):
+        return ProofRecord.decode(payload).to_json()
+    return json.loads(bytes(payload))
+
+
+# 📦 Bulk path: header-only records as one flat buffer ----------------------------
+
+def encode_batch(voice_results, keystroke_results, verified, timestamps, nonces: bytes = None) -> bytes:
+    """
+    Packs columns of results into consecutive RECORD_BYTES records.
+    `nonces` is NONCE_BYTES per record, fresh random bytes by default.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if nonces is None:
+        nonces = os.urandom(NONCE_BYTES * len(timestamps))
+    records = np.zeros(len(timestamps), dtype=RECORD_DTYPE)
+    records["magic"] = MAGIC
+    records["flags"] = ((np.asarray(voice_results) == 1) * FLAG_VOICE
+                        | (np.asarray(keystroke_results) == 1) * FLAG_KEYSTROKE
+                        | np.asarray(verified, dtype=bool) * FLAG_VERIFIED)
+    records["timestamp"] = timestamps
+    records["nonce"] = np.frombuffer(nonces, dtype="V16")
+    return records.tobytes()
+
+
+def hash_batch(buffer) -> list:
+    """
+    Proof hashes (hex) of a flat buffer of header-only records.
+    """
+    view = memoryview(buffer)
+    sha256 = hashlib.sha256
+    return [sha256(view[i:i + RECORD_BYTES]).hexdigest() for i in range(0, len(view), RECORD_BYTES)]
+
+
+def decode_batch(buffer) -> np.ndarray:
+    """
+    Structured-array view over a flat buffer of header-only records (no copy).
+    """
+    records = np.frombuffer(buffer, dtype=RECORD_DTYPE)
+    if (records["magic"] != MAGIC).any() or (records["flags"] & FLAG_GROTH16).any():
+        raise ProofFormatError("❌ Buffer holds records that are not header-only proof records.")
+    return records
@@ -1,39 +1,305 @@
 import os
-import requests
+import json
+import random
+import asyncio
+from functools import lru_cache
 from dotenv import load_dotenv
 
+from zk_ai_backend.cid import compute_cid, check_cid
+from zk_ai_backend.metrics import metrics
+
 load_dotenv()
 
 PINATA_API_KEY = os.getenv("PINATA_API_KEY")
 PINATA_SECRET_API_KEY = os.getenv("PINATA_SECRET_API_KEY")
 
-if not PINATA_API_KEY or not PINATA_SECRET_API_KEY:
-    raise EnvironmentError("❌ Pinata API credentials not found in .env file.")
+# 🌍 Point these at zk_ai_backend.fake_pinata for local runs
+PINATA_API_URL = os.getenv("PINATA_API_URL", "https://api.pinata.cloud").rstrip("/")
+PINATA_GATEWAY_URL = os.getenv("PINATA_GATEWAY_URL", "https://gateway.pinata.cloud/ipfs").rstrip("/")
+
+PIN_TIMEOUT = float(os.getenv("PIN_TIMEOUT", "10"))
+PIN_CONCURRENCY = int(os.getenv("PIN_CONCURRENCY", "8"))
+PIN_RETRIES = int(os.getenv("PIN_RETRIES", "4"))
+PIN_BACKOFF = float(os.getenv("PIN_BACKOFF", "0.25"))
+# 🗃️ Return the locally computed CID at once and pin from a durable queue
+PIN_WRITE_BEHIND = os.getenv("PIN_WRITE_BEHIND", "0") == "1"
+PIN_QUEUE_DIR = os.getenv("PIN_QUEUE_DIR", ".pin_queue")
+
+
+class PinataNotConfigured(EnvironmentError):
+    pass
+
+
+def _headers() -> dict:
+    # Checked on first pin rather than at import, so a missing key only breaks pinning
+    if not PINATA_API_KEY or not PINATA_SECRET_API_KEY:
+        raise PinataNotConfigured("❌ Pinata API credentials not found in .env file.")
+    return {
+        "pinata_api_key": PINATA_API_KEY,
+        "pinata_secret_api_key": PINATA_SECRET_API_KEY
+    }
+
+
+@lru_cache(maxsize=1)
+def _session():
+    # ♻️ One keep-alive session for the synchronous path
+    import requests
+
+    session = requests.Session()
+    session.headers.update(_headers())
+    return session
+
+
+def canonical_json(json_data: dict) -> bytes:
+    """
+    The exact bytes that get pinned, so the CID can be computed locally.
+    """
+    return json.dumps(json_data, sort_keys=True, separators=(",", ":")).encode()
+
+
+def gateway_url(cid: str) -> str:
+    return f"{PINATA_GATEWAY_URL}/{cid}"
+
+
+# Pinned file suffix -> content type; proofs are binary records (proof_record.py)
+CONTENT_TYPES = {".json": "application/json", ".zkp": "application/octet-stream"}
+
+
+def _pin_file_form(payload: bytes, cid: str, suffix: str = ".json"):
+    files = {"file": (f"{cid}{suffix}", payload, CONTENT_TYPES[suffix])}
+    data = {
+        "pinataOptions": json.dumps({"cidVersion": 0}),
+        "pinataMetadata": json.dumps({"name": cid}),
+    }
+    return files, data
+
 
 def upload_to_ipfs(json_data: dict) -> str:
     """
     Uploads the given JSON object to IPFS via Pinata.
     Returns the public gateway URL.
     """
-    url = "https://api.pinata.cloud/pinning/pinJSONToIPFS"
-    headers = {
-        "Content-Type": "application/json",
-        "pinata_api_key": PINATA_API_KEY,
-        "pinata_secret_api_key": PINATA_SECRET_API_KEY
-    }
+    import requests
+
+    payload = canonical_json(json_data)
+    cid = compute_cid(payload)
+    files, data = _pin_file_form(payload, cid)
 
     try:
-        response = requests.post(url, json=json_data, headers=headers)
+        response = _session().post(f"{PINATA_API_URL}/pinning/pinFileToIPFS", files=files, data=data, timeout=PIN_TIMEOUT)
         response.raise_for_status()
 
         ipfs_hash = response.json().get("IpfsHash")
         if not ipfs_hash:
             raise ValueError("❌ IPFS upload succeeded but no hash returned.")
 
-        gateway_url = f"https://gateway.pinata.cloud/ipfs/{ipfs_hash}"
-        print(f"✅ Proof uploaded to IPFS!\n🔗 CID: {ipfs_hash}\n🌍 Gateway URL: {gateway_url}")
-        return gateway_url
+        url = gateway_url(ipfs_hash)
+        print(f"✅ Proof uploaded to IPFS!\n🔗 CID: {ipfs_hash}\n🌍 Gateway URL: {url}")
+        return url
 
     except requests.exceptions.RequestException as e:
         print("❌ Failed to upload to IPFS:", str(e))
         raise RuntimeError("IPFS upload failed") from e
+
+
+class AsyncPinner:
+    """
+    Pins JSON to IPFS over a pooled keep-alive HTTP client with bounded
+    concurrency and exponential-backoff retries.
+
+    In write-behind mode a pin only appends the payload to an on-disk
+    queue (one fsynced file per CID) and returns the locally computed URL;
+    a background task drains the queue, including entries left by a crash.
+    """
+
+    def __init__(self, concurrency: int = PIN_CONCURRENCY, retries: int = PIN_RETRIES,
+                 backoff: float = PIN_BACKOFF, write_behind: bool = PIN_WRITE_BEHIND,
+                 queue_dir: str = PIN_QUEUE_DIR):
+        self.concurrency = max(1, concurrency)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.write_behind = write_behind
+        self.queue_dir = queue_dir
+        self._client = None
+        self._gateway = None
+        self._semaphore = None
+        self._wakeup = None
+        self._drainer = None
+        self.enabled = False
+        self.pinned = 0
+        self.failed = 0
+        self.retried = 0
+
+    async def start(self):
+        import httpx
+
+        if self._client is not None:
+            return
+        try:
+            headers = _headers()
+        except PinataNotConfigured as e:
+            # Keep the gateway client (and /verify) usable; pin_json raises instead
+            print(f"⚠️ {e} Pinning is disabled.")
+            headers = None
+        self._client = httpx.AsyncClient(
+            base_url=PINATA_API_URL,
+            headers=headers,
+            timeout=PIN_TIMEOUT,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+        )
+        self.enabled = headers is not None
+        # Separate client without credentials for gateway downloads
+        self._gateway = httpx.AsyncClient(
+            timeout=PIN_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        if self.write_behind:
+            os.makedirs(self.queue_dir, exist_ok=True)
+            self._wakeup = asyncio.Event()
+            self._wakeup.set()  # pick up anything left from a previous run
+            self._drainer = asyncio.create_task(self._drain_forever(), name="ipfs-pinner")
+
+    async def close(self):
+        if self._drainer is not None:
+            self._drainer.cancel()
+            try:
+                await self._drainer
+            except asyncio.CancelledError:
+                pass
+            self._drainer = None
+        if self._client is not None:
+            await self._client.aclose()
+            await self._gateway.aclose()
+            self._client = None
+            self._gateway = None
+
+    async def fetch(self, cid: str) -> bytes:
+        """
+        Downloads an object by CID from PINATA_GATEWAY_URL over the pooled
+        client. The URL is built here rather than taken from callers, and the
+        bytes must hash to `cid` (CIDMismatch otherwise), so a gateway or
+        caller can never pass off other content under a real CID.
+        """
+        if self._gateway is None:
+            await self.start()
+        response = await self._gateway.get(gateway_url(cid))
+        response.raise_for_status()
+        return check_cid(response.content, cid)
+
+    async def _post(self, payload: bytes, cid: str, suffix: str = ".json") -> str:
+        import httpx
+
+        files, data = _pin_file_form(payload, cid, suffix)
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    response = await self._client.post("/pinning/pinFileToIPFS", files=files, data=data)
+                response.raise_for_status()
+                ipfs_hash = response.json().get("IpfsHash")
+                if not ipfs_hash:
+                    raise ValueError("❌ IPFS upload succeeded but no hash returned.")
+                if ipfs_hash != cid:
+                    print(f"⚠️ Pinata CID {ipfs_hash} differs from local CID {cid}")
+                self.pinned += 1
+                return ipfs_hash
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                # Network errors, 429 and 5xx are worth retrying; other 4xx are not
+                retryable = not isinstance(e, httpx.HTTPStatusError) or \
+                    e.response.status_code == 429 or e.response.status_code >= 500
+                if not retryable or attempt >= self.retries:
+                    self.failed += 1
+                    metrics.inc("zk_failures_total", stage="ipfs_pin")
+                    raise RuntimeError("IPFS upload failed") from e
+                delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+                attempt += 1
+                self.retried += 1
+                metrics.inc("zk_ipfs_retries_total")
+                await asyncio.sleep(delay)
+
+    async def pin_json(self, json_data: dict) -> str:
+        """
+        Pins `json_data` and returns its gateway URL.
+        """
+        return await self.pin_bytes(canonical_json(json_data), ".json")
+
+    async def pin_bytes(self, payload: bytes, suffix: str = ".zkp") -> str:
+        """
+        Pins raw bytes (a proof record's canonical encoding by default) and
+        returns the gateway URL.
+        """
+        if self._client is None:
+            await self.start()
+        if not self.enabled:
+            _headers()  # raises the missing-credentials error
+        payload = bytes(payload)
+        cid = compute_cid(payload)
+
+        if self.write_behind:
+            await asyncio.to_thread(self._enqueue, payload, cid, suffix)
+            self._wakeup.set()
+            return gateway_url(cid)
+
+        return gateway_url(await self._post(payload, cid, suffix))
+
+    # 🗃️ Durable write-behind queue ------------------------------------------
+
+    def _enqueue(self, payload: bytes, cid: str, suffix: str):
+        path = os.path.join(self.queue_dir, f"{cid}{suffix}")
+        if os.path.exists(path):
+            return  # same content already queued
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def pending(self) -> list:
+        if not os.path.isdir(self.queue_dir):
+            return []
+        names = [n for n in os.listdir(self.queue_dir) if os.path.splitext(n)[1] in CONTENT_TYPES]
+        paths = [os.path.join(self.queue_dir, n) for n in names]
+        return sorted(paths, key=os.path.getmtime)
+
+    async def _pin_queued(self, path: str):
+        with open(path, "rb") as f:
+            payload = f.read()
+        cid, suffix = os.path.splitext(os.path.basename(path))
+        try:
+            await self._post(payload, cid, suffix)
+        except Exception as e:
+            print(f"❌ Background pin of {cid} failed, will retry: {e}")
+            return
+        os.remove(path)
+
+    async def drain(self):
+        """
+        Pins everything currently in the queue.
+        """
+        await asyncio.gather(*(self._pin_queued(p) for p in self.pending()))
+
+    async def _drain_forever(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self.drain()
+            if self.pending():
+                # Leftovers failed every retry; back off before the next sweep
+                await asyncio.sleep(self.backoff * 2 ** self.retries)
+                self._wakeup.set()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "write_behind": self.write_behind,
+            "queued": len(self.pending()) if self.write_behind else 0,
+            "pinned": self.pinned,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
+
+
+pinner = AsyncPinner()
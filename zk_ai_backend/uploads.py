@@ -0,0 +1,210 @@
+# uploads.py
+"""
+Streamed, bounded reading of the /verify multipart body.
+
+The body is fed through python-multipart chunk by chunk as it arrives, so
+nothing is spooled to disk and each field is buffered in memory only up to
+its byte limit. Bad uploads are refused as soon as the offending bytes show
+up, before any decoding:
+
+- Content-Length larger than every field limit combined -> 413 before reading
+- a voice part whose magic bytes are not WAV / WebM / Ogg -> 415
+- a WAV header announcing more than MAX_VOICE_SECONDS -> 413
+- a keystroke part that is not plain text -> 415
+- a field over its byte limit -> 413
+
+Each field is also hashed as it streams in; the digests key the
+idempotency cache and the replay index (idempotency.py).
+"""
+import os
+import hashlib
+
+from python_multipart import MultipartParser
+from starlette.formparsers import parse_options_header
+
+from keystroke.features import is_event_csv
+from .audio_decoder import sniff_format, wav_declared_seconds, MAX_VOICE_SECONDS
+
+MAX_VOICE_BYTES = int(os.getenv("MAX_VOICE_BYTES", str(10 * 1024 * 1024)))
+MAX_KEYSTROKE_BYTES = int(os.getenv("MAX_KEYSTROKE_BYTES", str(256 * 1024)))
+# Boundaries, part headers and any small extra form fields
+MAX_FORM_OVERHEAD = 64 * 1024
+MAX_PARTS = 8
+
+# WAV headers past this many bytes (long LIST/INFO chunks) are left to the decoder
+WAV_HEADER_SCAN_BYTES = 4096
+
+
+class UploadRejected(ValueError):
+    def __init__(self, status_code: int, reason: str, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.reason = reason
+
+
+class _Field:
+    """
+    Accumulates one part, enforcing its byte limit and format as it grows.
+    """
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.buffer = bytearray()
+        self.digest = hashlib.sha256()
+        self.sniffed = False
+
+    def feed(self, data: bytes):
+        if len(self.buffer) + len(data) > self.limit:
+            raise UploadRejected(413, "too_large", f"❌ '{self.name}' upload exceeds {self.limit} bytes.")
+        self.buffer += data
+        self.digest.update(data)
+        self.inspect(final=False)
+
+    def finish(self) -> bytes:
+        self.inspect(final=True)
+        return bytes(self.buffer)
+
+    def inspect(self, final: bool):
+        pass
+
+
+class _VoiceField(_Field):
+    def __init__(self, limit: int = MAX_VOICE_BYTES, max_seconds: float = MAX_VOICE_SECONDS):
+        super().__init__("voice", limit)
+        self.max_seconds = max_seconds
+        self.kind = None
+        self.duration_checked = False
+
+    def inspect(self, final: bool):
+        if self.kind is None:
+            if len(self.buffer) < 12 and not final:
+                return
+            if not self.buffer:
+                return
+            self.kind = sniff_format(self.buffer)
+            if self.kind == "unknown":
+                raise UploadRejected(415, "unsupported_media", "❌ Voice upload must be WAV, WebM or Ogg audio.")
+        if self.kind == "wav" and not self.duration_checked:
+            seconds = wav_declared_seconds(self.buffer)
+            if seconds is not None and seconds > self.max_seconds:
+                raise UploadRejected(413, "too_long",
+                                     f"❌ Voice clip is {seconds:.1f} s; the limit is {self.max_seconds:g} s.")
+            # Open-ended or unusual headers: decode_audio checks the real length
+            self.duration_checked = seconds is not None or len(self.buffer) >= WAV_HEADER_SCAN_BYTES or final
+
+
+class _KeystrokeField(_Field):
+    def __init__(self, limit: int = MAX_KEYSTROKE_BYTES):
+        super().__init__("keystroke", limit)
+
+    def inspect(self, final: bool):
+        if self.sniffed or (len(self.buffer) < 16 and not final):
+            return
+        self.sniffed = True
+        head = bytes(self.buffer[:256])
+        first = head.lstrip()[:1]
+        if b"\x00" in head or not (is_event_csv(head) or first in b"0123456789.-" or not first):
+            raise UploadRejected(415, "unsupported_media", "❌ Keystroke upload must be a CSV text file.")
+
+
+FIELDS = {"voice": _VoiceField, "keystroke": _KeystrokeField}
+
+
+def _part_name(headers: dict):
+    _, options = parse_options_header(headers.get(b"content-disposition", b""))
+    name = options.get(b"name")
+    return name.decode("latin-1") if name is not None else None
+
+
+async def read_verify_upload(request) -> dict:
+    """
+    Reads the multipart body of a /verify request into
+    {"voice": bytes or None, "keystroke": bytes or None,
+     "digests": {"voice": SHA-256 hex or None, "keystroke": ...}}.
+    Raises UploadRejected with the HTTP status to answer.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UploadRejected(415, "unsupported_media", "❌ /verify expects a multipart/form-data upload.")
+
+    limit = MAX_VOICE_BYTES + MAX_KEYSTROKE_BYTES + MAX_FORM_OVERHEAD
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > limit:
+        raise UploadRejected(413, "too_large", f"❌ Upload of {declared} bytes exceeds {limit} bytes.")
+
+    # Callbacks only queue events; all checks run between parser writes so
+    # exceptions never have to cross python-multipart's internals
+    events = []
+    header_field = bytearray()
+    header_value = bytearray()
+
+    def on_header_field(data, start, end):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data, start, end):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        events.append(("header", bytes(header_field).lower(), bytes(header_value)))
+        header_field.clear()
+        header_value.clear()
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": lambda: events.append(("begin",)),
+        "on_part_data": lambda data, start, end: events.append(("data", data[start:end])),
+        "on_part_end": lambda: events.append(("end",)),
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": lambda: events.append(("headers_done",)),
+    })
+
+    results = {name: None for name in FIELDS}
+    digests = {name: None for name in FIELDS}
+    received = 0
+    parts = 0
+    headers = {}
+    field = None
+    extra_bytes = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > limit:
+            raise UploadRejected(413, "too_large", f"❌ Upload exceeds {limit} bytes.")
+        try:
+            parser.write(chunk)
+        except Exception as e:
+            raise UploadRejected(400, "malformed", f"❌ Malformed multipart body: {e}") from e
+        for event in events:
+            kind = event[0]
+            if kind == "begin":
+                parts += 1
+                if parts > MAX_PARTS:
+                    raise UploadRejected(400, "malformed", f"❌ More than {MAX_PARTS} form parts.")
+                headers = {}
+                field = None
+            elif kind == "header":
+                headers[event[1]] = event[2]
+            elif kind == "headers_done":
+                name = _part_name(headers)
+                if name in FIELDS:
+                    if results[name] is not None:
+                        raise UploadRejected(400, "malformed", f"❌ Duplicate '{name}' field.")
+                    field = FIELDS[name]()
+            elif kind == "data":
+                if field is not None:
+                    field.feed(event[1])
+                else:
+                    # Unknown fields are dropped, but still count against the overhead budget
+                    extra_bytes += len(event[1])
+                    if extra_bytes > MAX_FORM_OVERHEAD:
+                        raise UploadRejected(413, "too_large", "❌ Too much data in unexpected form fields.")
+            elif kind == "end" and field is not None:
+                results[field.name] = field.finish()
+                if results[field.name]:
+                    digests[field.name] = field.digest.hexdigest()
+                field = None
+        events.clear()
+    parser.finalize()
+    results["digests"] = digests
+    return results
@@ -1,49 +1,143 @@
 # verifier.py ✅ FIXED VERSION
-import os
-import uuid
-import ffmpeg
-import pandas as pd
-from voice.predict_voice import predict_voice_file
-from keystroke.test_model import predict_keystroke_file
-from .zk.zk_generator import generate_proof
-
-def convert_webm_to_wav(input_path: str, output_path: str):
-    (
-        ffmpeg
-        .input(input_path)
-        .output(output_path, format='wav', acodec='pcm_s16le', ac=1, ar='16k')
-        .run(overwrite_output=True)
-    )
+from voice.features import mfcc_mean
+from voice.vad import speech_segment, VAD_MIN_SPEECH_SECONDS
+from keystroke.test_model import keystroke_features
+from .zk.zk_generator import generate_proof, ZK_PROVER
+from .model_registry import registry
+from .audio_decoder import decode_audio, TARGET_SR
+from .batcher import MicroBatcher, BATCH_MAX_SIZE
+from .worker_pool import pool
+from .metrics import metrics
+from .decision import engine
 
-def run_verification_pipeline(voice_path: str = None, keystroke_path: str = None):
-    voice_result = None
-    keystroke_result = None
-
-    # 🔊 Handle voice
-    if voice_path:
-        if voice_path.endswith(".webm"):
-            wav_path = voice_path.replace(".webm", ".wav")
-            convert_webm_to_wav(voice_path, wav_path)
-            voice_result = predict_voice_file(wav_path)
-        elif voice_path.endswith(".wav"):
-            voice_result = predict_voice_file(voice_path)
-        print(f"[🔊] Voice prediction: {voice_result} ({'Human' if voice_result == 1 else 'Bot'})")
+# 📦 One micro-batcher per model: concurrent requests share a single predict call
+batchers = {
+    "voice": MicroBatcher("voice", lambda: registry.get("voice")),
+    "keystroke": MicroBatcher("keystroke", lambda: registry.get("keystroke")),
+}
 
-    # ⌨️ Handle keystroke
-    if keystroke_path:
-        keystroke_result = predict_keystroke_file(keystroke_path)
-        print(f"[⌨️] Keystroke prediction: {keystroke_result} ({'Human' if keystroke_result == 1 else 'Bot'})")
+metrics.gauge("zk_vad_min_speech_seconds", "Speech a voice clip needs to pass the no-speech gate.",
+              lambda: VAD_MIN_SPEECH_SECONDS)
 
-    # ✅ At least one must be human
-    is_verified = bool((voice_result == 1) or (keystroke_result == 1))
+def voice_features(voice_data: bytes):
+    # 🔊 WAV parsed in place, WebM/Opus piped through ffmpeg
+    with metrics.span("voice_decode"):
+        audio = decode_audio(voice_data, TARGET_SR)
+    # 🤫 Clips without speech stop here; the rest are length capped (and trimmed with VOICE_VAD_TRIM=1)
+    with metrics.span("voice_vad"):
+        audio, vad = speech_segment(audio, TARGET_SR)
+    metrics.inc("zk_vad_seconds_total", vad["kept_seconds"], part="kept")
+    metrics.inc("zk_vad_seconds_total", vad["seconds"] - vad["kept_seconds"], part="dropped")
+    with metrics.span("voice_mfcc"):
+        return mfcc_mean(audio, TARGET_SR)
 
+def keystroke_features_from_bytes(keystroke_data: bytes):
+    return keystroke_features(keystroke_data, registry.get("keystroke").n_features_in_)
 
+def score_voice(voice_data: bytes):
+    X = voice_features(voice_data).reshape(1, -1)
+    return registry.get("voice").predict(X)[0]
 
+def score_keystroke(keystroke_data: bytes):
+    X = keystroke_features_from_bytes(keystroke_data).reshape(1, -1)
+    return registry.get("keystroke").predict(X)[0]
 
-    # 🧾 Generate ZK proof with 0/1 format
+def finalize(voice_result, keystroke_result, is_verified: bool):
+    if voice_result is not None:
+        print(f"[🔊] Voice prediction: {voice_result} ({'Human' if voice_result == 1 else 'Bot'})")
+    if keystroke_result is not None:
+        print(f"[⌨️] Keystroke prediction: {keystroke_result} ({'Human' if keystroke_result == 1 else 'Bot'})")
+
+    # 🧾 Generate ZK proof with 0/1 format (skipped or missing modalities count as 0)
     zk_proof = generate_proof(
         voice_result=int(voice_result) if voice_result is not None else 0,
         keystroke_result=int(keystroke_result) if keystroke_result is not None else 0,
+        verified=is_verified,
     )
 
     return is_verified, zk_proof
+
+def _count_predictions(results: dict):
+    for modality, result in results.items():
+        if result is not None:
+            metrics.inc("zk_predictions_total", modality=modality, result="human" if result == 1 else "bot")
+
+def warmup():
+    """
+    Runs one synthetic sample through features and both models so the first
+    real request does not pay for lazy imports, caches and sklearn setup.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(TARGET_SR) * 0.01).astype(np.float32)
+    registry.get("voice").predict(mfcc_mean(audio, TARGET_SR).reshape(1, -1))
+    keystroke_model = registry.get("keystroke")
+    keystroke_model.predict(np.zeros((1, keystroke_model.n_features_in_)))
+    if ZK_PROVER:
+        from .zk.prover import get_prover
+
+        get_prover().precompute()
+
+def run_verification_pipeline(voice_data: bytes = None, keystroke_data: bytes = None):
+    """
+    Runs the biometric checks on raw upload bytes, entirely in memory,
+    cheapest first and only until the decision policy is satisfied.
+    Returns (is_verified, zk_proof, decision record).
+    """
+    jobs = {}
+    if voice_data:
+        jobs["voice"] = lambda: score_voice(voice_data)
+    if keystroke_data:
+        jobs["keystroke"] = lambda: score_keystroke(keystroke_data)
+
+    verdict, results, decision = engine.evaluate_sync(jobs, _sizes(voice_data, keystroke_data))
+    _count_predictions(results)
+    return (*finalize(results["voice"], results["keystroke"], verdict), decision)
+
+def _sizes(voice_data, keystroke_data) -> dict:
+    return {"voice": len(voice_data or b""), "keystroke": len(keystroke_data or b"")}
+
+async def _voice_result(voice_data: bytes):
+    if BATCH_MAX_SIZE > 1:
+        features = await pool.run("voice_features", voice_features, voice_data)
+        with metrics.span("voice_predict"):
+            return await batchers["voice"].submit(features)
+    return await pool.run("voice_score", score_voice, voice_data)
+
+async def _keystroke_result(keystroke_data: bytes):
+    if BATCH_MAX_SIZE > 1:
+        features = await pool.run("keystroke_features", keystroke_features_from_bytes, keystroke_data)
+        with metrics.span("keystroke_predict"):
+            return await batchers["keystroke"].submit(features)
+    return await pool.run("keystroke_score", score_keystroke, keystroke_data)
+
+async def run_verification_pipeline_async(voice_data: bytes = None, keystroke_data: bytes = None):
+    """
+    Same as run_verification_pipeline, but every blocking stage runs on the
+    worker pool and the modalities overlap. With batching on, workers only
+    extract features and the shared micro-batchers score concurrent requests
+    together; with batching off (BATCH_MAX_SIZE=1) each worker scores with
+    its own preloaded model. Work left once the policy is satisfied is
+    cancelled (queued pool jobs never run).
+    """
+    jobs = {}
+    if voice_data:
+        jobs["voice"] = lambda: _voice_result(voice_data)
+    if keystroke_data:
+        jobs["keystroke"] = lambda: _keystroke_result(keystroke_data)
+
+    verdict, results, decision = await engine.evaluate(jobs, _sizes(voice_data, keystroke_data))
+    _count_predictions(results)
+    is_verified, zk_proof = await pool.run("proof", finalize, results["voice"], results["keystroke"], verdict)
+    return is_verified, zk_proof, decision
+
+async def reject_async(reason: str, voice_data: bytes = None, keystroke_data: bytes = None):
+    """
+    Bot verdict without running any model (e.g. an exact replay); the proof
+    records both modalities as 0. Same return shape as the pipeline.
+    """
+    uploaded = [m for m, data in (("voice", voice_data), ("keystroke", keystroke_data)) if data]
+    decision = engine.reject(reason, uploaded, _sizes(voice_data, keystroke_data))
+    is_verified, zk_proof = await pool.run("proof", finalize, None, None, False)
+    return is_verified, zk_proof, decision
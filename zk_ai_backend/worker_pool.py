@@ -0,0 +1,136 @@
+# worker_pool.py
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from .metrics import metrics, collect_job_metrics, MetricsRegistry
+
+# ⚙️ "thread" shares models with the event loop process; "process" sidesteps the GIL
+VERIFY_POOL_KIND = os.getenv("VERIFY_POOL_KIND", "thread")
+VERIFY_POOL_WORKERS = int(os.getenv("VERIFY_POOL_WORKERS", str(os.cpu_count() or 2)))
+# 🚦 Jobs admitted at once (running + waiting); beyond this /verify answers 503
+VERIFY_POOL_QUEUE = int(os.getenv("VERIFY_POOL_QUEUE", "64"))
+
+
+class PoolSaturated(RuntimeError):
+    pass
+
+
+# Set in process workers only; threads share the parent's watched registry
+_in_worker_process = False
+
+
+def _init_worker():
+    # 📦 Each worker process loads its own models and feature matrices up front
+    from voice.features import mel_basis, dct_basis
+    from .model_registry import registry
+    from .zk.zk_generator import ZK_PROVER
+
+    global _in_worker_process
+    _in_worker_process = True
+    mel_basis()
+    dct_basis()
+    registry.load_all()
+    if ZK_PROVER:
+        from .zk.prover import get_prover
+
+        get_prover().precompute()
+
+
+def _timed_call(fn, submitted_at, args):
+    # time.time() rather than perf_counter so the stamps are comparable across processes
+    started_at = time.time()
+    if _in_worker_process:
+        # 🔁 Workers run no watcher thread; a stat per model per job picks up hot reloads
+        from .model_registry import registry
+
+        if registry.reload_interval > 0:
+            registry.check_for_updates()
+    # Spans and counters from `fn` travel back with the result instead of staying in the worker
+    with collect_job_metrics() as collected:
+        result = fn(*args)
+    return result, started_at - submitted_at, time.time() - started_at, collected
+
+
+class WorkerPool:
+    """
+    Runs blocking pipeline stages off the event loop with bounded admission.
+    """
+
+    def __init__(self, kind: str = VERIFY_POOL_KIND, workers: int = VERIFY_POOL_WORKERS,
+                 max_queue: int = VERIFY_POOL_QUEUE, stats: MetricsRegistry = metrics):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"❌ Unknown VERIFY_POOL_KIND: {kind!r}")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.stats = stats
+        self._executor = None
+        self._admitted = 0
+        self._running = 0
+
+    def start(self):
+        if self._executor is not None:
+            return
+        if self.kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        else:
+            # Threads share the parent's registry, which the app lifespan already loaded
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="verify")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def queue_depth(self) -> int:
+        # Admitted jobs not currently occupying a worker
+        return self._admitted - min(self._running, self.workers)
+
+    def admit(self):
+        """
+        Reserves a slot or raises PoolSaturated straight away — callers should
+        fail fast rather than pile up behind a full pool.
+        """
+        if self._admitted >= self.max_queue:
+            raise PoolSaturated(f"⏳ Verification pool saturated ({self._admitted}/{self.max_queue} jobs).")
+        self._admitted += 1
+
+    def release(self):
+        self._admitted -= 1
+
+    async def run(self, stage: str, fn, *args):
+        """
+        Runs `fn(*args)` on the pool; the caller must already hold a slot from admit().
+        """
+        if self._executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        submitted_at = time.time()
+        self._running += 1
+        try:
+            outcome = await loop.run_in_executor(self._executor, _timed_call, fn, submitted_at, args)
+        finally:
+            self._running -= 1
+        result, waited, ran, collected = outcome
+        self.stats.record(f"{stage}_queue_wait", max(0.0, waited))
+        self.stats.record(stage, ran)
+        self.stats.merge(collected)
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "admitted": self._admitted,
+            "queue_depth": self.queue_depth,
+            "stages": self.stats.stage_snapshot(),
+        }
+
+
+pool = WorkerPool()
+metrics.gauge("zk_pool_admitted", "Jobs holding a worker pool slot.", lambda: pool._admitted)
+metrics.gauge("zk_pool_queue_depth", "Admitted jobs waiting for a worker.", lambda: pool.queue_depth)
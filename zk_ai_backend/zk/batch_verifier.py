@@ -0,0 +1,239 @@
+# zk/batch_verifier.py
+"""
+Off-chain Groth16 verification of ZoKrates proof.json files against
+verification.key, one proof at a time or many in one pass.
+
+A batch is checked with a random linear combination: with fresh 128-bit
+weights r_i, all proofs are valid (except with probability ~2^-128) iff
+
+    prod e(r_i*A_i, B_i) == e(alpha, beta)^sum(r_i)
+                            * e(sum r_i*vk_x_i, gamma) * e(sum r_i*C_i, delta)
+
+so n proofs cost n + 2 Miller loops and a single final exponentiation instead
+of 4n full pairings. e(alpha, beta) and the Frobenius images of the fixed G2
+points are computed once per key. A failing batch is bisected to pinpoint
+the bad proofs.
+"""
+import os
+import json
+import time
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+
+from .curve import R, bn, g1_from_json, g2_from_json
+
+ZK_VERIFICATION_KEY_PATH = os.getenv("ZK_VERIFICATION_KEY_PATH", "verification.key")
+# 🎲 Bit length of the random batching weights (soundness error ~2^-bits)
+BATCH_WEIGHT_BITS = 128
+
+
+class ProofFormatError(ValueError):
+    pass
+
+
+def _pairing_mod():
+    from py_ecc.optimized_bn128 import optimized_pairing
+    return optimized_pairing
+
+
+def _frobenius_pair(q):
+    """
+    The two extra points the optimal ate Miller loop needs for a twisted G2 point.
+    """
+    p = bn().field_modulus
+    q1 = (q[0] ** p, q[1] ** p, q[2] ** p)
+    nq2 = (q1[0] ** p, -q1[1] ** p, q1[2] ** p)
+    return q1, nq2
+
+
+def _miller_loop(q, p, frobenius=None):
+    """
+    optimized_pairing.miller_loop without the final exponentiation, taking the
+    Frobenius images of `q` precomputed when `q` is a fixed key point.
+    """
+    pairing = _pairing_mod()
+    fq12 = bn().FQ12
+    linefunc, double, add, neg = pairing.linefunc, pairing.double, pairing.add, pairing.neg
+    r = q
+    f_num, f_den = fq12.one(), fq12.one()
+    for v in pairing.pseudo_binary_encoding[63::-1]:
+        n, d = linefunc(r, r, p)
+        f_num = f_num * f_num * n
+        f_den = f_den * f_den * d
+        r = double(r)
+        if v == 1:
+            n, d = linefunc(r, q, p)
+            f_num, f_den = f_num * n, f_den * d
+            r = add(r, q)
+        elif v == -1:
+            nq = neg(q)
+            n, d = linefunc(r, nq, p)
+            f_num, f_den = f_num * n, f_den * d
+            r = add(r, nq)
+    q1, nq2 = frobenius or _frobenius_pair(q)
+    n1, d1 = linefunc(r, q1, p)
+    r = add(r, q1)
+    n2, d2 = linefunc(r, nq2, p)
+    return f_num * n1 * n2 / (f_den * d1 * d2)
+
+
+class VerificationKey:
+    __slots__ = ("alpha", "beta", "gamma", "delta", "gamma_abc",
+                 "alpha_beta", "gamma_fq12", "delta_fq12", "gamma_frobenius", "delta_frobenius")
+
+
+def load_verification_key(path: str = ZK_VERIFICATION_KEY_PATH) -> VerificationKey:
+    """
+    Parses a ZoKrates g16 verification.key and precomputes its fixed-base data.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("scheme") != "g16" or data.get("curve") != "bn128":
+        raise ValueError(f"❌ {path} is not a g16/bn128 verification key.")
+
+    c = bn()
+    pairing = _pairing_mod()
+    vk = VerificationKey()
+    vk.alpha = g1_from_json(data["alpha"])
+    vk.beta = g2_from_json(data["beta"])
+    vk.gamma = g2_from_json(data["gamma"])
+    vk.delta = g2_from_json(data["delta"])
+    vk.gamma_abc = [g1_from_json(p) for p in data["gamma_abc"]]
+
+    vk.alpha_beta = pairing.pairing(vk.beta, vk.alpha)
+    vk.gamma_fq12 = c.twist(vk.gamma)
+    vk.delta_fq12 = c.twist(vk.delta)
+    vk.gamma_frobenius = _frobenius_pair(vk.gamma_fq12)
+    vk.delta_frobenius = _frobenius_pair(vk.delta_fq12)
+    return vk
+
+
+def parse_proof(proof: dict):
+    """
+    Returns (A, B, C, inputs) from a proof.json dict (or a backend proof carrying
+    one under "groth16"), after curve and subgroup checks.
+    """
+    c = bn()
+    proof = proof.get("groth16", proof)
+    try:
+        body = proof["proof"]
+        a = g1_from_json(body["a"])
+        b = g2_from_json(body["b"])
+        cc = g1_from_json(body["c"])
+        inputs = [int(x, 16) for x in proof["inputs"]]
+    except (KeyError, TypeError, ValueError, IndexError) as e:
+        raise ProofFormatError(f"❌ Malformed proof: {e}") from e
+
+    if not c.is_on_curve(a, c.b) or not c.is_on_curve(cc, c.b) or not c.is_on_curve(b, c.b2):
+        raise ProofFormatError("❌ Proof point is not on the curve.")
+    # G1 has cofactor 1, but G2 points must be checked against the subgroup order
+    if not c.is_inf(c.multiply(b, R)):
+        raise ProofFormatError("❌ Proof point B is not in the G2 subgroup.")
+    if any(x >= R for x in inputs):
+        raise ProofFormatError("❌ Public input is not a field element.")
+    return a, b, cc, inputs
+
+
+class BatchVerifier:
+    """
+    Holds a parsed verification key; construct once (see get_verifier) and reuse.
+    """
+
+    def __init__(self, verification_key_path: str = ZK_VERIFICATION_KEY_PATH):
+        start = time.perf_counter()
+        self.vk = load_verification_key(verification_key_path)
+        self.load_seconds = time.perf_counter() - start
+
+    def _check(self, parsed: list, weights: list) -> bool:
+        c = bn()
+        pairing = _pairing_mod()
+        vk = self.vk
+
+        # sum r_i * vk_x_i folds into one multiplication per gamma_abc point
+        coefficients = [sum(weights) % R] + [
+            sum(r * inputs[j] for r, (_, _, _, inputs) in zip(weights, parsed)) % R
+            for j in range(len(vk.gamma_abc) - 1)
+        ]
+        vk_x = c.Z1
+        for point, k in zip(vk.gamma_abc, coefficients):
+            if k:
+                vk_x = c.add(vk_x, c.multiply(point, k))
+        c_sum = c.Z1
+        f = bn().FQ12.one()
+        for r, (a, b, cc, _) in zip(weights, parsed):
+            c_sum = c.add(c_sum, c.multiply(cc, r))
+            f = f * _miller_loop(c.twist(b), pairing.cast_point_to_fq12(c.multiply(a, r)))
+
+        if not c.is_inf(vk_x):
+            f = f * _miller_loop(vk.gamma_fq12, pairing.cast_point_to_fq12(c.neg(vk_x)), vk.gamma_frobenius)
+        if not c.is_inf(c_sum):
+            f = f * _miller_loop(vk.delta_fq12, pairing.cast_point_to_fq12(c.neg(c_sum)), vk.delta_frobenius)
+        return pairing.final_exponentiate(f) == vk.alpha_beta ** (sum(weights) % R)
+
+    def _bisect(self, parsed: list, indices: list, results: list):
+        weights = [1] if len(indices) == 1 else \
+            [secrets.randbits(BATCH_WEIGHT_BITS) | 1 for _ in indices]
+        if self._check([parsed[i] for i in indices], weights):
+            for i in indices:
+                results[i] = True
+        elif len(indices) > 1:
+            half = len(indices) // 2
+            self._bisect(parsed, indices[:half], results)
+            self._bisect(parsed, indices[half:], results)
+
+    def verify(self, proof: dict) -> bool:
+        return self.verify_batch([proof])[0]
+
+    def verify_batch(self, proofs: list) -> list:
+        """
+        Verifies every proof in one randomized pass. Returns one bool per proof.
+        """
+        results = [False] * len(proofs)
+        parsed = [None] * len(proofs)
+        for i, proof in enumerate(proofs):
+            try:
+                a, b, cc, inputs = parse_proof(proof)
+            except ProofFormatError:
+                continue
+            if len(inputs) != len(self.vk.gamma_abc) - 1:
+                continue
+            parsed[i] = (a, b, cc, inputs)
+        indices = [i for i, p in enumerate(parsed) if p is not None]
+        if indices:
+            self._bisect(parsed, indices, results)
+        return results
+
+
+_verifier = None
+_verifier_path = None
+
+
+def _set_verifier(verification_key_path: str):
+    global _verifier, _verifier_path
+    _verifier = BatchVerifier(verification_key_path)
+    _verifier_path = verification_key_path
+
+
+def get_verifier(verification_key_path: str = ZK_VERIFICATION_KEY_PATH) -> BatchVerifier:
+    if _verifier is None or _verifier_path != verification_key_path:
+        _set_verifier(verification_key_path)
+    return _verifier
+
+
+def _verify_shard(proofs: list) -> list:
+    return _verifier.verify_batch(proofs)
+
+
+def verify_batch(proofs: list, workers: int = 1, verification_key_path: str = ZK_VERIFICATION_KEY_PATH) -> list:
+    """
+    Verifies `proofs`, sharding across `workers` processes for large batches.
+    Each worker parses the verification key once.
+    """
+    proofs = list(proofs)
+    if workers <= 1 or len(proofs) < 2 * workers:
+        return get_verifier(verification_key_path).verify_batch(proofs)
+    size = -(-len(proofs) // workers)
+    shards = [proofs[i:i + size] for i in range(0, len(proofs), size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_set_verifier,
+                             initargs=(verification_key_path,)) as executor:
+        return [ok for shard in executor.map(_verify_shard, shards) for ok in shard]
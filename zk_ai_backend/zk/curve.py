@@ -0,0 +1,71 @@
+# zk/curve.py
+"""
+BN254 helpers shared by the Groth16 prover and verifier.
+
+Curve arithmetic comes from py_ecc (optional dependency, `pip install py_ecc`),
+imported on first use so the backend can start without it.
+"""
+from functools import lru_cache
+
+# Scalar field of BN254 (the circuit's prime, as stored in out.r1cs)
+R = 0x30644E72E131A029B85045B68181585D2833E84879B9709143E1F593F0000001
+
+
+@lru_cache(maxsize=1)
+def bn():
+    try:
+        from py_ecc import optimized_bn128
+    except ImportError as e:
+        raise ImportError("❌ py_ecc is required for Groth16 proving/verification: pip install py_ecc") from e
+    return optimized_bn128
+
+
+def g1(x: int, y: int, infinity: bool = False):
+    c = bn()
+    if infinity:
+        return c.Z1
+    return (c.FQ(x), c.FQ(y), c.FQ.one())
+
+
+def g2(x: tuple, y: tuple, infinity: bool = False):
+    c = bn()
+    if infinity:
+        return c.Z2
+    return (c.FQ2(list(x)), c.FQ2(list(y)), c.FQ2.one())
+
+
+def to_hex(n: int) -> str:
+    return "0x" + format(int(n), "064x")
+
+
+def g1_to_json(p) -> list:
+    x, y = bn().normalize(p)
+    return [to_hex(x.n), to_hex(y.n)]
+
+
+def g2_to_json(p) -> list:
+    x, y = bn().normalize(p)
+    # optimized_bn128 stores FQ2 coefficients as plain ints
+    return [[to_hex(x.coeffs[0]), to_hex(x.coeffs[1])], [to_hex(y.coeffs[0]), to_hex(y.coeffs[1])]]
+
+
+def g1_from_json(v):
+    return g1(int(v[0], 16), int(v[1], 16))
+
+
+def g2_from_json(v):
+    return g2((int(v[0][0], 16), int(v[0][1], 16)), (int(v[1][0], 16), int(v[1][1], 16)))
+
+
+def msm(points, scalars, zero):
+    """
+    Multi-scalar multiplication sum(s_i * P_i), skipping zero scalars / points.
+    """
+    c = bn()
+    acc = zero
+    for p, s in zip(points, scalars):
+        s %= R
+        if s == 0 or c.is_inf(p):
+            continue
+        acc = c.add(acc, p if s == 1 else c.multiply(p, s))
+    return acc
@@ -0,0 +1,284 @@
+# zk/prover.py
+"""
+In-process Groth16 prover for identity_verifier.zok.
+
+Loads out.r1cs and the ZoKrates (ark backend) proving.key once and keeps them
+resident. The circuit has only two private bits, so for each of the four
+(voice, keystroke) combinations the witness and every witness-dependent
+multi-scalar multiplication are precomputed; a proof then only needs the
+fresh (r, s) blinding terms, which keeps proofs zero-knowledge and unlinkable.
+"""
+import os
+import time
+import secrets
+import struct
+import threading
+
+from .curve import R, bn, g1, g2, msm, g1_to_json, g2_to_json, to_hex
+from .r1cs import load_r1cs
+
+ZK_R1CS_PATH = os.getenv("ZK_R1CS_PATH", "out.r1cs")
+ZK_PROVING_KEY_PATH = os.getenv("ZK_PROVING_KEY_PATH", "proving.key")
+
+# Ark serialises field elements little-endian; the top two bits of the last
+# limb carry point flags (bit 254 = point at infinity)
+_FLAG_SHIFT = 254
+_COORD_MASK = (1 << _FLAG_SHIFT) - 1
+
+
+class ProvingKey:
+    __slots__ = ("alpha_g1", "beta_g1", "beta_g2", "gamma_g2", "delta_g1", "delta_g2",
+                 "gamma_abc_g1", "a_query", "b_g1_query", "b_g2_query", "h_query", "l_query")
+
+
+def load_proving_key(path: str) -> ProvingKey:
+    """
+    Parses an uncompressed ark-groth16 ProvingKey over BN254.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+
+    def fq():
+        nonlocal offset
+        value = int.from_bytes(data[offset:offset + 32], "little")
+        offset += 32
+        return value
+
+    def read_g1():
+        x, y = fq(), fq()
+        return g1(x, y & _COORD_MASK, infinity=bool(y >> _FLAG_SHIFT & 1))
+
+    def read_g2():
+        x = (fq(), fq())
+        y0, y1 = fq(), fq()
+        return g2(x, (y0, y1 & _COORD_MASK), infinity=bool(y1 >> _FLAG_SHIFT & 1))
+
+    def read_vec(read):
+        nonlocal offset
+        (n,) = struct.unpack_from("<Q", data, offset)
+        offset += 8
+        return [read() for _ in range(n)]
+
+    pk = ProvingKey()
+    pk.alpha_g1 = read_g1()
+    pk.beta_g2 = read_g2()
+    pk.gamma_g2 = read_g2()
+    pk.delta_g2 = read_g2()
+    pk.gamma_abc_g1 = read_vec(read_g1)
+    pk.beta_g1 = read_g1()
+    pk.delta_g1 = read_g1()
+    pk.a_query = read_vec(read_g1)
+    pk.b_g1_query = read_vec(read_g1)
+    pk.b_g2_query = read_vec(read_g2)
+    pk.h_query = read_vec(read_g1)
+    pk.l_query = read_vec(read_g1)
+    if offset != len(data):
+        raise ValueError(f"❌ Unexpected trailing bytes in {path} ({len(data) - offset}).")
+    return pk
+
+
+def ark_wire_order(r1cs) -> list:
+    """
+    Maps ark variable index -> r1cs wire. Ark keeps the public wires and the
+    private inputs in place, but allocates internal wires in order of first
+    appearance while walking the constraints (A, then B, then C terms).
+    """
+    first_internal = r1cs.n_public + r1cs.n_prv_in
+    order = list(range(first_internal))
+    seen = set(order)
+    for lcs in r1cs.constraints:
+        for terms in lcs:
+            for wire, _ in terms:
+                if wire not in seen:
+                    seen.add(wire)
+                    order.append(wire)
+    order += [w for w in range(r1cs.n_wires) if w not in seen]
+    return order
+
+
+def identity_verifier_witness(voice: int, keystroke: int) -> list:
+    """
+    Executes identity_verifier.zok in Python and returns the full r1cs witness:
+    [one, result, voice, keystroke, is_not_human, inverse_hint].
+    """
+    total = (voice + keystroke - 2) % R
+    # `sum == 2` compiles to an is-zero gadget with an inverse hint
+    inverse = pow(total, R - 2, R) if total else 1
+    is_not_human = 1 if total else 0
+    result = 1 - is_not_human
+    return [1, result, voice, keystroke, is_not_human, inverse]
+
+
+def _root_of_unity(n: int) -> int:
+    # Same generator ark uses for BN254 Fr radix-2 domains (2-adicity 28)
+    return pow(pow(5, (R - 1) >> 28, R), 1 << (28 - (n.bit_length() - 1)), R)
+
+
+def _ntt(values: list, omega: int) -> list:
+    n = len(values)
+    if n == 1:
+        return list(values)
+    even = _ntt(values[0::2], omega * omega % R)
+    odd = _ntt(values[1::2], omega * omega % R)
+    out = [0] * n
+    w = 1
+    for i in range(n // 2):
+        t = w * odd[i] % R
+        out[i] = (even[i] + t) % R
+        out[i + n // 2] = (even[i] - t) % R
+        w = w * omega % R
+    return out
+
+
+def _intt(values: list, omega: int) -> list:
+    n_inv = pow(len(values), R - 2, R)
+    return [v * n_inv % R for v in _ntt(values, pow(omega, R - 2, R))]
+
+
+class ProverService:
+    """
+    Resident Groth16 prover. Construct once (see get_prover) and reuse.
+    """
+
+    def __init__(self, r1cs_path: str = ZK_R1CS_PATH, proving_key_path: str = ZK_PROVING_KEY_PATH):
+        start = time.perf_counter()
+        self.r1cs = load_r1cs(r1cs_path)
+        self.pk = load_proving_key(proving_key_path)
+        self.order = ark_wire_order(self.r1cs)
+        self.domain_size = 1
+        while self.domain_size < len(self.r1cs.constraints) + self.r1cs.n_public:
+            self.domain_size *= 2
+        self._check_shapes()
+        self._templates = {}
+        self._lock = threading.Lock()
+        self.timings = {"load": time.perf_counter() - start}
+
+    def _check_shapes(self):
+        pk, r1cs = self.pk, self.r1cs
+        if len(pk.a_query) != r1cs.n_wires or len(pk.l_query) != r1cs.n_wires - r1cs.n_public:
+            raise ValueError("❌ proving.key does not match out.r1cs (wire counts differ).")
+        if len(pk.h_query) != self.domain_size - 1:
+            raise ValueError("❌ proving.key does not match out.r1cs (domain size differs).")
+        # Wires that never appear in A must have a zero A-query point
+        used_in_a = {w for a, _, _ in r1cs.constraints for w, _ in a} | set(range(r1cs.n_public))
+        for i, wire in enumerate(self.order):
+            if bn().is_inf(pk.a_query[i]) != (wire not in used_in_a):
+                raise ValueError("❌ Could not align r1cs wires with proving.key variables.")
+
+    def _quotient(self, witness: list) -> list:
+        """
+        Coefficients of H(x) = (A(x)B(x) - C(x)) / (x^n - 1), with the public
+        inputs appended as extra A rows the way ark's QAP reduction does.
+        """
+        n = self.domain_size
+        r1cs = self.r1cs
+        a, b, c = [0] * n, [0] * n, [0] * n
+        for i, (la, lb, lc) in enumerate(r1cs.constraints):
+            a[i] = r1cs.evaluate(la, witness)
+            b[i] = r1cs.evaluate(lb, witness)
+            c[i] = r1cs.evaluate(lc, witness)
+        m = len(r1cs.constraints)
+        for j in range(r1cs.n_public):
+            a[m + j] = witness[j]
+
+        omega = _root_of_unity(n)
+        a, b, c = _intt(a, omega), _intt(b, omega), _intt(c, omega)
+        product = [0] * (2 * n - 1)
+        for i, ai in enumerate(a):
+            if ai:
+                for j, bj in enumerate(b):
+                    product[i + j] = (product[i + j] + ai * bj) % R
+        for i, ci in enumerate(c):
+            product[i] = (product[i] - ci) % R
+
+        h = product[n:] + [0]
+        # Exact division by x^n - 1 leaves the low half equal to -H
+        if any((product[i] + h[i]) % R for i in range(n)):
+            raise ValueError("❌ Witness does not satisfy the circuit.")
+        return h[:n - 1]
+
+    def _template(self, voice: int, keystroke: int) -> dict:
+        key = (voice, keystroke)
+        template = self._templates.get(key)
+        if template is not None:
+            return template
+        with self._lock:
+            if key in self._templates:
+                return self._templates[key]
+            c = bn()
+            pk = self.pk
+
+            start = time.perf_counter()
+            witness = identity_verifier_witness(voice, keystroke)
+            if not self.r1cs.is_satisfied(witness):
+                raise ValueError("❌ Witness does not satisfy out.r1cs.")
+            assignment = [witness[w] for w in self.order]
+            h = self._quotient(witness)
+            witness_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            n_public = self.r1cs.n_public
+            template = {
+                "public": [witness[w] for w in range(1, n_public)],
+                "a": c.add(pk.alpha_g1, msm(pk.a_query, assignment, c.Z1)),
+                "b_g1": c.add(pk.beta_g1, msm(pk.b_g1_query, assignment, c.Z1)),
+                "b_g2": c.add(pk.beta_g2, msm(pk.b_g2_query, assignment, c.Z2)),
+                "c": c.add(msm(pk.l_query, assignment[n_public:], c.Z1), msm(pk.h_query, h, c.Z1)),
+            }
+            self.timings[f"template_{voice}{keystroke}_witness"] = witness_s
+            self.timings[f"template_{voice}{keystroke}_msm"] = time.perf_counter() - start
+            self._templates[key] = template
+            return template
+
+    def precompute(self):
+        for voice in (0, 1):
+            for keystroke in (0, 1):
+                self._template(voice, keystroke)
+
+    def prove(self, voice: int, keystroke: int) -> dict:
+        """
+        Returns a ZoKrates-format g16 proof.json dict for the given private bits.
+        """
+        c = bn()
+        pk = self.pk
+        timings = {}
+
+        start = time.perf_counter()
+        template = self._template(int(voice), int(keystroke))
+        timings["witness"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        r = secrets.randbelow(R - 1) + 1
+        s = secrets.randbelow(R - 1) + 1
+        a = c.add(template["a"], c.multiply(pk.delta_g1, r))
+        b_g2 = c.add(template["b_g2"], c.multiply(pk.delta_g2, s))
+        b_g1 = c.add(template["b_g1"], c.multiply(pk.delta_g1, s))
+        proof_c = c.add(template["c"], c.multiply(a, s))
+        proof_c = c.add(proof_c, c.multiply(b_g1, r))
+        proof_c = c.add(proof_c, c.neg(c.multiply(pk.delta_g1, r * s % R)))
+        timings["msm"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        proof = {
+            "scheme": "g16",
+            "curve": "bn128",
+            "proof": {"a": g1_to_json(a), "b": g2_to_json(b_g2), "c": g1_to_json(proof_c)},
+            "inputs": [to_hex(x) for x in template["public"]],
+        }
+        timings["serialize"] = time.perf_counter() - start
+        self.timings["last_prove"] = timings
+        return proof
+
+
+_prover = None
+_prover_lock = threading.Lock()
+
+
+def get_prover() -> ProverService:
+    global _prover
+    if _prover is None:
+        with _prover_lock:
+            if _prover is None:
+                _prover = ProverService()
+    return _prover
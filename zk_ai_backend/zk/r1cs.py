@@ -0,0 +1,87 @@
+# zk/r1cs.py
+"""
+Readers for the iden3 binary formats ZoKrates exports with `--r1cs`:
+out.r1cs (constraint system) and out.wtns (witness).
+"""
+import struct
+
+
+class R1CS:
+    __slots__ = ("prime", "n_wires", "n_pub_out", "n_pub_in", "n_prv_in", "constraints")
+
+    def __init__(self, prime, n_wires, n_pub_out, n_pub_in, n_prv_in, constraints):
+        self.prime = prime
+        self.n_wires = n_wires
+        self.n_pub_out = n_pub_out
+        self.n_pub_in = n_pub_in
+        self.n_prv_in = n_prv_in
+        # [(A, B, C)], each a list of (wire, coefficient) terms
+        self.constraints = constraints
+
+    @property
+    def n_public(self) -> int:
+        # Wire 0 is the constant one, followed by public outputs and inputs
+        return 1 + self.n_pub_out + self.n_pub_in
+
+    def evaluate(self, terms, witness) -> int:
+        return sum(coeff * witness[wire] for wire, coeff in terms) % self.prime
+
+    def is_satisfied(self, witness) -> bool:
+        p = self.prime
+        return all(
+            self.evaluate(a, witness) * self.evaluate(b, witness) % p == self.evaluate(c, witness)
+            for a, b, c in self.constraints
+        )
+
+
+def _sections(data: bytes, magic: bytes) -> dict:
+    if data[:4] != magic:
+        raise ValueError(f"❌ Not a {magic.decode()} file.")
+    _, n_sections = struct.unpack_from("<II", data, 4)
+    offset = 12
+    sections = {}
+    for _ in range(n_sections):
+        kind, size = struct.unpack_from("<IQ", data, offset)
+        offset += 12
+        sections[kind] = memoryview(data)[offset:offset + size]
+        offset += size
+    return sections
+
+
+def load_r1cs(path: str) -> R1CS:
+    with open(path, "rb") as f:
+        sections = _sections(f.read(), b"r1cs")
+
+    header = sections[1]
+    (field_size,) = struct.unpack_from("<I", header, 0)
+    prime = int.from_bytes(header[4:4 + field_size], "little")
+    offset = 4 + field_size
+    n_wires, n_pub_out, n_pub_in, n_prv_in = struct.unpack_from("<IIII", header, offset)
+    (n_constraints,) = struct.unpack_from("<I", header, offset + 24)
+
+    body = sections[2]
+    offset = 0
+    constraints = []
+    for _ in range(n_constraints):
+        lcs = []
+        for _ in range(3):
+            (n_terms,) = struct.unpack_from("<I", body, offset)
+            offset += 4
+            terms = []
+            for _ in range(n_terms):
+                (wire,) = struct.unpack_from("<I", body, offset)
+                coeff = int.from_bytes(body[offset + 4:offset + 4 + field_size], "little")
+                terms.append((wire, coeff))
+                offset += 4 + field_size
+            lcs.append(terms)
+        constraints.append(tuple(lcs))
+
+    return R1CS(prime, n_wires, n_pub_out, n_pub_in, n_prv_in, constraints)
+
+
+def load_wtns(path: str) -> list:
+    with open(path, "rb") as f:
+        sections = _sections(f.read(), b"wtns")
+    (field_size,) = struct.unpack_from("<I", sections[1], 0)
+    values = sections[2]
+    return [int.from_bytes(values[i:i + field_size], "little") for i in range(0, len(values), field_size)]
@@ -1,25 +1,25 @@
-import json
+import os
 import time
-import hashlib
 
-def generate_proof(voice_result: int, keystroke_result: int) -> dict:
+from ..proof_record import ProofRecord
+
+# 🔏 Attach a real Groth16 proof of identity_verifier.zok (needs py_ecc + proving.key)
+ZK_PROVER = os.getenv("ZK_PROVER", "0") == "1"
+
+def generate_proof(voice_result: int, keystroke_result: int, verified: bool = None) -> ProofRecord:
     """
-    Generates a ZK-style proof dictionary with integrity hash.
+    Generates a ZK-style proof record; its hash covers the canonical binary encoding.
+    `verified` is the decision policy's verdict; without one the OR rule applies.
     """
     # ✅ Verification logic: Human if voice OR keystroke shows 1
-    is_verified = voice_result == 1 or keystroke_result == 1
+    is_verified = bool(verified) if verified is not None else voice_result == 1 or keystroke_result == 1
 
-    # 📄 Construct proof object
-    proof = {
-        "voice_result": voice_result,
-        "keystroke_result": keystroke_result,
-        "verified": is_verified,
-        "timestamp": int(time.time())
-    }
+    groth16 = None
+    if ZK_PROVER:
+        from .prover import get_prover
 
-    # 🔐 Add SHA-256 hash for ZK integrity
-    proof_string = json.dumps(proof, sort_keys=True)
-    proof_hash = hashlib.sha256(proof_string.encode()).hexdigest()
-    proof["hash"] = proof_hash
+        # Circuit output is 1 only when both modalities say human
+        groth16 = get_prover().prove(voice_result, keystroke_result)
 
-    return proof
+    # 📄 Construct proof record (🔐 record.hash is SHA-256 over record.encode())
+    return ProofRecord(voice_result, keystroke_result, is_verified, int(time.time()), groth16)